@@ -8,8 +8,9 @@ import argparse
 import pymysql
 import sys
 from colorama import Fore, Style, init
-from src.schema.table_definitions import TABLE_SCHEMAS, TABLE_GROUPS, INDEX_CREATION_SQLS
+from src.schema.table_definitions import TABLE_SCHEMAS, TABLE_GROUPS, INDEX_CREATION_SQLS, get_partition_names
 from src.data.table_inserter import TableInserter
+from src.data.partition_generator import parse_partition_dist, zipf_weights, allocate_rows, load_partitions
 
 init(autoreset=True)
 
@@ -63,8 +64,13 @@ def create_tables(conn, table_group: str = 'basic'):
     return True
 
 
-def generate_data(conn, table_group: str, count: int, batch_size: int = 1000):
-    """生成测试数据"""
+def generate_data(conn, table_group: str, count: int, batch_size: int = 1000, partition_skew: dict = None):
+    """
+    生成测试数据
+    
+    partition_skew 不为空时，分区表按分区定向生成：
+    {'weights': 分区权重 或 None, 'zipf': 倾斜系数, 'hot': 热分区列表, 'connect': 新建连接的函数}
+    """
     print(f"\n{Fore.CYAN}生成测试数据 (每表 {count} 条)...{Style.RESET_ALL}\n")
     
     inserter = TableInserter(conn, batch_size)
@@ -74,7 +80,9 @@ def generate_data(conn, table_group: str, count: int, batch_size: int = 1000):
         table_name = f"cdc_test_{table_key}"
         
         try:
-            if table_key == 'base':
+            if partition_skew and table_key.startswith('partition_'):
+                generate_skewed_partitions(table_name, count, batch_size, partition_skew)
+            elif table_key == 'base':
                 inserter.insert_base_table(count, table_name)
             elif table_key == 'composite_pk':
                 inserter.insert_composite_pk_table(count, table_name)
@@ -93,6 +101,19 @@ def generate_data(conn, table_group: str, count: int, batch_size: int = 1000):
             continue
 
 
+def generate_skewed_partitions(table_name: str, count: int, batch_size: int, partition_skew: dict):
+    """按分区权重或Zipf倾斜分配行数，每个分区由独立工作线程并行加载"""
+    partitions = get_partition_names(table_name)
+    if partition_skew.get('weights'):
+        weights = partition_skew['weights']
+    else:
+        weights = zipf_weights(partitions, partition_skew.get('zipf', 1.0), partition_skew.get('hot'))
+    
+    counts = allocate_rows(count, partitions, weights)
+    print(f"{table_name} 分区行数分布: " + ', '.join(f"{p}={c}" for p, c in counts.items()))
+    load_partitions(partition_skew['connect'], table_name, counts, batch_size)
+
+
 def create_indexes(conn, table_group: str):
     """创建索引（数据插入后执行以提升性能）"""
     print(f"\n{Fore.CYAN}创建索引 (组: {table_group})...{Style.RESET_ALL}\n")
@@ -133,6 +154,14 @@ def main():
   # 生成分区表数据（10000条）
   python generate_data.py --host localhost --port 6001 --database test_db --group partition --count 10000
   
+  # 分区表倾斜数据：指定各分区权重（* 表示其余分区平分），每个分区一个工作线程并行加载
+  python generate_data.py --host localhost --port 6001 --database test_db --group partition --count 1000000 \
+      --partition-dist "p2024=70,p_west=60,*=10"
+  
+  # 分区表Zipf倾斜：p2024/p_west 最热，其余分区按定义顺序依次递减
+  python generate_data.py --host localhost --port 6001 --database test_db --group partition --count 1000000 \
+      --zipf 1.2 --hot-partitions p2024,p_west
+  
   # 只创建表结构，不插入数据
   python generate_data.py --host localhost --port 6001 --database test_db --create-only
   
@@ -166,6 +195,12 @@ def main():
                        help='每个表生成的数据量 (默认: 1000)')
     parser.add_argument('--batch-size', type=int, default=1000,
                        help='批量插入大小 (默认: 1000)')
+    parser.add_argument('--partition-dist', type=str, metavar='P=W,...',
+                       help='分区表按分区权重生成，如 p2024=70,*=10（不存在的分区名会被忽略）')
+    parser.add_argument('--zipf', type=float, metavar='S',
+                       help='分区表按Zipf倾斜生成（第k热分区权重为 1/k^S）')
+    parser.add_argument('--hot-partitions', type=str, metavar='P1,P2',
+                       help='Zipf倾斜中排在最前的热分区（默认按分区定义顺序）')
     parser.add_argument('--create-only', action='store_true',
                        help='只创建表结构，不插入数据')
     parser.add_argument('--create-indexes', action='store_true',
@@ -191,9 +226,19 @@ def main():
         if not create_tables(conn, args.group):
             return 1
         
+        # 分区定向生成：每个分区的工作线程使用独立连接
+        partition_skew = None
+        if args.partition_dist or args.zipf:
+            partition_skew = {
+                'weights': parse_partition_dist(args.partition_dist) if args.partition_dist else None,
+                'zipf': args.zipf or 1.0,
+                'hot': args.hot_partitions.split(',') if args.hot_partitions else None,
+                'connect': lambda: create_connection(args.host, args.port, args.user, args.password, args.database)
+            }
+        
         # 生成数据
         if not args.create_only:
-            generate_data(conn, args.group, args.count, args.batch_size)
+            generate_data(conn, args.group, args.count, args.batch_size, partition_skew)
             
             # 如果指定了 --create-indexes，在数据插入后创建索引
             if args.create_indexes:
@@ -5,8 +5,9 @@ MatrixOne CDC 测试工具
 """
 
 import argparse
-from src.core.test_runner import TestRunner
+# 执行引擎及适配器在对应模式中才导入，--list 等轻量命令不加载它们
 from src.core.config_loader import ConfigLoader
+from src.tracing import Tracer, set_tracer
 from colorama import Fore, Style, init
 
 init(autoreset=True)
@@ -24,11 +25,58 @@ def list_scenarios():
         print(f"    类型: {scenario['type']}\n")
 
 
-def run_test(scenario: str, testcase: str = "common_tests.yaml", test_group: str = "basic"):
+# 各运行方式不支持的选项（argparse 目标名），给出时报错而不是静默忽略；None 为单场景普通运行
+UNSUPPORTED_OPTIONS = {
+    None: [],
+    '--teardown': ['use_async', 'wire_bytes', 'trace', 'trace_otlp', 'events', 'quiet', 'junit'],
+    '--sweep': ['use_async', 'session', 'wire_bytes', 'trace', 'trace_otlp', 'events', 'quiet', 'junit'],
+    '--snapshot-bench': ['use_async', 'session', 'wire_bytes', 'trace', 'trace_otlp', 'events', 'quiet', 'junit'],
+    '--fanout': ['use_async', 'session', 'wire_bytes', 'trace', 'trace_otlp', 'events', 'quiet', 'junit'],
+    '多个场景': ['use_async', 'session', 'wire_bytes', 'trace', 'trace_otlp']
+}
+
+OPTION_FLAGS = {'use_async': '--async', 'session': '--session', 'wire_bytes': '--wire-bytes', 'trace': '--trace',
+                'trace_otlp': '--trace-otlp', 'events': '--events', 'quiet': '--quiet', 'junit': '--junit'}
+
+
+def check_options(args, scenarios: list):
+    """返回与当前运行方式冲突的错误信息，没有冲突时返回 None"""
+    mode = next((name for name, enabled in (
+        ('--teardown', args.teardown), ('--sweep', args.sweep), ('--snapshot-bench', args.snapshot_bench),
+        ('--fanout', args.fanout), ('多个场景', len(scenarios) > 1)
+    ) if enabled), None)
+    conflicts = [OPTION_FLAGS[dest] for dest in UNSUPPORTED_OPTIONS[mode] if getattr(args, dest)]
+    if conflicts:
+        return f"{mode} 不支持 {', '.join(conflicts)}"
+    # asyncio 引擎没有会话模式
+    if args.use_async and args.session:
+        return "--async 不能与 --session 同时使用"
+    return None
+
+
+def run_test(scenario: str, testcase: str = "common_tests.yaml", test_group: str = "basic", parallel: int = 1,
+             use_async: bool = False, use_session: bool = False, wire_bytes: bool = False, junit: str = None):
     """运行指定场景的测试"""
+    from src.core.test_runner import TestRunner
+    from src.core.cdc_session import CdcSession
+    
+    # 字节统计模式：启用网络代理（使用场景配置的链路）并开启按表字节统计
+    overrides = {'network_proxy.enabled': True, 'network_proxy.accounting.enabled': True} if wire_bytes else None
     try:
-        runner = TestRunner(scenario)
-        results = runner.run_tests(testcase, test_group)
+        if use_session:
+            runner = TestRunner(scenario, overrides)
+            results = runner.run_tests(testcase, test_group, parallel, session=CdcSession(scenario))
+        elif use_async:
+            import asyncio
+            from src.core.async_runner import AsyncTestRunner
+            runner = AsyncTestRunner(scenario, overrides)
+            results = asyncio.run(runner.run_tests(testcase, test_group, parallel if parallel > 1 else 0))
+        else:
+            runner = TestRunner(scenario, overrides)
+            results = runner.run_tests(testcase, test_group, parallel)
+        
+        if junit:
+            export_junit(junit, {scenario: results})
         
         # 返回退出码
         failed = sum(1 for r in results if r['status'] == 'FAIL')
@@ -39,6 +87,114 @@ def run_test(scenario: str, testcase: str = "common_tests.yaml", test_group: str
         return 1
 
 
+def teardown_session(scenario: str):
+    """清理会话模式保留的CDC"""
+    from src.core.test_runner import TestRunner
+    from src.core.cdc_session import CdcSession
+    
+    try:
+        runner = TestRunner(scenario)
+        return 0 if runner.teardown_session(CdcSession(scenario)) else 1
+    
+    except Exception as e:
+        print(f"{Fore.RED}错误: {str(e)}{Style.RESET_ALL}")
+        return 1
+
+
+def export_trace(tracer: Tracer, chrome_path: str = None, otlp_path: str = None):
+    """导出追踪文件"""
+    if chrome_path:
+        tracer.export_chrome_trace(chrome_path)
+        print(f"✓ 追踪已导出 (Chrome trace): {chrome_path} ({len(tracer.spans)} spans)")
+    if otlp_path:
+        tracer.export_otlp_json(otlp_path)
+        print(f"✓ 追踪已导出 (OTLP-JSON): {otlp_path}")
+
+
+def export_junit(path: str, suites: dict):
+    """导出 JUnit XML 报告"""
+    from src.events import write_junit_xml
+    
+    write_junit_xml(path, suites)
+    print(f"✓ JUnit报告已导出: {path}")
+
+
+def setup_events(quiet: bool = False, events_path: str = None):
+    """创建当前进程的事件流：控制台渲染器，以及可选的JSONL写入器"""
+    from src.events import ConsoleRenderer, EventStream, JsonlWriter, set_events
+    
+    events = EventStream([ConsoleRenderer(quiet)])
+    if events_path:
+        events.add_sink(JsonlWriter(events_path))
+    set_events(events)
+    return events
+
+
+def run_scenarios(scenarios: list, testcase: str = "common_tests.yaml", test_group: str = "basic", parallel: int = 1,
+                  quiet: bool = False, events_path: str = None, junit: str = None):
+    """并发运行多个场景，输出合并摘要"""
+    from src.core.multi_scenario_runner import MultiScenarioRunner
+    
+    try:
+        runner = MultiScenarioRunner(scenarios)
+        runner.run(testcase, test_group, parallel, quiet, events_path)
+        if junit:
+            export_junit(junit, runner.junit_suites())
+        return runner.exit_code()
+    
+    except Exception as e:
+        print(f"{Fore.RED}错误: {str(e)}{Style.RESET_ALL}")
+        return 1
+
+
+def run_sweep(scenario: str, specs: list, testcase: str = "common_tests.yaml", test_group: str = "basic",
+              reseed_rows: int = None):
+    """对调优参数做网格扫描"""
+    from src.core.sweep_runner import SweepRunner, parse_sweep_spec
+    
+    try:
+        grid = {}
+        for spec in specs:
+            grid.update(parse_sweep_spec(spec))
+        
+        points = SweepRunner(scenario, grid, reseed_rows).run(testcase, test_group)
+        
+        failed = sum(1 for p in points if 'error' in p or p['failed'] > 0)
+        return 0 if failed == 0 else 1
+    
+    except Exception as e:
+        print(f"{Fore.RED}错误: {str(e)}{Style.RESET_ALL}")
+        return 1
+
+
+def run_fanout(scenario: str, spec: str, sync_level: str = None):
+    """CCPR扇出规模测试"""
+    from src.core.fanout_runner import FanoutRunner, parse_fanout_spec
+    
+    try:
+        runner = FanoutRunner(scenario, parse_fanout_spec(spec), sync_level)
+        runner.run()
+        return runner.exit_code()
+    
+    except Exception as e:
+        print(f"{Fore.RED}错误: {str(e)}{Style.RESET_ALL}")
+        return 1
+
+
+def run_snapshot_benchmark(scenarios: list, spec: str, table: str, incremental_rows: int):
+    """全量 vs 增量同步基准，多个场景依次执行以免相互干扰"""
+    from src.core.snapshot_benchmark import SnapshotBenchmarkRunner, parse_sizes
+    
+    try:
+        runner = SnapshotBenchmarkRunner(scenarios, parse_sizes(spec), table, incremental_rows)
+        runner.run()
+        return runner.exit_code()
+    
+    except Exception as e:
+        print(f"{Fore.RED}错误: {str(e)}{Style.RESET_ALL}")
+        return 1
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='MatrixOne CDC 测试工具',
@@ -56,6 +212,38 @@ def main():
   
   # 运行跨集群的分区表测试
   python main.py --scenario cross_cluster --group partition
+  
+  # 并发运行多个场景（每个场景独立进程），输出合并摘要
+  python main.py --scenario mo_to_mo,mo_to_mysql --group basic
+  python main.py --scenario all
+  
+  # 并发执行互不冲突的用例（同一张表的用例保持顺序）
+  python main.py --scenario mo_to_mo --group partition --parallel 3
+  
+  # 使用asyncio执行引擎（需要aiomysql），所有互不冲突的用例在单进程内并发
+  python main.py --scenario mo_to_mo --group partition --async
+  
+  # 记录阶段/步骤/SQL/轮询级别的追踪，导出Chrome trace（可用Perfetto打开）和OTLP-JSON
+  python main.py --scenario mo_to_mo --group basic --trace trace.json --trace-otlp trace.otlp.json
+  
+  # 结构化输出：逐步骤/逐轮询事件写入JSONL，用例结果写入JUnit XML；--quiet 不输出轮询进度
+  python main.py --scenario mo_to_mo --group basic --events run.jsonl --junit junit.xml --quiet
+  
+  # 会话模式：首次运行创建CDC并记录到 .cdc_session/，后续运行直接复用，最后显式清理
+  python main.py --scenario cross_cluster --group basic --session
+  python main.py --scenario cross_cluster --group partition --session
+  python main.py --scenario cross_cluster --teardown
+  
+  # 扫描MO CDC的batch_size（枚举或 start:stop:step 范围）
+  # mo_to_mo 的 batch_size 按场景配置的 batch_size_option 传给CDC任务；--sweep-reseed 每个扫描点前重置数据集
+  python main.py --scenario mo_to_mo --group basic --sweep batch_size=500,1000,2000 --sweep-reseed 1000 --yes
+  python main.py --scenario flink_cdc --sweep consumer_batch_size=1000:4000:1000
+  
+  # CCPR扇出规模测试：依次并发创建 1/5/10 组订阅，测量同步耗时和上游负载
+  python main.py --scenario cross_cluster --fanout 1,5,10 --fanout-level database
+  
+  # 全量 vs 增量基准：CDC启动前加载 N 行测全量复制速率，再施加增量负载测追平速率
+  python main.py --scenario mo_to_mo,mo_to_mysql --snapshot-bench 10000,100000 --incremental-rows 5000 --yes
         """
     )
     
@@ -68,7 +256,7 @@ def main():
     parser.add_argument(
         '--scenario', '-s',
         type=str,
-        help='指定要运行的场景 (mo_to_mo, mo_to_mysql, cross_cluster)'
+        help='指定要运行的场景 (mo_to_mo, mo_to_mysql, cross_cluster, flink_cdc)，多个场景用逗号分隔，或 all'
     )
     
     parser.add_argument(
@@ -82,8 +270,130 @@ def main():
         '--group', '-g',
         type=str,
         default='basic',
-        choices=['basic', 'fulltext', 'vector', 'partition'],
-        help='指定测试组 (默认: basic)'
+        help='指定测试组，取值为用例文件 test_groups 中的组名 (默认: basic)'
+    )
+    
+    parser.add_argument(
+        '--parallel', '-p',
+        type=int,
+        default=1,
+        metavar='N',
+        help='并发执行用例的队列数，涉及同一张表的用例保持顺序 (默认: 1)'
+    )
+    
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='使用asyncio执行引擎，--parallel 此时作为并发上限 (需要 aiomysql)'
+    )
+    
+    parser.add_argument(
+        '--session',
+        action='store_true',
+        help='会话模式：复用 .cdc_session/ 中记录的CDC，运行结束后不清理'
+    )
+    
+    parser.add_argument(
+        '--teardown',
+        action='store_true',
+        help='清理会话模式保留的CDC并删除状态文件'
+    )
+    
+    parser.add_argument(
+        '--trace',
+        type=str,
+        metavar='FILE',
+        help='导出Chrome trace-event JSON (chrome://tracing / Perfetto)'
+    )
+    
+    parser.add_argument(
+        '--trace-otlp',
+        type=str,
+        metavar='FILE',
+        help='导出OTLP-JSON格式的追踪数据'
+    )
+    
+    parser.add_argument(
+        '--events',
+        type=str,
+        metavar='FILE',
+        help='把运行/用例/步骤/轮询事件写入JSONL文件'
+    )
+    
+    parser.add_argument(
+        '--junit',
+        type=str,
+        metavar='FILE',
+        help='导出JUnit XML测试报告'
+    )
+    
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='安静模式：控制台不输出轮询循环中的进度（事件仍写入 --events 文件）'
+    )
+    
+    parser.add_argument(
+        '--wire-bytes',
+        action='store_true',
+        help='链路字节统计：复制流量经本地计数代理，报告每行字节数及协议压缩开启/关闭对比 (mo_to_mo, cross_cluster)'
+    )
+    
+    parser.add_argument(
+        '--sweep',
+        type=str,
+        action='append',
+        metavar='KEY=VALUES',
+        help='参数扫描，可重复指定 (batch_size, consumer_batch_size, sync_interval 或点分配置路径)'
+    )
+    
+    parser.add_argument(
+        '--sweep-reseed',
+        type=int,
+        metavar='N',
+        help='参数扫描的每个扫描点配置CDC前清空测试组涉及的源表和目标表，并重新写入 N 行 (需要 --yes)'
+    )
+    
+    parser.add_argument(
+        '--yes',
+        action='store_true',
+        help='确认会清空表数据的操作 (--sweep-reseed, --snapshot-bench)'
+    )
+    
+    parser.add_argument(
+        '--fanout',
+        type=str,
+        metavar='N1,N2,...',
+        help='CCPR扇出规模测试，逗号分隔的Publication/Subscription组数 (仅 cross_cluster)'
+    )
+    
+    parser.add_argument(
+        '--fanout-level',
+        type=str,
+        choices=['database', 'table', 'account'],
+        help='扇出测试的同步级别 (默认: 场景配置的 sync_level)'
+    )
+    
+    parser.add_argument(
+        '--snapshot-bench',
+        type=str,
+        metavar='N1,N2,...',
+        help='全量 vs 增量同步基准，逗号分隔的预加载行数 (会清空源端和目标端的基准表，需加 --yes 确认)'
+    )
+    
+    parser.add_argument(
+        '--bench-table',
+        type=str,
+        default='cdc_test_base',
+        help='基准使用的表 (默认: cdc_test_base)'
+    )
+    
+    parser.add_argument(
+        '--incremental-rows',
+        type=int,
+        default=1000,
+        help='全量复制完成后施加的增量行数 (默认: 1000)'
     )
     
     args = parser.parse_args()
@@ -93,7 +403,59 @@ def main():
         return 0
     
     if args.scenario:
-        return run_test(args.scenario, args.testcase, args.group)
+        scenarios = ConfigLoader().resolve_scenarios(args.scenario)
+        if not scenarios:
+            parser.error(f"--scenario 未指定任何场景: {args.scenario!r}")
+        
+        error = check_options(args, scenarios)
+        if error:
+            print(f"{Fore.RED}错误: {error}{Style.RESET_ALL}")
+            return 1
+        
+        if args.teardown:
+            return max(teardown_session(s) for s in scenarios)
+        
+        if args.sweep:
+            if len(scenarios) != 1:
+                print(f"{Fore.RED}错误: --sweep 只支持单个场景{Style.RESET_ALL}")
+                return 1
+            if args.sweep_reseed and not args.yes:
+                print(f"{Fore.RED}错误: --sweep-reseed 会清空测试组涉及的源表和目标表，确认后加 --yes{Style.RESET_ALL}")
+                return 1
+            return run_sweep(scenarios[0], args.sweep, args.testcase, args.group, args.sweep_reseed)
+        
+        if args.snapshot_bench:
+            if not args.yes:
+                print(f"{Fore.RED}错误: --snapshot-bench 会清空源端和目标端的基准表 {args.bench_table}，"
+                      f"确认后加 --yes{Style.RESET_ALL}")
+                return 1
+            return run_snapshot_benchmark(scenarios, args.snapshot_bench, args.bench_table, args.incremental_rows)
+        
+        if args.fanout:
+            if len(scenarios) != 1:
+                print(f"{Fore.RED}错误: --fanout 只支持单个场景{Style.RESET_ALL}")
+                return 1
+            return run_fanout(scenarios[0], args.fanout, args.fanout_level)
+        
+        if len(scenarios) > 1:
+            return run_scenarios(scenarios, args.testcase, args.group, args.parallel, args.quiet, args.events,
+                                 args.junit)
+        
+        tracer = None
+        if args.trace or args.trace_otlp:
+            tracer = Tracer()
+            set_tracer(tracer)
+        events = setup_events(args.quiet, args.events)
+        
+        try:
+            return run_test(scenarios[0], args.testcase, args.group, args.parallel, args.use_async, args.session,
+                            args.wire_bytes, args.junit)
+        finally:
+            if tracer:
+                export_trace(tracer, args.trace, args.trace_otlp)
+            events.close()
+            if args.events:
+                print(f"✓ 事件流已导出: {args.events} ({events.sinks[-1].count} 条)")
     
     parser.print_help()
     return 0
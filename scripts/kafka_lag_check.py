@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Kafka 分段延迟采样本地验证
+
+对单节点 Kafka（如 apache/kafka 容器）创建临时 topic，按分区写入已知数量的消息，
+以指定 consumer group 提交已知位置，再用 KafkaLagSampler 采样，核对 produced/committed/consumer_lag
+和各分区数值，并验证积压判断的阈值与滞回；结束后删除临时 topic 和 consumer group。
+任一检查不符时返回非0退出码
+
+用法:
+    docker run -d --name kafka-lag-check -p 9092:9092 apache/kafka:3.7.0
+    python scripts/kafka_lag_check.py [--bootstrap-servers localhost:9092] [--messages 200]
+    docker rm -f kafka-lag-check
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PARTITIONS = 2
+
+
+def _offset(offset: int):
+    """构造提交用的 OffsetAndMetadata（kafka-python 2.1 起增加了 leader_epoch 参数）"""
+    from kafka.structs import OffsetAndMetadata
+    try:
+        return OffsetAndMetadata(offset, '', -1)
+    except TypeError:
+        return OffsetAndMetadata(offset, '')
+
+
+def produce(bootstrap_servers: str, topic: str, messages: int):
+    """按分区轮流写入 messages 条消息，返回各分区的消息数"""
+    from kafka import KafkaProducer
+
+    producer = KafkaProducer(bootstrap_servers=bootstrap_servers)
+    counts = {p: 0 for p in range(PARTITIONS)}
+    for i in range(messages):
+        partition = i % PARTITIONS
+        producer.send(topic, value=f"row-{i}".encode(), partition=partition)
+        counts[partition] += 1
+    producer.flush()
+    producer.close()
+    return counts
+
+
+def commit(bootstrap_servers: str, topic: str, group: str, offsets: dict):
+    """以 group 身份提交各分区的位置（不实际消费）"""
+    from kafka import KafkaConsumer, TopicPartition
+
+    consumer = KafkaConsumer(bootstrap_servers=bootstrap_servers, group_id=group, enable_auto_commit=False)
+    consumer.assign([TopicPartition(topic, p) for p in offsets])
+    consumer.commit({TopicPartition(topic, p): _offset(offset) for p, offset in offsets.items()})
+    consumer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kafka分段延迟采样本地验证')
+    parser.add_argument('--bootstrap-servers', default='localhost:9092', help='Kafka地址 (默认: localhost:9092)')
+    parser.add_argument('--messages', type=int, default=200, help='写入的消息数 (默认: 200)')
+    parser.add_argument('--threshold', type=int, default=10, help='积压判断阈值 (默认: 10)')
+    parser.add_argument('--window', type=int, default=3, help='积压判断切换所需的连续采样次数 (默认: 3)')
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from kafka.admin import KafkaAdminClient, NewTopic
+    from src.adapters.kafka_lag import KafkaLagSampler
+
+    topic = f"cdc_lag_check_{uuid.uuid4().hex[:8]}"
+    group = f"{topic}_group"
+    admin = KafkaAdminClient(bootstrap_servers=args.bootstrap_servers)
+    admin.create_topics([NewTopic(topic, num_partitions=PARTITIONS, replication_factor=1)])
+    sampler = KafkaLagSampler(args.bootstrap_servers, topic, group, threshold=args.threshold, window=args.window)
+    failures = []
+
+    def check(name: str, actual, expected):
+        ok = actual == expected
+        print(f"  {'✓' if ok else '✗'} {name}: {actual}" + ('' if ok else f" (期望 {expected})"))
+        if not ok:
+            failures.append(name)
+
+    try:
+        # 分区元数据在创建 topic 后异步可见
+        deadline = time.time() + 30
+        while len(sampler._partitions()) < PARTITIONS and time.time() < deadline:
+            time.sleep(0.5)
+
+        produced = produce(args.bootstrap_servers, topic, args.messages)
+        # 分区0提交一半，分区1不提交
+        committed = {0: produced[0] // 2, 1: 0}
+        commit(args.bootstrap_servers, topic, group, {0: committed[0]})
+        lag = args.messages - committed[0]
+
+        print(f"topic {topic}: 写入 {args.messages} 条，已提交 {committed}")
+        sample = sampler.sample(source_count=args.messages, target_count=committed[0])
+        check('produced', sample['produced'], args.messages)
+        check('committed', sample['committed'], committed[0])
+        check('consumer_lag', sample['consumer_lag'], lag)
+        for p in range(PARTITIONS):
+            check(f"分区{p} lag", sample['partitions'][p]['lag'], produced[p] - committed[p])
+        check('积压判断', sample['bottleneck'], 'consumer' if lag > args.threshold else 'none')
+
+        # 全部提交后 Kafka 中无积压，但目标行数仍落后：需连续 window 次采样才切换到 producer
+        commit(args.bootstrap_servers, topic, group, produced)
+        target = args.messages - args.threshold - 1
+        verdicts = [sampler.sample(source_count=args.messages, target_count=target)['bottleneck']
+                    for _ in range(args.window)]
+        check('全部提交后 consumer_lag', sampler.samples[-1]['consumer_lag'], 0)
+        check('积压判断切换', verdicts, [sample['bottleneck']] * (args.window - 1) + ['producer'])
+
+        # 行数差不超过阈值视为无积压
+        verdicts = [sampler.sample(source_count=args.messages, target_count=args.messages - args.threshold)
+                    ['bottleneck'] for _ in range(args.window)]
+        check('阈值内无积压', verdicts[-1], 'none')
+    finally:
+        sampler.close()
+        for cleanup in (lambda: admin.delete_topics([topic]), lambda: admin.delete_consumer_groups([group])):
+            try:
+                cleanup()
+            except Exception as e:
+                print(f"  ⚠ 清理失败: {str(e)}")
+        admin.close()
+
+    if failures:
+        print(f"✗ {len(failures)} 项检查失败: {', '.join(failures)}")
+        return 1
+    print("✓ Kafka延迟采样检查通过")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+启动耗时预算检查
+
+分别以独立进程多次运行 `main.py --list` 和场景分发（加载场景配置并创建适配器，不连接数据库），
+取中位数与预算比较，超出预算时返回非0退出码；首次运行用于预热配置缓存，不计入统计
+
+用法: python scripts/startup_budget.py [--runs 10] [--list-budget-ms 150] [--dispatch-budget-ms 300]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DISPATCH_CODE = "from src.core.test_runner import TestRunner; TestRunner({scenario!r})"
+
+
+def measure(cmd, runs: int):
+    """运行 runs+1 次（第一次预热），返回各次耗时（毫秒）"""
+    samples = []
+    for i in range(runs + 1):
+        start = time.perf_counter()
+        result = subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(f"命令失败: {' '.join(cmd)}\n{result.stderr.decode(errors='replace')}")
+        if i > 0:
+            samples.append(elapsed)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CLI启动耗时预算检查')
+    parser.add_argument('--runs', type=int, default=10, help='每项测量次数 (默认: 10)')
+    parser.add_argument('--list-budget-ms', type=float, default=150, help='--list 中位耗时预算 (默认: 150)')
+    parser.add_argument('--dispatch-budget-ms', type=float, default=300,
+                        help='场景分发中位耗时预算 (默认: 300)')
+    parser.add_argument('--scenario', action='append',
+                        help='测量分发耗时的场景，可重复指定 (默认: 全部场景)')
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from src.core.config_loader import ConfigLoader
+
+    scenarios = args.scenario or [s['file'] for s in ConfigLoader(os.path.join(ROOT, 'config')).list_scenarios()]
+    checks = [('python (空解释器)', [sys.executable, '-c', 'pass'], None),
+              ('main.py --list', [sys.executable, 'main.py', '--list'], args.list_budget_ms)]
+    checks += [(f"分发 {s}", [sys.executable, '-c', DISPATCH_CODE.format(scenario=s)], args.dispatch_budget_ms)
+               for s in scenarios]
+
+    failed = 0
+    print(f"{'项目':<28}{'中位(ms)':>10}{'P90(ms)':>10}{'预算(ms)':>10}  结果")
+    for name, cmd, budget in checks:
+        samples = sorted(measure(cmd, args.runs))
+        median = statistics.median(samples)
+        p90 = samples[min(len(samples) - 1, int(len(samples) * 0.9))]
+        if budget is None:
+            verdict = ''
+        elif median <= budget:
+            verdict = '✓'
+        else:
+            verdict = '✗ 超出预算'
+            failed += 1
+        budget_str = '-' if budget is None else f"{budget:.0f}"
+        print(f"{name:<28}{median:>10.1f}{p90:>10.1f}{budget_str:>10}  {verdict}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,28 @@
-from .base_adapter import BaseAdapter
-from .mo_to_mo_adapter import MoToMoAdapter
-from .mo_to_mysql_adapter import MoToMysqlAdapter
-from .cross_cluster_adapter import CrossClusterAdapter
-from .flink_cdc_adapter import FlinkCdcAdapter
-
-__all__ = [
-    'BaseAdapter',
-    'MoToMoAdapter', 
-    'MoToMysqlAdapter',
-    'CrossClusterAdapter',
-    'FlinkCdcAdapter'
-]
+"""
+适配器包 - 各适配器类在首次访问时才导入（见 registry），
+避免导入本包时加载所有适配器及其依赖
+"""
+
+import importlib
+from .registry import ADAPTER_REGISTRY, get_adapter_class, register_adapter
+
+_LAZY_EXPORTS = {
+    'BaseAdapter': '.base_adapter',
+    'MoToMoAdapter': '.mo_to_mo_adapter',
+    'MoToMysqlAdapter': '.mo_to_mysql_adapter',
+    'CrossClusterAdapter': '.cross_cluster_adapter',
+    'FlinkCdcAdapter': '.flink_cdc_adapter',
+    'LoopbackAdapter': '.loopback_adapter',
+    'AsyncBaseAdapter': '.async_base_adapter',
+    'AsyncMysqlAdapter': '.async_mysql_adapter'
+}
+
+__all__ = list(_LAZY_EXPORTS) + ['ADAPTER_REGISTRY', 'get_adapter_class', 'register_adapter']
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,76 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Tuple
+from ..events import get_events
+
+
+class AsyncBaseAdapter(ABC):
+    """异步CDC场景适配器基类，与 BaseAdapter 接口一一对应"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+
+    @abstractmethod
+    async def connect(self):
+        """建立源和目标数据库连接"""
+        pass
+
+    @abstractmethod
+    async def disconnect(self):
+        """断开连接"""
+        pass
+
+    @abstractmethod
+    async def setup_cdc(self):
+        """配置CDC同步"""
+        pass
+
+    @abstractmethod
+    async def teardown_cdc(self):
+        """清理CDC配置"""
+        pass
+
+    @abstractmethod
+    async def execute_on_source(self, sql: str, params: tuple = None) -> Any:
+        """在源数据库执行SQL"""
+        pass
+
+    @abstractmethod
+    async def execute_dml_on_source(self, sql: str, params: tuple = None) -> int:
+        """在源数据库执行DML，返回影响行数"""
+        pass
+
+    @abstractmethod
+    async def execute_on_target(self, sql: str, params: tuple = None) -> Any:
+        """在目标数据库执行SQL"""
+        pass
+
+    async def get_source_row_count(self, table: str) -> int:
+        """获取源表行数"""
+        result = await self.execute_on_source(f"SELECT COUNT(*) FROM {table}")
+        return result[0][0] if result else 0
+
+    async def get_target_row_count(self, table: str) -> int:
+        """获取目标表行数"""
+        result = await self.execute_on_target(f"SELECT COUNT(*) FROM {table}")
+        return result[0][0] if result else 0
+
+    async def poll_counts(self, table: str, **fields) -> Tuple[int, int]:
+        """同步验证的一次轮询：并发查询源和目标行数，发出 poll 事件（fields 附加到事件中）"""
+        source_count, target_count = await asyncio.gather(self.get_source_row_count(table),
+                                                          self.get_target_row_count(table))
+        get_events().emit('poll', table=table, source_rows=source_count, target_rows=target_count,
+                          lag=source_count - target_count, **fields)
+        return source_count, target_count
+
+    async def compare_data(self, table: str, where_clause: str = None) -> bool:
+        """比较源和目标数据"""
+        where = f" WHERE {where_clause}" if where_clause else ""
+        sql = f"SELECT * FROM {table}{where} ORDER BY id"
+        source_data, target_data = await asyncio.gather(self.execute_on_source(sql), self.execute_on_target(sql))
+        return list(source_data) == list(target_data)
+
+    @abstractmethod
+    async def validate_sync(self, table: str, timeout: int = 60) -> bool:
+        """验证数据同步完成（轮询等待使用 asyncio.sleep，不占用线程）"""
+        pass
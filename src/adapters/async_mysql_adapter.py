@@ -0,0 +1,133 @@
+"""
+异步MySQL协议适配器 - 基于 aiomysql 连接池
+CDC的创建和清理委托给对应场景的同步适配器，仅在启动和结束时各执行一次；
+同步验证的轮询和等待为协程，场景相关的判断（预测等待、任务采样、积压采样）调用同步适配器的验证钩子
+"""
+
+import asyncio
+import time
+from typing import Any, Dict
+from .async_base_adapter import AsyncBaseAdapter
+from .base_adapter import BaseAdapter
+from ..events import get_events
+
+try:
+    import aiomysql
+except ImportError:  # 可选依赖，仅异步执行模式需要
+    aiomysql = None
+
+
+class AsyncMysqlAdapter(AsyncBaseAdapter):
+    """适用于所有MySQL协议端点（MatrixOne / MySQL）的异步适配器"""
+
+    def __init__(self, config: Dict[str, Any], cdc_adapter: BaseAdapter):
+        super().__init__(config)
+        self.cdc_adapter = cdc_adapter
+        self.pool_size = config.get('async', {}).get('pool_size', 10)
+        self.source_pool = None
+        self.target_pool = None
+
+    async def _create_pool(self, cfg: Dict[str, Any]):
+        """为单个端点创建连接池"""
+        return await aiomysql.create_pool(
+            host=cfg['host'],
+            port=cfg['port'],
+            user=cfg['user'],
+            password=cfg['password'],
+            db=cfg.get('database', 'mysql'),
+            charset='utf8mb4',
+            autocommit=True,
+            minsize=1,
+            maxsize=self.pool_size
+        )
+
+    async def connect(self):
+        """并发建立源和目标连接池"""
+        if aiomysql is None:
+            raise ImportError("异步执行模式需要安装 aiomysql: pip install aiomysql")
+
+        source_cfg = self.config['source']
+        target_cfg = self.config['target']
+
+        self.source_pool, self.target_pool = await asyncio.gather(
+            self._create_pool(source_cfg),
+            self._create_pool(target_cfg)
+        )
+        # CDC生命周期由同步适配器负责，需要它自己的连接
+        await asyncio.to_thread(self.cdc_adapter.connect)
+
+        print(f"✓ 已创建源连接池 ({source_cfg['host']}:{source_cfg['port']}, 最大 {self.pool_size})")
+        print(f"✓ 已创建目标连接池 ({target_cfg['host']}:{target_cfg['port']}, 最大 {self.pool_size})")
+
+    async def disconnect(self):
+        """关闭连接池"""
+        for pool in (self.source_pool, self.target_pool):
+            if pool:
+                pool.close()
+                await pool.wait_closed()
+        await asyncio.to_thread(self.cdc_adapter.disconnect)
+
+    async def setup_cdc(self):
+        """委托同步适配器配置CDC"""
+        await asyncio.to_thread(self.cdc_adapter.setup_cdc)
+
+    async def teardown_cdc(self):
+        """委托同步适配器清理CDC"""
+        await asyncio.to_thread(self.cdc_adapter.teardown_cdc)
+
+    async def _execute(self, pool, sql: str, params: tuple = None, rowcount: bool = False) -> Any:
+        """从连接池取连接执行SQL（autocommit）；rowcount 为 True 时返回影响行数"""
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                affected = await cursor.execute(sql, params)
+                return affected if rowcount else await cursor.fetchall()
+
+    async def execute_on_source(self, sql: str, params: tuple = None) -> Any:
+        """在源数据库执行SQL"""
+        return await self._execute(self.source_pool, sql, params)
+
+    async def execute_dml_on_source(self, sql: str, params: tuple = None) -> int:
+        """在源数据库执行DML，返回影响行数"""
+        return await self._execute(self.source_pool, sql, params, rowcount=True)
+
+    async def execute_on_target(self, sql: str, params: tuple = None) -> Any:
+        """在目标数据库执行SQL"""
+        return await self._execute(self.target_pool, sql, params)
+
+    async def _hook(self, name: str, *args) -> Any:
+        """
+        调用同步适配器的验证钩子
+
+        基类的默认钩子不访问外部系统，直接调用；场景覆盖的钩子可能查询数据库或Kafka，
+        在线程中执行，只在调用期间占用线程
+        """
+        hook = getattr(self.cdc_adapter, name)
+        if getattr(type(self.cdc_adapter), name) is getattr(BaseAdapter, name):
+            return hook(*args)
+        return await asyncio.to_thread(hook, *args)
+
+    async def validate_sync(self, table: str, timeout: int = 60) -> bool:
+        """验证数据同步完成：异步查询行数，轮询间隔按同步适配器的 _poll_wait 以 asyncio.sleep 等待"""
+        check_interval = self.config.get('validation', {}).get('check_interval', 10)
+        events = get_events()
+        start = time.time()
+        await self._hook('_on_sync_start', table)
+
+        while True:
+            elapsed = time.time() - start
+            try:
+                fields = await self._hook('_poll_fields', table)
+                if self.cdc_adapter.wire_bytes:
+                    fields['wire_bytes'] = self.cdc_adapter.wire_bytes()
+                source_count, target_count = await self.poll_counts(table, elapsed=elapsed, **fields)
+                await self._hook('_on_poll', table, source_count, target_count)
+                if self.cdc_adapter._is_synced(source_count, target_count):
+                    events.emit('synced', table=table, elapsed=time.time() - start)
+                    return True
+            except Exception as e:
+                events.emit('poll_error', table=table, error=str(e))
+
+            elapsed = time.time() - start
+            if elapsed >= timeout:
+                return False
+            await asyncio.sleep(min(await self._hook('_poll_wait', table, check_interval), timeout - elapsed))
@@ -1,63 +1,300 @@
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+from .connection_pool import ConnectionPool, is_connection_error
+from ..schema.table_definitions import get_partition_names
+from ..tracing import get_tracer, estimate_result_bytes, redact_sql
+from ..events import get_events
 
 
 class BaseAdapter(ABC):
     """CDC场景适配器基类"""
-    
+
+    # CDC复制链路读取 replication_host/replication_port 的端点（网络代理只能改写这些端点的复制地址）
+    REPLICATION_ENDPOINTS: Tuple[str, ...] = ()
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.source_conn = None
-        self.target_conn = None
-    
+        self.source_pool = None
+        self.target_pool = None
+        # 表名 -> 分区名列表（首次查询后缓存）
+        self._partitions: Dict[str, List[str]] = {}
+        # 返回复制链路累计字节数的函数（启用网络代理时由执行引擎设置），记入轮询事件
+        self.wire_bytes = None
+
     @abstractmethod
     def connect(self):
         """建立源和目标数据库连接"""
         pass
-    
-    @abstractmethod
+
     def disconnect(self):
         """断开连接"""
-        pass
-    
+        if self.source_pool:
+            self.source_pool.close()
+        if self.target_pool:
+            self.target_pool.close()
+
     @abstractmethod
     def setup_cdc(self):
         """配置CDC同步"""
         pass
-    
+
     @abstractmethod
     def teardown_cdc(self):
         """清理CDC配置"""
         pass
-    
+
     @abstractmethod
+    def validate_sync(self, table: str, timeout: int = 60) -> bool:
+        """验证数据同步完成"""
+        pass
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """适配器侧采集的指标（吞吐、延迟等），验证通过后附加到用例结果"""
+        return {}
+
+    # ========== 会话模式 ==========
+
+    def export_cdc_state(self) -> Dict[str, Any]:
+        """导出CDC句柄（名称、进程号等），会话模式下写入状态文件"""
+        return {}
+
+    def restore_cdc_state(self, state: Dict[str, Any]) -> bool:
+        """根据保存的句柄接管已有CDC，句柄失效时返回 False（将重新 setup_cdc）"""
+        return False
+
+    # ========== 连接管理 ==========
+
+    def _create_pool(self, cfg: Dict[str, Any], **connect_kwargs) -> ConnectionPool:
+        """为单个端点创建连接池，并预建一个连接以尽早暴露连接错误"""
+        pool_cfg = self.config.get('connection_pool', {})
+        params = {
+            'host': cfg['host'],
+            'port': cfg['port'],
+            'user': cfg['user'],
+            'password': cfg['password'],
+            'database': cfg['database']
+        }
+        params.update(connect_kwargs)
+
+        pool = ConnectionPool(
+            params,
+            max_size=pool_cfg.get('max_size', 8),
+            health_check_interval=pool_cfg.get('health_check_interval', 30)
+        )
+        pool.warm_up()
+        return pool
+
+    def source_connection(self):
+        """借出一个源端连接（上下文管理器），用于批量写入等场景"""
+        return self.source_pool.connection()
+
+    def target_connection(self):
+        """借出一个目标端连接（上下文管理器）"""
+        return self.target_pool.connection()
+
+    def _run(self, pool: ConnectionPool, sql: str, params: tuple = None, retry: bool = False,
+             cursor_class=None, endpoint: str = '', rowcount: bool = False) -> Any:
+        """在连接池上执行SQL；retry 为 True 时连接断开后重连重试一次，rowcount 为 True 时返回影响行数"""
+        tracer = get_tracer()
+        attempts = 2 if retry else 1
+        statement = redact_sql(sql) if tracer.enabled else ''
+        with tracer.span('sql', endpoint=endpoint, statement=statement) as span:
+            for attempt in range(attempts):
+                try:
+                    with pool.connection() as conn:
+                        with conn.cursor(cursor_class) as cursor:
+                            cursor.execute(sql, params)
+                            rows = cursor.fetchall()
+                            affected = cursor.rowcount
+                    if tracer.enabled:
+                        span.set_attribute('rows', len(rows))
+                        span.set_attribute('bytes', estimate_result_bytes(rows))
+                        span.set_attribute('attempts', attempt + 1)
+                    return affected if rowcount else rows
+                except Exception as e:
+                    if attempt + 1 < attempts and is_connection_error(e):
+                        continue
+                    raise
+
+    # ========== 写路径（DML/DDL，不重试以免重复执行） ==========
+
     def execute_on_source(self, sql: str, params: tuple = None) -> Any:
         """在源数据库执行SQL"""
-        pass
-    
-    @abstractmethod
+        return self._run(self.source_pool, sql, params, endpoint='source')
+
+    def execute_dml_on_source(self, sql: str, params: tuple = None) -> int:
+        """在源数据库执行DML，返回影响行数"""
+        return self._run(self.source_pool, sql, params, endpoint='source', rowcount=True)
+
     def execute_on_target(self, sql: str, params: tuple = None) -> Any:
         """在目标数据库执行SQL"""
-        pass
-    
-    @abstractmethod
-    def validate_sync(self, table: str, timeout: int = 60) -> bool:
-        """验证数据同步完成"""
-        pass
-    
+        return self._run(self.target_pool, sql, params, endpoint='target')
+
+    # ========== 读路径（autocommit，无额外COMMIT，断线自动重试） ==========
+
+    def query_source(self, sql: str, params: tuple = None, cursor_class=None) -> Any:
+        """在源数据库执行只读查询"""
+        return self._run(self.source_pool, sql, params, retry=True, cursor_class=cursor_class, endpoint='source')
+
+    def query_target(self, sql: str, params: tuple = None, cursor_class=None) -> Any:
+        """在目标数据库执行只读查询"""
+        return self._run(self.target_pool, sql, params, retry=True, cursor_class=cursor_class, endpoint='target')
+
     def get_source_row_count(self, table: str) -> int:
         """获取源表行数"""
-        result = self.execute_on_source(f"SELECT COUNT(*) FROM {table}")
+        result = self.query_source(f"SELECT COUNT(*) FROM {table}")
         return result[0][0] if result else 0
-    
+
     def get_target_row_count(self, table: str) -> int:
         """获取目标表行数"""
-        result = self.execute_on_target(f"SELECT COUNT(*) FROM {table}")
+        result = self.query_target(f"SELECT COUNT(*) FROM {table}")
         return result[0][0] if result else 0
+
+    def poll_counts(self, table: str, **fields) -> Tuple[int, int]:
+        """同步验证的一次轮询：查询源和目标行数，发出 poll 事件（fields 附加到事件中）"""
+        with get_tracer().span('poll', table=table) as span:
+            source_count = self.get_source_row_count(table)
+            target_count = self.get_target_row_count(table)
+            span.set_attribute('source_rows', source_count)
+            span.set_attribute('target_rows', target_count)
+        if self.wire_bytes:
+            fields['wire_bytes'] = self.wire_bytes()
+        get_events().emit('poll', table=table, source_rows=source_count, target_rows=target_count,
+                          lag=source_count - target_count, **fields)
+        return source_count, target_count
+
+    def sleep(self, seconds: float):
+        """轮询间隔等待（记入追踪）"""
+        with get_tracer().span('sleep', seconds=seconds):
+            time.sleep(seconds)
+
+    # ========== 同步验证钩子（validate_sync 与分区验证共用） ==========
+
+    def _on_sync_start(self, table: str):
+        """一次同步验证开始时调用（如开始观察同步周期）"""
+        pass
+
+    def _poll_fields(self, table: str) -> Dict[str, Any]:
+        """每次轮询附加到 poll 事件的场景字段（如 Consumer 日志指标）"""
+        return {}
+
+    def _on_poll(self, table: str, source_count: int, target_count: int):
+        """每次轮询得到整表的源和目标行数后调用（如采样任务状态、消息积压）"""
+        pass
+
+    def _poll_wait(self, table: str, wait: float) -> float:
+        """下一次轮询前的等待秒数，默认为检查间隔（可按预测的同步时间调整）"""
+        return wait
+
+    def _is_synced(self, source_count: int, target_count: int) -> bool:
+        """行数一致即视为同步完成（两端都为空也算）；需要观察到数据才算完成的场景覆盖此方法"""
+        return source_count == target_count
+
+    # ========== 分区感知验证 ==========
+    
+    def get_partitions(self, table: str) -> List[str]:
+        """从 information_schema 发现分区，查询失败或无结果时按表定义解析；非分区表返回空列表"""
+        if table not in self._partitions:
+            try:
+                rows = self.query_source(
+                    "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+                    "ORDER BY PARTITION_ORDINAL_POSITION",
+                    (table,)
+                )
+                names = [row[0] for row in rows]
+            except Exception:
+                names = []
+            self._partitions[table] = names or get_partition_names(table)
+        return self._partitions[table]
+    
+    def _partition_digest_expr(self, table: str) -> str:
+        """分区比较表达式：count 只比较行数，checksum 额外比较所有列的 CRC32 异或"""
+        if self.config.get('validation', {}).get('partition_check', 'count') != 'checksum':
+            return "COUNT(*)"
+        rows = self.query_source(
+            "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+            (table,)
+        )
+        columns = ', '.join(f"`{row[0]}`" for row in rows)
+        return f"COUNT(*), BIT_XOR(CRC32(CONCAT_WS('|', {columns})))"
+    
+    def validate_partitions(self, table: str, timeout: int = 60, partitions: List[str] = None) -> Dict[str, Any]:
+        """
+        按分区并发比较源和目标，直到所有分区一致（且满足适配器的 _is_synced）或超时
+        
+        每轮按整表行数调用同步验证钩子，保留适配器的任务采样、积压采样和预测等待；
+        分区查询出错（如目标表尚未创建）时该分区本轮计为未一致，继续重试到超时
+        
+        返回 {'synced': bool, 'partitions': {分区: {source_rows, target_rows, converged_time}}}，
+        converged_time 为该分区最近一次变为一致时距开始的秒数（未一致为 None）
+        """
+        partitions = partitions or self.get_partitions(table)
+        check_interval = self.config.get('validation', {}).get('check_interval', 10)
+        expr = self._partition_digest_expr(table)
+        state = {p: {'source_rows': None, 'target_rows': None, 'converged_time': None} for p in partitions}
+        start = time.time()
+        events = get_events()
+        self._on_sync_start(table)
+        
+        def digest(query, partition):
+            result = query(f"SELECT {expr} FROM {table} PARTITION ({partition})")
+            return tuple(result[0]) if result else (0,)
+        
+        def outcome(future):
+            try:
+                return future.result(), None
+            except Exception as e:
+                return None, e
+        
+        workers = min(len(partitions) * 2, self.config.get('connection_pool', {}).get('max_size', 8))
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            while True:
+                with get_tracer().span('poll_partitions', table=table, partitions=len(partitions)):
+                    futures = {
+                        p: (executor.submit(digest, self.query_source, p), executor.submit(digest, self.query_target, p))
+                        for p in partitions
+                    }
+                    lagging, failed = [], 0
+                    for p, (source_future, target_future) in futures.items():
+                        (source, source_error), (target, target_error) = outcome(source_future), outcome(target_future)
+                        info = state[p]
+                        if source_error or target_error:
+                            info['converged_time'] = None
+                            failed += 1
+                            lagging.append(f"{p}(查询出错)")
+                            events.emit('poll_error', table=table, partition=p, error=str(source_error or target_error))
+                            continue
+                        info['source_rows'], info['target_rows'] = source[0], target[0]
+                        if source == target:
+                            if info['converged_time'] is None:
+                                info['converged_time'] = time.time() - start
+                        else:
+                            info['converged_time'] = None
+                            lagging.append(f"{p}({target[0]}/{source[0]})")
+                
+                source_total = sum(info['source_rows'] or 0 for info in state.values())
+                target_total = sum(info['target_rows'] or 0 for info in state.values())
+                if not failed:
+                    self._on_poll(table, source_total, target_total)
+                
+                elapsed = time.time() - start
+                synced = not lagging and self._is_synced(source_total, target_total)
+                events.emit('partition_poll', table=table, partitions=len(partitions), lagging=lagging,
+                            source_rows=source_total, synced=synced, elapsed=elapsed)
+                if synced:
+                    return {'synced': True, 'partitions': state}
+                
+                if elapsed >= timeout:
+                    return {'synced': False, 'partitions': state}
+                self.sleep(min(self._poll_wait(table, check_interval), timeout - elapsed))
     
     def compare_data(self, table: str, where_clause: str = None) -> bool:
         """比较源和目标数据"""
         where = f" WHERE {where_clause}" if where_clause else ""
-        source_data = self.execute_on_source(f"SELECT * FROM {table}{where} ORDER BY id")
-        target_data = self.execute_on_target(f"SELECT * FROM {table}{where} ORDER BY id")
+        source_data = self.query_source(f"SELECT * FROM {table}{where} ORDER BY id")
+        target_data = self.query_target(f"SELECT * FROM {table}{where} ORDER BY id")
         return source_data == target_data
@@ -0,0 +1,215 @@
+"""
+CCPR 监控 - 后台采样 SHOW CCPR SUBSCRIPTION 和目标表行数，推导每个同步周期的指标
+（周期开始/结束、每周期目标表的净行数变化及对应字节数、周期时长与 sync_interval 的对比），
+并预测下一次同步时间，供同步验证精确等待
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from ..tracing import estimate_result_bytes
+
+# SHOW CCPR SUBSCRIPTION 中表示同步进度的列（按顺序取第一个存在的）
+DEFAULT_WATERMARK_COLUMNS = ['watermark', 'sync_watermark', 'iteration_lsn', 'lsn', 'last_sync_time']
+# 表示周期状态的列，值包含 running_states 中任一项时视为正在同步
+DEFAULT_STATE_COLUMNS = ['iteration_state', 'state', 'status']
+DEFAULT_RUNNING_STATES = ['running', 'syncing', 'applying']
+
+
+class CcprMonitor:
+    """单个Subscription的同步周期监控"""
+
+    def __init__(self, adapter, sync_interval: float, config: Dict[str, Any] = None):
+        config = config or {}
+        self.adapter = adapter
+        self.sync_interval = sync_interval
+        self.sample_interval = config.get('sample_interval', 2)
+        self.watermark_columns = config.get('watermark_columns', DEFAULT_WATERMARK_COLUMNS)
+        self.state_columns = config.get('state_columns', DEFAULT_STATE_COLUMNS)
+        self.running_states = [s.lower() for s in config.get('running_states', DEFAULT_RUNNING_STATES)]
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.tables: List[str] = []
+        self.cycles: List[Dict[str, Any]] = []
+        self.samples = 0
+        self._row_bytes: Dict[str, float] = {}
+        # 上个周期结束时的行数和进度，作为当前周期的基线
+        self._base_counts: Dict[str, int] = {}
+        self._base_watermark = None
+        self._prev_counts: Dict[str, int] = {}
+        self._prev_watermark = None
+        self._changed_at = None
+        self._pending_start = None
+        self._last_sample_time = None
+        self._running_since = None
+
+    # ========== 生命周期 ==========
+
+    def start(self):
+        """启动后台采样线程"""
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='ccpr-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台采样"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.sample_interval + 5)
+            self._thread = None
+
+    def watch(self, table: str):
+        """跟踪表的行数变化，用于统计每周期的净行数变化和字节数"""
+        with self._lock:
+            if table not in self.tables:
+                self.tables.append(table)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"    ⚠ CCPR监控采样失败: {str(e)}")
+            self._stop.wait(self.sample_interval)
+
+    # ========== 采样与周期推导 ==========
+
+    def sample(self):
+        """采样一次订阅状态和目标行数，检测周期边界"""
+        status = self.adapter.check_subscription_status(quiet=True)
+        with self._lock:
+            tables = list(self.tables)
+        counts = {table: self.adapter.get_target_row_count(table) for table in tables}
+        # 行字节数的样本查询在锁外执行，避免阻塞 predict_next_sync/summary
+        for table, count in counts.items():
+            if count and table not in self._row_bytes:
+                self._estimate_row_bytes(table)
+        now = time.time()
+
+        with self._lock:
+            self.samples += 1
+            watermark = self._pick(status, self.watermark_columns)
+            state = self._pick(status, self.state_columns)
+            running = state is not None and any(s in str(state).lower() for s in self.running_states)
+
+            if running and self._running_since is None:
+                self._running_since = now
+            # 新跟踪的表以首次采样的行数为基线
+            for table, count in counts.items():
+                self._base_counts.setdefault(table, count)
+            if self._base_watermark is None:
+                self._base_watermark = watermark
+
+            # 记录行数/进度最近一次变化的时间作为周期结束，首次变化前的采样时间作为周期开始
+            changed = watermark != self._prev_watermark or any(
+                count != self._prev_counts.get(table, count) for table, count in counts.items())
+            if self._last_sample_time is not None and changed:
+                if self._pending_start is None:
+                    self._pending_start = self._last_sample_time
+                self._changed_at = now
+            # 无状态列时，需连续两次采样结果不变才认为本周期已应用完毕
+            settled = not running if state is not None else not changed
+
+            # 相对上个周期结束时进度列或行数发生变化，且已应用完毕，即视为一个周期完成
+            rows = {t: counts[t] - self._base_counts[t] for t in counts}
+            advanced = watermark is not None and watermark != self._base_watermark
+            if self._last_sample_time is not None and settled and (advanced or any(rows.values())):
+                self._close_cycle(self._changed_at or now, rows, watermark)
+                self._base_counts.update(counts)
+                self._base_watermark = watermark
+            self._prev_counts = counts
+            self._prev_watermark = watermark
+            self._last_sample_time = now
+
+    @staticmethod
+    def _pick(status: Dict[str, Any], columns: List[str]) -> Any:
+        lowered = {str(k).lower(): v for k, v in (status or {}).items()}
+        for column in columns:
+            if column in lowered:
+                return lowered[column]
+        return None
+
+    def _close_cycle(self, end: float, rows: Dict[str, int], watermark: Any):
+        """
+        记录一个完成的周期；观察到运行状态时以其首次出现为开始时间
+        
+        rows 是各表相对上个周期结束时的行数差，即净行数变化：UPDATE 不计入，
+        同一周期内的 INSERT 与 DELETE 会相互抵消。字节数按同一净变化估算，与行数口径一致
+        """
+        start = self._running_since or self._pending_start or end
+        net_rows = sum(rows.values())
+        net_bytes = sum(delta * self._row_bytes.get(t, 0) for t, delta in rows.items())
+        previous_end = self.cycles[-1]['end'] if self.cycles else None
+        period = end - previous_end if previous_end else None
+
+        self.cycles.append({
+            'start': start,
+            'end': end,
+            'duration': end - start,
+            'period': period,
+            'period_vs_interval': period / self.sync_interval if period and self.sync_interval else None,
+            'net_rows': net_rows,
+            'net_bytes': int(net_bytes),
+            'watermark': str(watermark) if watermark is not None else None
+        })
+        self._running_since = None
+        self._pending_start = None
+
+    def _estimate_row_bytes(self, table: str) -> float:
+        """按目标表样本行估算平均行字节数（每表在有数据后只估算一次）"""
+        if table not in self._row_bytes:
+            try:
+                rows = self.adapter.query_target(f"SELECT * FROM {table} LIMIT 100")
+            except Exception:
+                rows = None
+            if rows:
+                self._row_bytes[table] = estimate_result_bytes(rows) / len(rows)
+        return self._row_bytes.get(table, 0)
+
+    # ========== 预测与汇总 ==========
+
+    def predict_next_sync(self) -> Optional[float]:
+        """
+        预测下一次周期完成的时间戳：上次周期结束 + 实测平均周期（不足两次时用 sync_interval）
+
+        只有行数或进度变化的周期才能观察到，空闲周期不可见时实测周期会是 sync_interval 的数倍，
+        因此周期以 sync_interval 为上限；预测时间已过时按周期顺延到当前时间之后
+        """
+        with self._lock:
+            if not self.cycles:
+                return None
+            periods = [c['period'] for c in self.cycles if c['period']]
+            period = sum(periods) / len(periods) if periods else self.sync_interval
+            if self.sync_interval:
+                period = min(period, self.sync_interval)
+            next_sync = self.cycles[-1]['end'] + period
+        now = time.time()
+        if period > 0 and next_sync < now:
+            next_sync += math.ceil((now - next_sync) / period) * period
+        return next_sync
+
+    def summary(self) -> Dict[str, Any]:
+        """周期汇总"""
+        with self._lock:
+            cycles = [dict(c) for c in self.cycles]
+            samples = self.samples
+        periods = [c['period'] for c in cycles if c['period']]
+        result = {
+            'samples': samples,
+            'sync_interval': self.sync_interval,
+            'cycles': len(cycles),
+            'net_rows': sum(c['net_rows'] for c in cycles),
+            'net_bytes': sum(c['net_bytes'] for c in cycles),
+            'avg_cycle_duration': sum(c['duration'] for c in cycles) / len(cycles) if cycles else None,
+            'avg_period': sum(periods) / len(periods) if periods else None,
+            'next_sync': self.predict_next_sync(),
+            'cycle_details': cycles
+        }
+        if result['avg_period'] and self.sync_interval:
+            result['period_vs_interval'] = result['avg_period'] / self.sync_interval
+        return result
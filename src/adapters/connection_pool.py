@@ -0,0 +1,96 @@
+"""
+端点连接池 - 线程安全，借出前做健康检查，断线的连接直接丢弃
+"""
+
+import queue
+import threading
+import time
+import pymysql
+from contextlib import contextmanager
+from typing import Callable, Dict, Any
+
+# 表示连接已不可用的客户端错误码
+_CONNECTION_LOST_CODES = {2003, 2006, 2013, 2014, 2045, 2055}
+
+
+def is_connection_error(error: Exception) -> bool:
+    """判断异常是否意味着连接已断开"""
+    if isinstance(error, pymysql.err.InterfaceError):
+        return True
+    if isinstance(error, pymysql.err.OperationalError):
+        return bool(error.args) and error.args[0] in _CONNECTION_LOST_CODES
+    return False
+
+
+class ConnectionPool:
+    """单个数据库端点的连接池（autocommit 连接）；connect 为新建连接的函数，默认 pymysql.connect"""
+
+    def __init__(self, connect_kwargs: Dict[str, Any], max_size: int = 8, health_check_interval: float = 30,
+                 connect: Callable[..., Any] = None):
+        self.connect_kwargs = dict(connect_kwargs, autocommit=True)
+        self._connect = connect or pymysql.connect
+        self.max_size = max_size
+        self.health_check_interval = health_check_interval
+        self._idle = queue.LifoQueue()  # (conn, 最后使用时间)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+
+    def warm_up(self):
+        """预先建立一个连接，连接失败时立即报错"""
+        with self.connection():
+            pass
+
+    @contextmanager
+    def connection(self):
+        """借出一个连接，用完归还；连接错误时丢弃该连接"""
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except Exception as e:
+            if conn is not None and is_connection_error(e):
+                self._discard(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                if self._closed:
+                    self._discard(conn)
+                else:
+                    self._idle.put((conn, time.monotonic()))
+            self._slots.release()
+
+    def _checkout(self):
+        """取空闲连接，闲置过久的先 ping 检查；没有可用连接时新建"""
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect(**self.connect_kwargs)
+
+            if time.monotonic() - last_used < self.health_check_interval:
+                return conn
+
+            try:
+                conn.ping(reconnect=True)
+                return conn
+            except Exception:
+                self._discard(conn)
+
+    def _discard(self, conn):
+        """关闭连接并忽略错误"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """关闭所有空闲连接，借出中的连接归还时关闭"""
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
@@ -2,15 +2,22 @@ import time
 import pymysql
 from typing import Any, Dict
 from .base_adapter import BaseAdapter
+from .ccpr_monitor import CcprMonitor
+from ..events import get_events
 
 
 class CrossClusterAdapter(BaseAdapter):
     """跨集群CDC适配器 - 基于MatrixOne CCPR"""
     
+    # 下游订阅连接上游使用的地址
+    REPLICATION_ENDPOINTS = ('source',)
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.publication_name = None
         self.subscription_name = None
+        # 同步周期监控（cdc_config.monitor.enabled 关闭时为 None）
+        self.monitor = None
     
     def connect(self):
         """连接不同集群的MatrixOne"""
@@ -18,23 +25,13 @@ class CrossClusterAdapter(BaseAdapter):
         target_cfg = self.config['target']
         
         # 连接上游集群（Publication端）
-        self.source_conn = pymysql.connect(
-            host=source_cfg['host'],
-            port=source_cfg['port'],
-            user=source_cfg['user'],
-            password=source_cfg['password'],
-            database=source_cfg.get('database', 'mysql'),
-            charset='utf8mb4'
+        self.source_pool = self._create_pool(
+            source_cfg, database=source_cfg.get('database', 'mysql'), charset='utf8mb4'
         )
         
         # 连接下游集群（Subscription端）
-        self.target_conn = pymysql.connect(
-            host=target_cfg['host'],
-            port=target_cfg['port'],
-            user=target_cfg['user'],
-            password=target_cfg['password'],
-            database=target_cfg.get('database', 'mysql'),
-            charset='utf8mb4'
+        self.target_pool = self._create_pool(
+            target_cfg, database=target_cfg.get('database', 'mysql'), charset='utf8mb4'
         )
         
         source_account = source_cfg.get('account', 'sys')
@@ -42,13 +39,6 @@ class CrossClusterAdapter(BaseAdapter):
         print(f"✓ 已连接到上游集群 {source_account}@{source_cfg['host']}:{source_cfg['port']}")
         print(f"✓ 已连接到下游集群 {target_account}@{target_cfg['host']}:{target_cfg['port']}")
     
-    def disconnect(self):
-        """断开连接"""
-        if self.source_conn:
-            self.source_conn.close()
-        if self.target_conn:
-            self.target_conn.close()
-    
     def setup_cdc(self):
         """配置跨集群CDC - 创建Publication和Subscription"""
         cdc_cfg = self.config['cdc_config']
@@ -68,166 +58,220 @@ class CrossClusterAdapter(BaseAdapter):
         print(f"  - 同步间隔: {sync_interval}秒")
         
         # 步骤1: 在上游创建Publication
-        self._create_publication(sync_level)
+        self.create_publication(sync_level)
         
         # 步骤2: 在下游创建Subscription
-        self._create_subscription(sync_level, sync_interval)
+        self.subscription_name = self.create_subscription(sync_level, sync_interval) or self.subscription_name
+        
+        self._start_monitor()
         
         print(f"✓ 跨集群CDC配置完成")
     
-    def _create_publication(self, sync_level: str):
-        """在上游集群创建Publication"""
+    def create_publication(self, sync_level: str, name: str = None, target_account: str = None, table: str = None):
+        """在上游集群创建Publication（默认使用当前Publication名称、下游账户和 source.table）"""
         source_cfg = self.config['source']
         target_cfg = self.config['target']
-        target_account = target_cfg.get('account', 'sys')
+        name = name or self.publication_name
+        target_account = target_account or target_cfg.get('account', 'sys')
         
         try:
-            with self.source_conn.cursor() as cursor:
-                if sync_level == 'database':
-                    database = source_cfg.get('database', 'test_db')
-                    sql = f"CREATE PUBLICATION {self.publication_name} DATABASE {database} ACCOUNT {target_account}"
-                    cursor.execute(sql)
-                    print(f"  ✓ 创建Publication: {self.publication_name} (DATABASE {database})")
-                
-                elif sync_level == 'table':
-                    database = source_cfg.get('database', 'test_db')
-                    table = source_cfg.get('table', 'cdc_test_base')
-                    sql = f"CREATE PUBLICATION {self.publication_name} DATABASE {database} TABLE {table} ACCOUNT {target_account}"
-                    cursor.execute(sql)
-                    print(f"  ✓ 创建Publication: {self.publication_name} (TABLE {database}.{table})")
-                
-                elif sync_level == 'account':
-                    sql = f"CREATE PUBLICATION {self.publication_name} ACCOUNT {target_account}"
-                    cursor.execute(sql)
-                    print(f"  ✓ 创建Publication: {self.publication_name} (ACCOUNT级别)")
-                
-                self.source_conn.commit()
+            if sync_level == 'database':
+                database = source_cfg.get('database', 'test_db')
+                sql = f"CREATE PUBLICATION {name} DATABASE {database} ACCOUNT {target_account}"
+                self.execute_on_source(sql)
+                print(f"  ✓ 创建Publication: {name} (DATABASE {database})")
+            
+            elif sync_level == 'table':
+                database = source_cfg.get('database', 'test_db')
+                table = table or source_cfg.get('table', 'cdc_test_base')
+                sql = f"CREATE PUBLICATION {name} DATABASE {database} TABLE {table} ACCOUNT {target_account}"
+                self.execute_on_source(sql)
+                print(f"  ✓ 创建Publication: {name} (TABLE {database}.{table})")
+            
+            elif sync_level == 'account':
+                sql = f"CREATE PUBLICATION {name} ACCOUNT {target_account}"
+                self.execute_on_source(sql)
+                print(f"  ✓ 创建Publication: {name} (ACCOUNT级别)")
         
         except Exception as e:
             print(f"  ✗ 创建Publication失败: {str(e)}")
             raise
     
-    def _create_subscription(self, sync_level: str, sync_interval: int):
-        """在下游集群创建Subscription"""
+    def create_subscription(self, sync_level: str, sync_interval: int, publication: str = None,
+                            database: str = None, table: str = None) -> str:
+        """在下游集群创建Subscription，返回Subscription名称（默认订阅当前Publication到目标库的 target.table）"""
         source_cfg = self.config['source']
         target_cfg = self.config['target']
+        publication = publication or self.publication_name
+        database = database or target_cfg.get('database', 'test_db')
         
         # 构建连接字符串
         source_account = source_cfg.get('account', 'sys')
         source_user = source_cfg.get('user', 'root')
         source_password = source_cfg.get('password', '111')
-        source_host = source_cfg['host']
-        source_port = source_cfg['port']
+        # 启用网络代理时复制链路经由代理地址
+        source_host = source_cfg.get('replication_host', source_cfg['host'])
+        source_port = source_cfg.get('replication_port', source_cfg['port'])
         
         conn_str = f"mysql://{source_account}#{source_user}:{source_password}@{source_host}:{source_port}"
         
         try:
-            with self.target_conn.cursor() as cursor:
-                if sync_level == 'database':
-                    database = target_cfg.get('database', 'test_db')
-                    sql = f"""
-                    CREATE DATABASE IF NOT EXISTS {database}
-                    FROM '{conn_str}'
-                    PUBLICATION {self.publication_name}
-                    SYNC INTERVAL {sync_interval}
-                    """
-                    cursor.execute(sql)
-                    self.subscription_name = database
-                    print(f"  ✓ 创建Subscription: {database} (DATABASE级别)")
-                
-                elif sync_level == 'table':
-                    database = target_cfg.get('database', 'test_db')
-                    table = target_cfg.get('table', 'cdc_test_base')
-                    sql = f"""
-                    CREATE TABLE IF NOT EXISTS {database}.{table}
-                    FROM '{conn_str}'
-                    PUBLICATION {self.publication_name}
-                    SYNC INTERVAL {sync_interval}
-                    """
-                    cursor.execute(sql)
-                    self.subscription_name = f"{database}.{table}"
-                    print(f"  ✓ 创建Subscription: {database}.{table} (TABLE级别)")
-                
-                self.target_conn.commit()
+            if sync_level == 'database':
+                sql = f"""
+                CREATE DATABASE IF NOT EXISTS {database}
+                FROM '{conn_str}'
+                PUBLICATION {publication}
+                SYNC INTERVAL {sync_interval}
+                """
+                self.execute_on_target(sql)
+                print(f"  ✓ 创建Subscription: {database} (DATABASE级别)")
+                return database
+            
+            elif sync_level == 'table':
+                table = table or target_cfg.get('table', 'cdc_test_base')
+                sql = f"""
+                CREATE TABLE IF NOT EXISTS {database}.{table}
+                FROM '{conn_str}'
+                PUBLICATION {publication}
+                SYNC INTERVAL {sync_interval}
+                """
+                self.execute_on_target(sql)
+                print(f"  ✓ 创建Subscription: {database}.{table} (TABLE级别)")
+                return f"{database}.{table}"
         
         except Exception as e:
             print(f"  ✗ 创建Subscription失败: {str(e)}")
             raise
     
+    def _start_monitor(self):
+        """启动同步周期监控"""
+        cdc_cfg = self.config['cdc_config']
+        monitor_cfg = cdc_cfg.get('monitor', {})
+        if not monitor_cfg.get('enabled', True) or self.monitor:
+            return
+        self.monitor = CcprMonitor(self, cdc_cfg.get('sync_interval', 60), monitor_cfg)
+        self.monitor.start()
+        print(f"  ✓ CCPR周期监控已启动 (采样间隔 {self.monitor.sample_interval}s)")
+    
+    def export_cdc_state(self) -> Dict[str, Any]:
+        """导出Publication和Subscription名称"""
+        return {
+            'publication_name': self.publication_name,
+            'subscription_name': self.subscription_name
+        }
+    
+    def restore_cdc_state(self, state: Dict[str, Any]) -> bool:
+        """接管已有的Publication/Subscription，Subscription不存在时视为失效"""
+        self.publication_name = state.get('publication_name')
+        self.subscription_name = state.get('subscription_name')
+        
+        if self.publication_name and self.subscription_name and self.check_subscription_status():
+            print(f"✓ 复用跨集群CDC: {self.publication_name} -> {self.subscription_name}")
+            self._start_monitor()
+            return True
+        
+        self.publication_name = None
+        self.subscription_name = None
+        return False
+    
     def teardown_cdc(self):
         """清理CDC配置 - 删除Subscription和Publication"""
         print("\n清理跨集群CDC配置:")
         
+        if self.monitor:
+            self.monitor.stop()
+            self.monitor = None
+        
         # 步骤1: 删除Subscription
         if self.subscription_name:
-            try:
-                with self.target_conn.cursor() as cursor:
-                    sql = f"DROP CCPR SUBSCRIPTION {self.subscription_name}"
-                    cursor.execute(sql)
-                    self.target_conn.commit()
-                    print(f"  ✓ 删除Subscription: {self.subscription_name}")
-            except Exception as e:
-                print(f"  ⚠ 删除Subscription失败: {str(e)}")
+            self.drop_subscription(self.subscription_name)
         
         # 步骤2: 删除Publication
         if self.publication_name:
-            try:
-                with self.source_conn.cursor() as cursor:
-                    sql = f"DROP PUBLICATION {self.publication_name}"
-                    cursor.execute(sql)
-                    self.source_conn.commit()
-                    print(f"  ✓ 删除Publication: {self.publication_name}")
-            except Exception as e:
-                print(f"  ⚠ 删除Publication失败: {str(e)}")
-    
-    def execute_on_source(self, sql: str, params: tuple = None) -> Any:
-        """在源集群执行SQL"""
-        with self.source_conn.cursor() as cursor:
-            cursor.execute(sql, params)
-            self.source_conn.commit()
-            return cursor.fetchall()
-    
-    def execute_on_target(self, sql: str, params: tuple = None) -> Any:
-        """在目标集群执行SQL"""
-        with self.target_conn.cursor() as cursor:
-            cursor.execute(sql, params)
-            self.target_conn.commit()
-            return cursor.fetchall()
+            self.drop_publication(self.publication_name)
+    
+    def drop_subscription(self, name: str) -> bool:
+        """删除下游Subscription"""
+        try:
+            self.execute_on_target(f"DROP CCPR SUBSCRIPTION {name}")
+            print(f"  ✓ 删除Subscription: {name}")
+            return True
+        except Exception as e:
+            print(f"  ⚠ 删除Subscription失败 ({name}): {str(e)}")
+            return False
+    
+    def drop_publication(self, name: str) -> bool:
+        """删除上游Publication"""
+        try:
+            self.execute_on_source(f"DROP PUBLICATION {name}")
+            print(f"  ✓ 删除Publication: {name}")
+            return True
+        except Exception as e:
+            print(f"  ⚠ 删除Publication失败 ({name}): {str(e)}")
+            return False
     
     def validate_sync(self, table: str, timeout: int = 120) -> bool:
-        """验证跨集群数据同步"""
+        """验证跨集群数据同步，观察到同步周期后直接等待到预测的下一次同步"""
         check_interval = self.config['validation'].get('check_interval', 10)
-        elapsed = 0
+        start = time.time()
+        deadline = start + timeout
         
-        print(f"  等待数据同步 (超时: {timeout}s)...")
+        self._on_sync_start(table)
+        events = get_events()
+        events.emit('sync_wait', table=table, timeout=timeout)
         
-        while elapsed < timeout:
+        while True:
+            elapsed = time.time() - start
             try:
-                source_count = self.get_source_row_count(table)
-                target_count = self.get_target_row_count(table)
-                
-                print(f"    源: {source_count} 行, 目标: {target_count} 行 ({elapsed}s)")
+                source_count, target_count = self.poll_counts(table, elapsed=elapsed)
                 
-                if source_count == target_count and source_count > 0:
-                    print(f"  ✓ 数据同步完成")
+                if self._is_synced(source_count, target_count):
+                    events.emit('synced', table=table, elapsed=time.time() - start)
                     return True
             
             except Exception as e:
-                print(f"    检查同步状态时出错: {str(e)}")
+                events.emit('poll_error', table=table, error=str(e))
             
-            time.sleep(check_interval)
-            elapsed += check_interval
-        
-        return False
+            now = time.time()
+            if now >= deadline:
+                return False
+            self.sleep(min(self._poll_wait(table, check_interval), deadline - now))
+    
+    def _is_synced(self, source_count: int, target_count: int) -> bool:
+        """订阅建立前目标表可能为空，需观察到数据才算同步完成"""
+        return source_count == target_count and source_count > 0
+    
+    def _on_sync_start(self, table: str):
+        """开始观察该表的同步周期"""
+        if self.monitor:
+            self.monitor.watch(table)
+    
+    def _poll_wait(self, table: str, wait: float) -> float:
+        """
+        观察到同步周期后直接等待到预测的下一次同步（加 sync_grace），
+        最长不超过 sync_interval + sync_grace，避免预测偏晚时越过实际同步
+        """
+        next_sync = self.monitor.predict_next_sync() if self.monitor else None
+        if not next_sync:
+            return wait
+        grace = self.config.get('validation', {}).get('sync_grace', 2)
+        wait = min(next_sync + grace - time.time(), self.monitor.sync_interval + grace)
+        get_events().emit('sync_predicted', table=table, wait=wait)
+        return wait
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """CCPR同步周期指标"""
+        if not self.monitor:
+            return {}
+        return {'ccpr': self.monitor.summary()}
     
-    def check_subscription_status(self) -> Dict[str, Any]:
+    def check_subscription_status(self, quiet: bool = False) -> Dict[str, Any]:
         """检查Subscription状态"""
         try:
-            with self.target_conn.cursor(pymysql.cursors.DictCursor) as cursor:
-                sql = f"SHOW CCPR SUBSCRIPTION {self.subscription_name}"
-                cursor.execute(sql)
-                result = cursor.fetchone()
-                return result if result else {}
+            sql = f"SHOW CCPR SUBSCRIPTION {self.subscription_name}"
+            result = self.query_target(sql, cursor_class=pymysql.cursors.DictCursor)
+            return result[0] if result else {}
         except Exception as e:
-            print(f"  ⚠ 查询Subscription状态失败: {str(e)}")
+            if not quiet:
+                print(f"  ⚠ 查询Subscription状态失败: {str(e)}")
             return {}
@@ -4,11 +4,17 @@ Flink CDC 适配器 - MySQL 到 MO 通过 Flink CDC
 """
 
 import time
+import signal
 import subprocess
-import pymysql
 import os
-from typing import Any, Dict, List
+import tempfile
+from typing import Any, Dict, List, Optional
 from .base_adapter import BaseAdapter
+from .readiness import wait_until, tcp_port_open, LogMarkerProbe, process_ready
+from .log_follower import LogFollower, LogMetrics
+from .kafka_lag import KafkaLagSampler
+from ..tracing import get_tracer
+from ..events import get_events
 
 
 class FlinkCdcAdapter(BaseAdapter):
@@ -19,7 +25,30 @@ class FlinkCdcAdapter(BaseAdapter):
         self.producer_process = None
         self.consumer_process = None
         self.kafka_process = None
+        # 会话模式下从状态文件接管的进程号，及其进程标识（启动时间+命令行，防止进程号被复用后误发信号）
+        self.producer_pid = None
+        self.consumer_pid = None
+        self._identities: Dict[int, str] = {}
         self.flink_cdc_path = config.get('flink_cdc', {}).get('path', '../flink-cdc')
+        self.readiness_cfg = config.get('flink_cdc', {}).get('readiness', {})
+        # 各组件实测的就绪耗时（秒）
+        self.readiness_times = {}
+        # Kafka分段延迟采样（flink_cdc.kafka_lag.enabled 开启）
+        self.lag_sampler = None
+        
+        # 每次运行使用独立的日志目录
+        log_root = config.get('flink_cdc', {}).get('log_dir') or os.path.join(tempfile.gettempdir(), 'flink_cdc_runs')
+        run_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self._init_log_followers(os.path.join(log_root, run_id))
+    
+    def _init_log_followers(self, log_dir: str):
+        """设置日志目录并为Producer/Consumer日志创建跟踪器"""
+        patterns = self.config.get('flink_cdc', {}).get('log_metrics', {})
+        self.log_dir = log_dir
+        self.producer_log_path = os.path.join(log_dir, 'producer.log')
+        self.consumer_log_path = os.path.join(log_dir, 'consumer.log')
+        self.producer_log = LogFollower(self.producer_log_path, LogMetrics(patterns))
+        self.consumer_log = LogFollower(self.consumer_log_path, LogMetrics(patterns))
     
     def connect(self):
         """连接MySQL（源）和MatrixOne（目标）"""
@@ -27,35 +56,14 @@ class FlinkCdcAdapter(BaseAdapter):
         target_cfg = self.config['target']
         
         # 连接MySQL源
-        self.source_conn = pymysql.connect(
-            host=source_cfg['host'],
-            port=source_cfg['port'],
-            user=source_cfg['user'],
-            password=source_cfg['password'],
-            database=source_cfg['database'],
-            charset='utf8mb4'
-        )
+        self.source_pool = self._create_pool(source_cfg, charset='utf8mb4')
         
         # 连接MatrixOne目标
-        self.target_conn = pymysql.connect(
-            host=target_cfg['host'],
-            port=target_cfg['port'],
-            user=target_cfg['user'],
-            password=target_cfg['password'],
-            database=target_cfg['database'],
-            charset='utf8mb4'
-        )
+        self.target_pool = self._create_pool(target_cfg, charset='utf8mb4')
         
         print(f"✓ 已连接到MySQL源 ({source_cfg['host']}:{source_cfg['port']})")
         print(f"✓ 已连接到MO目标 ({target_cfg['host']}:{target_cfg['port']})")
     
-    def disconnect(self):
-        """断开连接"""
-        if self.source_conn:
-            self.source_conn.close()
-        if self.target_conn:
-            self.target_conn.close()
-    
     def setup_cdc(self):
         """配置Flink CDC - 启动Kafka、Producer和Consumer"""
         flink_cfg = self.config.get('flink_cdc', {})
@@ -72,6 +80,9 @@ class FlinkCdcAdapter(BaseAdapter):
         print(f"  - 表: {', '.join(tables)}")
         print(f"  - Kafka Topic: {topic}")
         print(f"  - Consumer Batch Size: {consumer_batch_size}")
+        print(f"  - 日志目录: {self.log_dir}")
+        
+        os.makedirs(self.log_dir, exist_ok=True)
         
         # 步骤1: 启动Kafka
         self._start_kafka()
@@ -82,11 +93,10 @@ class FlinkCdcAdapter(BaseAdapter):
         # 步骤3: 启动Consumer
         self._start_consumer(database, topic, consumer_batch_size, group)
         
-        # 等待服务启动
-        print("  等待Flink CDC服务启动...")
-        time.sleep(10)
+        self._init_lag_sampler()
         
-        print(f"✓ Flink CDC配置完成")
+        total = sum(self.readiness_times.values())
+        print(f"✓ Flink CDC配置完成 (就绪耗时 {total:.1f}s)")
     
     def _start_kafka(self):
         """启动Kafka（使用docker-compose）"""
@@ -105,9 +115,18 @@ class FlinkCdcAdapter(BaseAdapter):
             start_cmd = f"cd {self.flink_cdc_path} && docker-compose up -d"
             subprocess.run(start_cmd, shell=True, check=True)
             
-            # 等待Kafka启动
-            time.sleep(15)
-            print("  ✓ Kafka已启动")
+            # 等待Kafka端口可连接
+            host = self.readiness_cfg.get('kafka_host', 'localhost')
+            port = self.readiness_cfg.get('kafka_port', 9092)
+            with get_tracer().span('ready:kafka', host=host, port=port):
+                elapsed = wait_until(
+                    lambda: tcp_port_open(host, port),
+                    timeout=self.readiness_cfg.get('kafka_timeout', 120),
+                    interval=0.5,
+                    description=f"Kafka ({host}:{port})"
+                )
+            self.readiness_times['kafka'] = elapsed
+            print(f"  ✓ Kafka已启动 (就绪 {elapsed:.1f}s)")
             
         except Exception as e:
             print(f"  ✗ 启动Kafka失败: {str(e)}")
@@ -129,7 +148,7 @@ class FlinkCdcAdapter(BaseAdapter):
             ]
             
             # 启动Producer进程（后台运行）
-            log_file = open('/tmp/flink_cdc_producer.log', 'w')
+            log_file = open(self.producer_log_path, 'w')
             self.producer_process = subprocess.Popen(
                 cmd,
                 stdout=log_file,
@@ -137,13 +156,8 @@ class FlinkCdcAdapter(BaseAdapter):
                 cwd=self.flink_cdc_path
             )
             
-            time.sleep(5)
-            
-            # 检查进程是否还在运行
-            if self.producer_process.poll() is None:
-                print(f"  ✓ Producer已启动 (PID: {self.producer_process.pid})")
-            else:
-                raise Exception("Producer启动后立即退出")
+            self._wait_process_ready('Producer', self.producer_process, self.producer_log,
+                                     self.readiness_cfg.get('producer_markers', []))
             
         except Exception as e:
             print(f"  ✗ 启动Producer失败: {str(e)}")
@@ -165,7 +179,7 @@ class FlinkCdcAdapter(BaseAdapter):
             ]
             
             # 启动Consumer进程（后台运行）
-            log_file = open('/tmp/flink_cdc_consumer.log', 'w')
+            log_file = open(self.consumer_log_path, 'w')
             self.consumer_process = subprocess.Popen(
                 cmd,
                 stdout=log_file,
@@ -173,47 +187,63 @@ class FlinkCdcAdapter(BaseAdapter):
                 cwd=self.flink_cdc_path
             )
             
-            time.sleep(5)
-            
-            # 检查进程是否还在运行
-            if self.consumer_process.poll() is None:
-                print(f"  ✓ Consumer已启动 (PID: {self.consumer_process.pid})")
-            else:
-                raise Exception("Consumer启动后立即退出")
+            self._wait_process_ready('Consumer', self.consumer_process, self.consumer_log,
+                                     self.readiness_cfg.get('consumer_markers', []))
             
         except Exception as e:
             print(f"  ✗ 启动Consumer失败: {str(e)}")
             raise
     
+    def _init_lag_sampler(self):
+        """按配置创建Kafka延迟采样器，Kafka不可达或缺少依赖时仅告警"""
+        flink_cfg = self.config.get('flink_cdc', {})
+        lag_cfg = flink_cfg.get('kafka_lag', {})
+        if not lag_cfg.get('enabled', False) or self.lag_sampler:
+            return
+        
+        host = self.readiness_cfg.get('kafka_host', 'localhost')
+        port = self.readiness_cfg.get('kafka_port', 9092)
+        bootstrap_servers = lag_cfg.get('bootstrap_servers', f"{host}:{port}")
+        try:
+            self.lag_sampler = KafkaLagSampler(
+                bootstrap_servers,
+                flink_cfg.get('topic', 'cdc_test_topic'),
+                flink_cfg.get('group', 'cdc_test_group'),
+                request_timeout_ms=lag_cfg.get('request_timeout_ms', 5000),
+                threshold=lag_cfg.get('bottleneck_threshold', 0),
+                window=lag_cfg.get('bottleneck_window', 1)
+            )
+            print(f"  ✓ Kafka延迟采样已启用 ({bootstrap_servers})")
+        except Exception as e:
+            print(f"  ⚠ Kafka延迟采样不可用: {str(e)}")
+    
+    def _wait_process_ready(self, name: str, process, follower: LogFollower, markers: List[str]):
+        """等待Producer/Consumer就绪：日志出现就绪标记，未配置标记时检查进程存活"""
+        probe = LogMarkerProbe(follower, markers) if markers else None
+        check = process_ready(process, name, probe, min_uptime=self.readiness_cfg.get('min_uptime', 2))
+        
+        with get_tracer().span(f"ready:{name.lower()}", pid=process.pid):
+            elapsed = wait_until(
+                check,
+                timeout=self.readiness_cfg.get('process_timeout', 60),
+                description=name
+            )
+        self.readiness_times[name.lower()] = elapsed
+        print(f"  ✓ {name}已启动 (PID: {process.pid}, 就绪 {elapsed:.1f}s)")
+    
     def teardown_cdc(self):
         """清理Flink CDC - 停止Producer、Consumer和Kafka"""
         print("\n清理Flink CDC:")
         
-        # 停止Producer
-        if self.producer_process:
-            try:
-                self.producer_process.terminate()
-                self.producer_process.wait(timeout=10)
-                print("  ✓ Producer已停止")
-            except Exception as e:
-                print(f"  ⚠ 停止Producer失败: {str(e)}")
-                try:
-                    self.producer_process.kill()
-                except:
-                    pass
+        self._stop_process('Producer', self.producer_process, self.producer_pid)
+        self._stop_process('Consumer', self.consumer_process, self.consumer_pid)
+        self.producer_process = self.consumer_process = None
+        self.producer_pid = self.consumer_pid = None
+        self._identities = {}
         
-        # 停止Consumer
-        if self.consumer_process:
-            try:
-                self.consumer_process.terminate()
-                self.consumer_process.wait(timeout=10)
-                print("  ✓ Consumer已停止")
-            except Exception as e:
-                print(f"  ⚠ 停止Consumer失败: {str(e)}")
-                try:
-                    self.consumer_process.kill()
-                except:
-                    pass
+        if self.lag_sampler:
+            self.lag_sampler.close()
+            self.lag_sampler = None
         
         # 停止Kafka（可选）
         flink_cfg = self.config.get('flink_cdc', {})
@@ -225,70 +255,198 @@ class FlinkCdcAdapter(BaseAdapter):
             except Exception as e:
                 print(f"  ⚠ 停止Kafka失败: {str(e)}")
     
-    def execute_on_source(self, sql: str, params: tuple = None) -> Any:
-        """在MySQL源执行SQL"""
-        with self.source_conn.cursor() as cursor:
-            cursor.execute(sql, params)
-            self.source_conn.commit()
-            return cursor.fetchall()
-    
-    def execute_on_target(self, sql: str, params: tuple = None) -> Any:
-        """在MO目标执行SQL"""
-        with self.target_conn.cursor() as cursor:
-            cursor.execute(sql, params)
-            self.target_conn.commit()
-            return cursor.fetchall()
-    
     def validate_sync(self, table: str, timeout: int = 120) -> bool:
         """验证Flink CDC数据同步"""
         check_interval = self.config['validation'].get('check_interval', 10)
         elapsed = 0
         
-        print(f"  等待Flink CDC同步 (超时: {timeout}s)...")
+        events = get_events()
+        events.emit('sync_wait', table=table, timeout=timeout)
         
         while elapsed < timeout:
             try:
-                source_count = self.get_source_row_count(table)
-                target_count = self.get_target_row_count(table)
-                
-                print(f"    MySQL源: {source_count} 行, MO目标: {target_count} 行 ({elapsed}s)")
+                source_count, target_count = self.poll_counts(table, elapsed=elapsed, **self._poll_fields(table))
+                self._on_poll(table, source_count, target_count)
                 
-                if source_count == target_count and source_count > 0:
-                    print(f"  ✓ Flink CDC同步完成")
+                if self._is_synced(source_count, target_count):
+                    events.emit('synced', table=table, elapsed=elapsed)
                     return True
             
             except Exception as e:
-                print(f"    检查同步状态时出错: {str(e)}")
+                events.emit('poll_error', table=table, error=str(e))
             
-            time.sleep(check_interval)
+            self.sleep(check_interval)
             elapsed += check_interval
         
         return False
     
+    def _poll_fields(self, table: str) -> Dict[str, Any]:
+        """轮询事件附带 Consumer 日志指标"""
+        consumer = self.get_metrics()['consumer']
+        return {'consumer_rows': consumer['rows'], 'consumer_rows_per_sec': consumer['rows_per_sec'],
+                'consumer_errors': consumer['errors']}
+    
+    def _is_synced(self, source_count: int, target_count: int) -> bool:
+        """Producer/Consumer 启动前目标表可能为空，需观察到数据才算同步完成"""
+        return source_count == target_count and source_count > 0
+    
+    def _on_poll(self, table: str, source_count: int, target_count: int):
+        self._sample_lag(source_count, target_count)
+    
+    def _sample_lag(self, source_count: int, target_count: int):
+        """与源/目标行数一起采样Kafka积压，输出积压所在阶段"""
+        if not self.lag_sampler:
+            return
+        try:
+            with get_tracer().span('kafka_lag') as span:
+                sample = self.lag_sampler.sample(source_count, target_count)
+                span.set_attribute('consumer_lag', sample['consumer_lag'])
+        except Exception as e:
+            print(f"    ⚠ Kafka延迟采样失败: {str(e)}")
+            return
+        
+        get_events().emit('kafka_lag', produced=sample['produced'], committed=sample['committed'],
+                          consumer_lag=sample['consumer_lag'], bottleneck=sample['bottleneck'])
+    
+    def _stop_process(self, name: str, process, pid: int = None):
+        """停止Producer/Consumer：自己启动的用 Popen，接管的按进程号发送信号"""
+        if process:
+            try:
+                process.terminate()
+                process.wait(timeout=10)
+                print(f"  ✓ {name}已停止")
+            except Exception as e:
+                print(f"  ⚠ 停止{name}失败: {str(e)}")
+                try:
+                    process.kill()
+                except:
+                    pass
+        
+        elif pid and self._pid_alive(pid):
+            try:
+                os.kill(pid, signal.SIGTERM)
+                deadline = time.time() + 10
+                while self._pid_alive(pid) and time.time() < deadline:
+                    time.sleep(0.2)
+                if self._pid_alive(pid):
+                    os.kill(pid, signal.SIGKILL)
+                print(f"  ✓ {name}已停止 (PID: {pid})")
+            except Exception as e:
+                print(f"  ⚠ 停止{name}失败: {str(e)}")
+        
+        elif pid and pid in self._identities:
+            print(f"  ⚠ {name} (PID: {pid}) 已退出或进程号已被其他进程复用，不发送信号")
+    
+    @staticmethod
+    def _process_identity(pid: int) -> Optional[str]:
+        """
+        进程标识：启动时间 + 命令行，进程不存在或无法读取时返回 None
+        
+        优先读取 /proc，没有 /proc 的系统使用 ps
+        """
+        try:
+            with open(f"/proc/{pid}/stat", 'rb') as f:
+                # comm 字段可能含空格和括号，从最后一个 ')' 之后开始第20个字段是 starttime
+                start_time = f.read().rsplit(b')', 1)[1].split()[19].decode()
+            with open(f"/proc/{pid}/cmdline", 'rb') as f:
+                cmdline = f.read().replace(b'\0', b' ').decode('utf-8', errors='replace').strip()
+            return f"{start_time}:{cmdline}"
+        except (OSError, IndexError):
+            pass
+        try:
+            output = subprocess.run(['ps', '-p', str(pid), '-o', 'lstart=,args='],
+                                    capture_output=True, text=True, timeout=5).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return output or None
+    
+    def _pid_alive(self, pid: int) -> bool:
+        """接管的进程仍在运行且仍是记录时的同一个进程（启动时间和命令行一致）"""
+        identity = self._identities.get(pid)
+        return identity is not None and self._process_identity(pid) == identity
+    
+    def export_cdc_state(self) -> Dict[str, Any]:
+        """导出Producer/Consumer进程号和进程标识"""
+        producer_pid = self.producer_process.pid if self.producer_process else self.producer_pid
+        consumer_pid = self.consumer_process.pid if self.consumer_process else self.consumer_pid
+        return {
+            'producer_pid': producer_pid,
+            'consumer_pid': consumer_pid,
+            'producer_identity': self._identities.get(producer_pid) or self._process_identity(producer_pid),
+            'consumer_identity': self._identities.get(consumer_pid) or self._process_identity(consumer_pid),
+            'log_dir': self.log_dir
+        }
+    
+    def restore_cdc_state(self, state: Dict[str, Any]) -> bool:
+        """接管仍在运行的Producer/Consumer；任一进程已退出、或进程号已被其他进程复用则视为失效"""
+        producer_pid = state.get('producer_pid')
+        consumer_pid = state.get('consumer_pid')
+        self._identities = {pid: state.get(f"{name}_identity")
+                            for name, pid in (('producer', producer_pid), ('consumer', consumer_pid)) if pid}
+        
+        if not (producer_pid and consumer_pid and self._pid_alive(producer_pid) and self._pid_alive(consumer_pid)):
+            if producer_pid and consumer_pid:
+                print(f"  ⚠ Flink CDC进程 (Producer PID: {producer_pid}, Consumer PID: {consumer_pid}) "
+                      f"已退出或进程标识不匹配，不接管")
+            self._identities = {}
+            return False
+        
+        self.producer_pid = producer_pid
+        self.consumer_pid = consumer_pid
+        if state.get('log_dir'):
+            self._init_log_followers(state['log_dir'])
+            # 之前运行已统计过的日志不再读取，指标从接管时开始累计
+            self.producer_log.seek_end()
+            self.consumer_log.seek_end()
+        print(f"✓ 复用Flink CDC进程 (Producer PID: {producer_pid}, Consumer PID: {consumer_pid})")
+        self._init_lag_sampler()
+        return True
+    
     def check_producer_status(self) -> bool:
         """检查Producer状态"""
         if self.producer_process:
             return self.producer_process.poll() is None
+        if self.producer_pid:
+            return self._pid_alive(self.producer_pid)
         return False
     
     def check_consumer_status(self) -> bool:
         """检查Consumer状态"""
         if self.consumer_process:
             return self.consumer_process.poll() is None
+        if self.consumer_pid:
+            return self._pid_alive(self.consumer_pid)
         return False
-    
+
+    def check_kafka_status(self) -> bool:
+        """检查Kafka端口是否可连接"""
+        return tcp_port_open(self.readiness_cfg.get('kafka_host', 'localhost'),
+                             self.readiness_cfg.get('kafka_port', 9092))
+
     def get_producer_log(self, lines: int = 50) -> str:
         """获取Producer日志"""
         try:
-            with open('/tmp/flink_cdc_producer.log', 'r') as f:
-                return ''.join(f.readlines()[-lines:])
-        except:
+            return self.producer_log.tail(lines)
+        except OSError:
             return "无法读取Producer日志"
     
     def get_consumer_log(self, lines: int = 50) -> str:
         """获取Consumer日志"""
         try:
-            with open('/tmp/flink_cdc_consumer.log', 'r') as f:
-                return ''.join(f.readlines()[-lines:])
-        except:
+            return self.consumer_log.tail(lines)
+        except OSError:
             return "无法读取Consumer日志"
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """增量读取日志，返回Producer/Consumer的吞吐和错误指标及Kafka积压汇总"""
+        self.producer_log.poll()
+        self.consumer_log.poll()
+        metrics = {
+            'producer': self.producer_log.metrics.snapshot(),
+            'consumer': self.consumer_log.metrics.snapshot(),
+            'readiness': dict(self.readiness_times),
+            'log_dir': self.log_dir
+        }
+        if self.lag_sampler:
+            metrics['kafka_lag'] = self.lag_sampler.summary()
+        return metrics
@@ -0,0 +1,130 @@
+"""
+Kafka 分段延迟采样 - Topic 末端 offset 与 Consumer Group 已提交 offset 的差值
+与源/目标行数一起采样，区分积压在 Producer（binlog→Kafka）还是 Consumer（Kafka→MO）
+
+积压不超过阈值视为无积压；判断结果需连续 window 次采样一致才切换，避免在两个阶段之间来回跳动。
+本地验证见 scripts/kafka_lag_check.py
+"""
+
+import time
+from typing import Dict, Any, List
+
+
+class KafkaLagSampler:
+    """采样单个 topic / consumer group 的 offset 和积压"""
+
+    def __init__(self, bootstrap_servers: str, topic: str, group: str, request_timeout_ms: int = 5000,
+                 threshold: int = 0, window: int = 1):
+        # kafka-python 导入较慢，仅在启用采样时导入
+        try:
+            from kafka import KafkaAdminClient, KafkaConsumer, TopicPartition
+        except ImportError:  # 可选依赖，仅 flink_cdc 分段延迟采样需要
+            raise ImportError("Kafka延迟采样需要安装 kafka-python: pip install kafka-python")
+
+        self._topic_partition = TopicPartition
+        self.topic = topic
+        self.group = group
+        self.admin = KafkaAdminClient(bootstrap_servers=bootstrap_servers, request_timeout_ms=request_timeout_ms)
+        # 不加入消费组，仅用于查询末端offset
+        self.consumer = KafkaConsumer(bootstrap_servers=bootstrap_servers, enable_auto_commit=False,
+                                      request_timeout_ms=request_timeout_ms + 1000)
+        self.samples: List[Dict[str, Any]] = []
+        # 判断阈值（消息数/行数）和切换所需的连续采样次数
+        self.threshold = threshold
+        self.window = max(window, 1)
+        self._verdict = None
+        self._candidate = None
+        self._candidate_count = 0
+
+    def _partitions(self) -> List:
+        """topic 的所有分区"""
+        partitions = self.consumer.partitions_for_topic(self.topic) or set()
+        return [self._topic_partition(self.topic, p) for p in sorted(partitions)]
+
+    def sample(self, source_count: int = None, target_count: int = None) -> Dict[str, Any]:
+        """
+        采样一次各分区的末端offset、已提交offset和积压
+
+        produced: topic 中累计的消息数（Producer 阶段产出）
+        committed: Consumer Group 已提交的位置（Consumer 阶段进度）
+        consumer_lag: 已进入 Kafka 但尚未被消费提交的消息数
+        """
+        partitions = self._partitions()
+        end_offsets = self.consumer.end_offsets(partitions) if partitions else {}
+        committed = {
+            tp: meta.offset
+            for tp, meta in self.admin.list_consumer_group_offsets(self.group).items()
+            if tp.topic == self.topic
+        }
+
+        per_partition = {}
+        for tp in partitions:
+            end = end_offsets.get(tp, 0)
+            done = max(committed.get(tp, 0), 0)
+            per_partition[tp.partition] = {'end': end, 'committed': done, 'lag': max(end - done, 0)}
+
+        sample = {
+            'time': time.time(),
+            'produced': sum(p['end'] for p in per_partition.values()),
+            'committed': sum(p['committed'] for p in per_partition.values()),
+            'consumer_lag': sum(p['lag'] for p in per_partition.values()),
+            'partitions': per_partition
+        }
+        if source_count is not None and target_count is not None:
+            sample['source_rows'] = source_count
+            sample['target_rows'] = target_count
+            sample['row_gap'] = source_count - target_count
+            sample['raw_bottleneck'] = self._bottleneck(sample, self.threshold)
+            sample['bottleneck'] = self._settle(sample['raw_bottleneck'])
+
+        self.samples.append(sample)
+        return sample
+
+    @staticmethod
+    def _bottleneck(sample: Dict[str, Any], threshold: int = 0) -> str:
+        """
+        判断单次采样的积压阶段：Kafka中未消费消息超过阈值为consumer，
+        否则行数差超过阈值时来自producer，都不超过为none
+        """
+        if sample['consumer_lag'] > threshold:
+            return 'consumer'
+        if sample['row_gap'] > threshold:
+            return 'producer'
+        return 'none'
+
+    def _settle(self, verdict: str) -> str:
+        """滞回：首次采样直接采用，之后新的判断需连续 window 次一致才替换当前结论"""
+        if self._verdict is None or verdict == self._verdict:
+            self._verdict = verdict
+            self._candidate, self._candidate_count = None, 0
+            return self._verdict
+        if verdict == self._candidate:
+            self._candidate_count += 1
+        else:
+            self._candidate, self._candidate_count = verdict, 1
+        if self._candidate_count >= self.window:
+            self._verdict = verdict
+            self._candidate, self._candidate_count = None, 0
+        return self._verdict
+
+    def summary(self) -> Dict[str, Any]:
+        """汇总采样：最近一次的各项值和积压峰值"""
+        if not self.samples:
+            return {}
+        last = self.samples[-1]
+        return {
+            'samples': len(self.samples),
+            'produced': last['produced'],
+            'committed': last['committed'],
+            'consumer_lag': last['consumer_lag'],
+            'max_consumer_lag': max(s['consumer_lag'] for s in self.samples),
+            'bottleneck': last.get('bottleneck')
+        }
+
+    def close(self):
+        """关闭Kafka客户端"""
+        for client in (self.consumer, self.admin):
+            try:
+                client.close()
+            except Exception:
+                pass
@@ -0,0 +1,141 @@
+"""
+日志跟踪 - 从保存的字节偏移增量读取日志，实时解析Consumer批次/提交/错误指标
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+# 默认解析规则，可在场景配置 flink_cdc.log_metrics 中覆盖
+DEFAULT_METRIC_PATTERNS = {
+    'batch': r'(?i)batch\D{0,40}?(\d+)\s*(?:rows|records|条)',
+    'commit': r'(?i)\bcommit(?:ted)?\b',
+    'error': r'(?i)\b(?:error|exception)\b',
+}
+
+# 每次读取的块大小；单次 poll 最多读取的字节数（其余留给下次 poll）
+READ_CHUNK = 64 * 1024
+MAX_POLL_BYTES = 4 * 1024 * 1024
+
+
+class LogMetrics:
+    """从日志行累计吞吐和错误指标"""
+
+    def __init__(self, patterns: Dict[str, str] = None):
+        patterns = dict(DEFAULT_METRIC_PATTERNS, **(patterns or {}))
+        self.batch_re = re.compile(patterns['batch'])
+        self.commit_re = re.compile(patterns['commit'])
+        self.error_re = re.compile(patterns['error'])
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.commits = 0
+        self.errors = 0
+        self.last_error = None
+        self.started = time.time()
+        self.last_seen = None
+
+    def feed(self, lines: List[str]):
+        """解析新增日志行"""
+        now = time.time()
+        with self._lock:
+            for line in lines:
+                match = self.batch_re.search(line)
+                if match:
+                    self.batches += 1
+                    self.rows += int(match.group(1))
+                    self.last_seen = now
+                if self.commit_re.search(line):
+                    self.commits += 1
+                if self.error_re.search(line):
+                    self.errors += 1
+                    self.last_error = line.strip()[:200]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前指标快照，吞吐按开始跟踪到最近一个批次的时间计算"""
+        with self._lock:
+            span = (self.last_seen - self.started) if self.last_seen else 0
+            return {
+                'batches': self.batches,
+                'rows': self.rows,
+                'commits': self.commits,
+                'errors': self.errors,
+                'rows_per_sec': self.rows / span if span > 0 else 0.0,
+                'last_error': self.last_error
+            }
+
+
+class LogFollower:
+    """增量跟踪单个日志文件"""
+
+    def __init__(self, path: str, metrics: Optional[LogMetrics] = None):
+        self.path = path
+        self.metrics = metrics
+        self.offset = 0
+        self._partial = b''
+        self._lock = threading.Lock()
+
+    def seek_end(self):
+        """跳过文件中已有的内容，只跟踪之后新增的行（接管已在运行的进程时使用）"""
+        with self._lock:
+            try:
+                self.offset = os.path.getsize(self.path)
+            except OSError:
+                self.offset = 0
+            self._partial = b''
+
+    def poll(self, max_bytes: int = MAX_POLL_BYTES) -> List[str]:
+        """按块读取上次偏移之后新增的完整行（单次最多 max_bytes），同时更新指标"""
+        lines = []
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return []
+
+            # 文件被截断或重建时从头开始
+            if size < self.offset:
+                self.offset = 0
+                self._partial = b''
+            if size == self.offset:
+                return []
+
+            budget = min(size - self.offset, max_bytes)
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                while budget > 0:
+                    chunk = f.read(min(READ_CHUNK, budget))
+                    if not chunk:
+                        break
+                    self.offset += len(chunk)
+                    budget -= len(chunk)
+                    lines.extend(self._split(chunk))
+
+        if lines and self.metrics:
+            self.metrics.feed(lines)
+        return lines
+
+    def _split(self, chunk: bytes) -> List[str]:
+        """拼接上次剩余的不完整行，返回完整行；超过一个块仍无换行的内容按一行处理，避免缓冲无限增长"""
+        complete, newline, self._partial = (self._partial + chunk).rpartition(b'\n')
+        if len(self._partial) > READ_CHUNK:
+            complete, newline, self._partial = complete + newline + self._partial, b'\n', b''
+        if not newline:
+            return []
+        return complete.decode('utf-8', errors='replace').split('\n')
+
+    def tail(self, lines: int = 50, block_size: int = 8192) -> str:
+        """从文件末尾向前按块读取，返回最后 lines 行，不读取整个文件"""
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            while position > 0 and data.count(b'\n') <= lines:
+                read_size = min(block_size, position)
+                position -= read_size
+                f.seek(position)
+                data = f.read(read_size) + data
+
+        return b'\n'.join(data.splitlines()[-lines:]).decode('utf-8', errors='replace')
@@ -0,0 +1,67 @@
+"""
+就绪探测 - 用带截止时间的主动探测替代固定 sleep
+"""
+
+import socket
+import time
+from typing import Callable, List
+from .log_follower import LogFollower
+
+
+def wait_until(check: Callable[[], bool], timeout: float, interval: float = 0.2,
+               description: str = "服务") -> float:
+    """
+    轮询 check 直到返回 True，返回实际等待耗时（秒）
+
+    check 抛出的异常直接向上传递（用于进程提前退出等不可恢复的情况）；
+    超过截止时间仍未就绪时抛出 TimeoutError
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+
+    while True:
+        if check():
+            return time.monotonic() - start
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{description}在 {timeout}s 内未就绪")
+        time.sleep(interval)
+
+
+def tcp_port_open(host: str, port: int, timeout: float = 1.0) -> bool:
+    """TCP端口是否可连接"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class LogMarkerProbe:
+    """检查跟踪日志新增的行中是否出现任一标记"""
+
+    def __init__(self, follower: LogFollower, markers: List[str]):
+        self.follower = follower
+        self.markers = markers
+
+    def __call__(self) -> bool:
+        """读取新增日志并检查标记"""
+        return any(marker in line for line in self.follower.poll() for marker in self.markers)
+
+
+def process_ready(process, name: str, probe: Callable[[], bool] = None,
+                  min_uptime: float = 0.0) -> Callable[[], bool]:
+    """
+    组合进程存活检查和可选的日志探测
+
+    进程已退出时抛出异常；未配置日志探测时，进程存活满 min_uptime 即视为就绪
+    """
+    started = time.monotonic()
+
+    def check() -> bool:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name}启动后退出 (退出码: {process.returncode})")
+        if probe is not None:
+            return probe()
+        return time.monotonic() - started >= min_uptime
+
+    return check
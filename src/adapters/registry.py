@@ -0,0 +1,41 @@
+"""
+适配器注册表 - 场景类型到适配器类的映射
+
+注册项可以是类，也可以是 "模块:类名" 字符串；字符串形式的模块在首次使用该场景类型时才导入，
+避免启动时加载所有适配器及其依赖（pymysql、kafka 等）
+"""
+
+import importlib
+from typing import Dict, Any, List, Union
+
+ADAPTER_REGISTRY: Dict[str, Union[str, type]] = {
+    'mo_to_mo': '.mo_to_mo_adapter:MoToMoAdapter',
+    'mo_to_mysql': '.mo_to_mysql_adapter:MoToMysqlAdapter',
+    'cross_cluster': '.cross_cluster_adapter:CrossClusterAdapter',
+    'flink_cdc': '.flink_cdc_adapter:FlinkCdcAdapter',
+    'loopback': '.loopback_adapter:LoopbackAdapter'
+}
+
+
+def register_adapter(scenario_type: str, adapter: Union[str, type]):
+    """注册场景类型对应的适配器（类或 "模块:类名"，相对模块名以本包为基准）"""
+    ADAPTER_REGISTRY[scenario_type] = adapter
+
+
+def adapter_types() -> List[str]:
+    """已注册的场景类型"""
+    return list(ADAPTER_REGISTRY)
+
+
+def get_adapter_class(scenario_type: str, registry: Dict[str, Any] = None) -> type:
+    """取场景类型对应的适配器类，按需导入其模块并缓存"""
+    registry = ADAPTER_REGISTRY if registry is None else registry
+    adapter = registry.get(scenario_type)
+    if adapter is None:
+        raise ValueError(f"不支持的场景类型: {scenario_type}")
+
+    if isinstance(adapter, str):
+        module_name, class_name = adapter.split(':')
+        adapter = getattr(importlib.import_module(module_name, __package__), class_name)
+        registry[scenario_type] = adapter
+    return adapter
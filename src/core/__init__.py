@@ -1,4 +1,22 @@
-from .test_runner import TestRunner
-from .config_loader import ConfigLoader
+"""
+核心包 - 执行引擎在首次访问时才导入，仅加载配置时不会引入适配器依赖
+"""
 
-__all__ = ['TestRunner', 'ConfigLoader']
+import importlib
+
+_LAZY_EXPORTS = {
+    'TestRunner': '.test_runner',
+    'ConfigLoader': '.config_loader',
+    'SweepRunner': '.sweep_runner',
+    'AsyncTestRunner': '.async_runner'
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,205 @@
+"""
+asyncio 执行引擎 - 单进程并发监督大量表的同步验证
+
+UPDATE/DELETE、同步验证（非分区感知）、validate 和 measure_sync_delay 的查询、轮询和等待为协程，
+等待期间不占用线程；写入生成数据、分区感知验证、索引查询与基准、状态检查和故障注入
+仍在线程中调用同步执行引擎的处理函数，执行期间各占用一个线程
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+from ..adapters.async_base_adapter import AsyncBaseAdapter
+from ..adapters.async_mysql_adapter import AsyncMysqlAdapter
+from .test_plan import Step, TestCase
+from .test_runner import TestRunner
+from ..events import get_events, event_context
+
+
+class AsyncTestRunner(TestRunner):
+    """异步测试执行引擎，复用 TestRunner 的配置加载和冲突集划分"""
+
+    def __init__(self, scenario: str, overrides: Dict[str, Any] = None):
+        super().__init__(scenario, overrides)
+        if 'host' not in self.scenario_config['source']:
+            raise ValueError(f"场景类型 {self.scenario_config['scenario_type']} 的端点不是MySQL协议，不支持异步执行引擎")
+        self.async_adapter = AsyncMysqlAdapter(self.scenario_config, self.adapter)
+
+    async def run_tests(self, testcase_file: str = "common_tests.yaml", test_group: str = "basic",
+                        concurrency: int = 0):
+        """运行测试用例，互不冲突的用例队列并发执行；concurrency 为0时不限制"""
+        plan = self.config_loader.load_test_plan(testcase_file)
+        events = get_events()
+        events.emit('run_start', scenario=self.scenario_config['scenario_type'],
+                    scenario_name=self.scenario_config['scenario_name'], suite=plan.suite['name'],
+                    group=test_group, engine='asyncio', concurrency=concurrency)
+
+        await self.async_adapter.connect()
+        try:
+            await self.async_adapter.setup_cdc()
+
+            test_cases = plan.select(test_group)
+            if test_cases is None:
+                events.emit('group_missing', group=test_group)
+                test_cases = plan.cases
+
+            self.results.extend(await self._run_lanes(test_cases, concurrency))
+
+        finally:
+            await self.async_adapter.teardown_cdc()
+            await self.async_adapter.disconnect()
+            if self.network:
+                self.network.close()
+
+        self._print_summary()
+        return self.results
+
+    async def _run_lanes(self, test_cases: List[TestCase], concurrency: int) -> List[Dict[str, Any]]:
+        """按阶段依次执行，阶段内每个冲突集队列一个协程，队列内按原始顺序执行"""
+        phases = self._plan_phases(test_cases)
+        widest = max((len(lanes) for lanes in phases), default=1)
+
+        semaphore = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+        results = [None] * len(test_cases)
+        # 仍在线程中执行的步骤每个并发队列最多同时占用一个线程
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=max(1, min(concurrency or widest, widest)))
+        )
+
+        async def run_lane(indexes: List[int]):
+            for index in indexes:
+                if semaphore:
+                    async with semaphore:
+                        results[index] = await self._run_single_test_async(test_cases[index])
+                else:
+                    results[index] = await self._run_single_test_async(test_cases[index])
+
+        for lanes in phases:
+            await asyncio.gather(*(run_lane(indexes) for indexes in lanes))
+        return results
+
+    async def _run_single_test_async(self, test_case: TestCase) -> Dict[str, Any]:
+        """运行单个测试用例（每个用例在独立的事件上下文中）"""
+        with event_context(case=test_case.id):
+            return await self._run_case_async(test_case)
+
+    async def _run_case_async(self, test_case: TestCase) -> Dict[str, Any]:
+        test_id = test_case.id
+        test_name = test_case.name
+        events = get_events()
+        events.emit('case_start', name=test_name, table=test_case.table or '')
+
+        start_time = time.time()
+        sync_stats = {}
+        table = test_case.table or ''
+
+        try:
+            wire_before = await asyncio.to_thread(self._wire_snapshot, table)
+            for index, step in enumerate(test_case.steps):
+                events.emit('step_start', index=index, action=step.action, table=step.table)
+                step_start = time.time()
+                try:
+                    await self._execute_step_async(step, sync_stats)
+                except Exception as e:
+                    events.emit('step_end', index=index, action=step.action, table=step.table, status='FAIL',
+                                duration=time.time() - step_start, error=str(e))
+                    raise
+                events.emit('step_end', index=index, action=step.action, table=step.table, status='PASS',
+                            duration=time.time() - step_start)
+            if wire_before:
+                sync_stats['wire'] = await asyncio.to_thread(self._record_wire, table, wire_before, sync_stats)
+
+            result = {'id': test_id, 'name': test_name, 'status': 'PASS', 'time': time.time() - start_time,
+                      **sync_stats}
+
+        except Exception as e:
+            result = {'id': test_id, 'name': test_name, 'status': 'FAIL', 'error': str(e),
+                      'time': time.time() - start_time}
+
+        events.emit('case_end', name=test_name, status=result['status'], time=result['time'],
+                    error=result.get('error'), rows=result.get('rows'), sync_time=result.get('sync_time'),
+                    changed_rows=result.get('changed_rows'))
+        return result
+
+    async def _execute_step_async(self, step: Step, sync_stats: Dict[str, Any]):
+        """
+        执行测试步骤（协程版本），分派到 _step_<action>_async
+
+        没有协程版本的动作在线程中调用同步执行引擎的处理函数（同步适配器在异步模式下同样已连接）；
+        同步验证的场景逻辑（预测等待、任务采样、积压采样）通过同步适配器的验证钩子复用，结果可直接对比
+        """
+        handler = getattr(self, f"_step_{step.action}_async", None)
+        if handler is None:
+            await asyncio.to_thread(self._execute_step, step, sync_stats)
+        else:
+            await handler(step, sync_stats)
+
+    async def _step_update_async(self, step: Step, sync_stats: Dict[str, Any]):
+        await self._run_dml_async(step, sync_stats)
+
+    async def _step_delete_async(self, step: Step, sync_stats: Dict[str, Any]):
+        await self._run_dml_async(step, sync_stats)
+
+    async def _run_dml_async(self, step: Step, sync_stats: Dict[str, Any]):
+        affected = await self.async_adapter.execute_dml_on_source(step.sql)
+        get_events().emit('dml', action=step.action, table=step.table, sql=step.sql, rows=affected)
+        self._add_changed_rows(sync_stats, affected)
+
+    async def _step_validate_sync_async(self, step: Step, sync_stats: Dict[str, Any]):
+        """非分区感知的同步验证以协程轮询；分区感知验证在线程中执行"""
+        table, timeout = step.table, step.timeout
+        adapter: AsyncBaseAdapter = self.async_adapter
+        if await asyncio.to_thread(self._partitions_to_validate, table):
+            await asyncio.to_thread(self._execute_step, step, sync_stats)
+            return
+
+        sync_start = time.time()
+        if not await adapter.validate_sync(table, timeout):
+            raise AssertionError(f"数据同步超时 (>{timeout}s)")
+        sync_stats['sync_time'] = sync_stats.get('sync_time', 0.0) + time.time() - sync_start
+        sync_stats['rows'] = await adapter.get_target_row_count(table)
+        metrics = await asyncio.to_thread(self.adapter.get_metrics)
+        if metrics:
+            sync_stats['metrics'] = metrics
+
+    async def _step_validate_async(self, step: Step, sync_stats: Dict[str, Any]):
+        """data_match: 源和目标数据一致；row_count: 目标端行数等于 expected（均在 timeout 内轮询）"""
+        adapter: AsyncBaseAdapter = self.async_adapter
+        where = step.get('where')
+        interval = self.scenario_config.get('validation', {}).get('check_interval', 1)
+        deadline = time.time() + step.timeout
+        while True:
+            if step.get('check') == 'data_match':
+                passed = await adapter.compare_data(step.table, where)
+                detail = "源和目标数据不一致"
+            else:
+                sql = f"SELECT COUNT(*) FROM {step.table}" + (f" WHERE {where}" if where else "")
+                actual = (await adapter.execute_on_target(sql))[0][0]
+                passed = actual == step.get('expected')
+                detail = f"目标端行数 {actual}，期望 {step.get('expected')}"
+            if passed:
+                get_events().emit('validated', table=step.table, check=step.get('check'))
+                return
+            if time.time() >= deadline:
+                raise AssertionError(f"{detail} (>{step.timeout}s)")
+            await asyncio.sleep(interval)
+
+    async def _step_measure_sync_delay_async(self, step: Step, sync_stats: Dict[str, Any]):
+        """生成数据在线程中写入，之后以协程轮询源和目标行数直到追平"""
+        count = step.get('insert_count')
+        write_time = await asyncio.to_thread(self._insert_generated, step.table, count, step.get('batch_size', 1000))
+        inserted_at = time.time()
+        deadline = inserted_at + step.timeout
+        while True:
+            source_count, target_count = await self.async_adapter.poll_counts(step.table)
+            if source_count == target_count:
+                break
+            if time.time() >= deadline:
+                raise AssertionError(f"同步延迟测量超时 (>{step.timeout}s)")
+            await asyncio.sleep(step.get('poll_interval'))
+
+        delay = time.time() - inserted_at
+        sync_stats['sync_delay'] = delay
+        self._add_changed_rows(sync_stats, count)
+        get_events().emit('sync_delay', table=step.table, delay=delay, rows=count, write_time=write_time)
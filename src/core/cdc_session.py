@@ -0,0 +1,45 @@
+"""
+持久化CDC会话 - 将CDC句柄记录到本地状态文件，跨测试组和多次运行复用
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class CdcSession:
+    """单个场景的CDC会话状态"""
+
+    def __init__(self, scenario: str, state_dir: str = ".cdc_session"):
+        self.scenario = scenario
+        self.path = Path(state_dir) / f"{scenario}.json"
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """读取会话状态，不存在或已损坏时返回 None"""
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, scenario_type: str, handles: Dict[str, Any]):
+        """保存CDC句柄"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            'scenario': self.scenario,
+            'scenario_type': scenario_type,
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'handles': handles
+        }
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.path)
+
+    def clear(self):
+        """删除会话状态"""
+        if self.path.exists():
+            self.path.unlink()
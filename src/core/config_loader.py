@@ -1,50 +1,132 @@
-import yaml
+import hashlib
+import os
+import pickle
 from pathlib import Path
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List
+
+# 解析结果缓存目录；环境变量 CDC_CONFIG_CACHE 设为空字符串时禁用缓存
+DEFAULT_CACHE_DIR = os.environ.get('CDC_CONFIG_CACHE', '.cdc_cache')
+
+
+def _parse_yaml(content: bytes) -> Any:
+    """解析YAML，优先使用 libyaml 的 C 解析器（命中缓存时不导入 yaml）"""
+    import yaml
+    return yaml.load(content, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
 
 
 class ConfigLoader:
     """配置加载器"""
-    
-    def __init__(self, config_dir: str = "config"):
+
+    def __init__(self, config_dir: str = "config", cache_dir: str = DEFAULT_CACHE_DIR):
         self.config_dir = Path(config_dir)
-    
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+    def _load_yaml(self, path: Path) -> Any:
+        """解析YAML文件（结果缓存）"""
+        return self._load_cached(path, _parse_yaml, 'yaml')
+
+    def _load_cached(self, path: Path, build: Callable[[bytes], Any], kind: str) -> Any:
+        """
+        由文件内容构建对象（build），结果以 pickle 缓存，kind 区分同一文件的不同产物
+
+        mtime 和文件大小未变时直接使用缓存；mtime 变化但内容哈希相同（如 touch、git checkout）
+        时刷新缓存记录的 mtime 后使用；否则重新构建
+        """
+        if not self.cache_dir:
+            return build(path.read_bytes())
+
+        stat = path.stat()
+        cache_key = f"{kind}:{path.resolve()}"
+        cache_file = self.cache_dir / (hashlib.sha1(cache_key.encode()).hexdigest() + '.pickle')
+        entry = None
+        try:
+            with open(cache_file, 'rb') as f:
+                entry = pickle.load(f)
+            if entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                return entry['data']
+        except Exception:
+            # 缓存不存在或损坏时重新构建
+            entry = None
+
+        content = path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        if entry and entry.get('sha256') == digest:
+            data = entry['data']
+        else:
+            data = build(content)
+        self._write_cache(cache_file, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                                       'sha256': digest, 'data': data})
+        return data
+
+    def _write_cache(self, cache_file: Path, entry: Dict[str, Any]):
+        """原子写入缓存文件；目录不可写时放弃缓存"""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
     def load_scenario(self, scenario_name: str) -> Dict[str, Any]:
         """加载场景配置"""
         scenario_file = self.config_dir / "scenarios" / f"{scenario_name}.yaml"
-        
+
         if not scenario_file.exists():
             raise FileNotFoundError(f"场景配置文件不存在: {scenario_file}")
-        
-        with open(scenario_file, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        
-        return config
-    
+
+        return self._load_yaml(scenario_file)
+
     def load_testcases(self, testcase_file: str = "common_tests.yaml") -> Dict[str, Any]:
         """加载测试用例"""
         testcase_path = self.config_dir / "testcases" / testcase_file
-        
+
+        if not testcase_path.exists():
+            raise FileNotFoundError(f"测试用例文件不存在: {testcase_path}")
+
+        return self._load_yaml(testcase_path)
+
+    def load_test_plan(self, testcase_file: str = "common_tests.yaml"):
+        """
+        加载并编译测试用例为执行计划（编译结果缓存）
+
+        缓存键包含编译器及其校验所依赖模块（表结构、故障类型）源文件的 mtime，
+        修改步骤规格、表定义或故障类型后旧缓存自动失效
+        """
+        from . import test_plan
+        from ..network import proxy
+        from ..schema import table_definitions
+
+        testcase_path = self.config_dir / "testcases" / testcase_file
+
         if not testcase_path.exists():
             raise FileNotFoundError(f"测试用例文件不存在: {testcase_path}")
-        
-        with open(testcase_path, 'r', encoding='utf-8') as f:
-            testcases = yaml.safe_load(f)
-        
-        return testcases
-    
+
+        kind = "plan:" + ":".join(str(os.stat(module.__file__).st_mtime_ns)
+                                  for module in (test_plan, table_definitions, proxy))
+        return self._load_cached(testcase_path,
+                                 lambda content: test_plan.compile_test_plan(_parse_yaml(content), testcase_file),
+                                 kind)
+
     def list_scenarios(self):
         """列出所有可用场景"""
         scenario_dir = self.config_dir / "scenarios"
         scenarios = []
-        
-        for file in scenario_dir.glob("*.yaml"):
-            with open(file, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-                scenarios.append({
-                    'file': file.stem,
-                    'name': config.get('scenario_name'),
-                    'type': config.get('scenario_type')
-                })
-        
+
+        for file in sorted(scenario_dir.glob("*.yaml")):
+            config = self._load_yaml(file)
+            scenarios.append({
+                'file': file.stem,
+                'name': config.get('scenario_name'),
+                'type': config.get('scenario_type')
+            })
+
         return scenarios
+
+    def resolve_scenarios(self, spec: str) -> List[str]:
+        """解析 --scenario 参数: 'a,b,c' 或 'all'"""
+        if spec.strip() == 'all':
+            return [s['file'] for s in self.list_scenarios()]
+        # 去重并保持顺序，同一场景重复运行会互相清空数据
+        return list(dict.fromkeys(s.strip() for s in spec.split(',') if s.strip()))
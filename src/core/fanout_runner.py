@@ -0,0 +1,232 @@
+"""
+CCPR 扇出规模测试 - 并发创建 N 组 Publication/Subscription，加载数据，
+测量同步耗时和上游负载随 N 的变化，结束后并发清理
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+from tabulate import tabulate
+from colorama import Fore, Style, init
+from .config_loader import ConfigLoader
+from ..adapters.cross_cluster_adapter import CrossClusterAdapter
+from ..data.table_inserter import TableInserter
+
+init(autoreset=True)
+
+
+def parse_fanout_spec(spec: str) -> List[int]:
+    """解析扇出规模，如 1,5,10"""
+    try:
+        counts = [int(v) for v in spec.split(',') if v.strip()]
+    except ValueError:
+        raise ValueError(f"无效的扇出规模: {spec} (应为逗号分隔的整数)")
+    if not counts or any(n <= 0 for n in counts):
+        raise ValueError(f"无效的扇出规模: {spec}")
+    return counts
+
+
+class UpstreamLoadSampler:
+    """同步期间后台采样上游负载：连接数和探测查询延迟"""
+
+    def __init__(self, adapter: CrossClusterAdapter, interval: float = 1.0):
+        self.adapter = adapter
+        self.interval = interval
+        self.connections: List[int] = []
+        self.latencies: List[float] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._loop, name='upstream-load', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 5)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                start = time.perf_counter()
+                self.adapter.query_source("SELECT 1")
+                self.latencies.append((time.perf_counter() - start) * 1000)
+                self.connections.append(len(self.adapter.query_source("SHOW PROCESSLIST")))
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'max_connections': max(self.connections) if self.connections else None,
+            'avg_probe_ms': sum(self.latencies) / len(self.latencies) if self.latencies else None,
+            'max_probe_ms': max(self.latencies) if self.latencies else None
+        }
+
+
+class FanoutRunner:
+    """CCPR扇出规模测试执行器"""
+
+    def __init__(self, scenario: str, counts: List[int], sync_level: str = None):
+        self.config = ConfigLoader().load_scenario(scenario)
+        if self.config['scenario_type'] != 'cross_cluster':
+            raise ValueError(f"扇出测试只支持 cross_cluster 场景 (当前: {self.config['scenario_type']})")
+
+        self.fanout_cfg = self.config.get('fanout', {})
+        self.counts = counts
+        self.sync_level = sync_level or self.config['cdc_config'].get('sync_level', 'database')
+        self.max_workers = self.fanout_cfg.get('max_workers', 16)
+        # 加载数据、验证收敛以及table级别发布/订阅使用的表
+        self.table = self.fanout_cfg.get('table', 'cdc_test_base')
+        # 连接池大小与并发数一致，避免并发建立订阅时在池上排队
+        self.config.setdefault('connection_pool', {})['max_size'] = self.max_workers + 2
+        self.adapter = CrossClusterAdapter(self.config)
+        self.points = []
+
+    def run(self) -> List[Dict[str, Any]]:
+        """依次运行每个扇出规模"""
+        self.adapter.connect()
+        try:
+            for n in self.counts:
+                print(f"\n{Fore.CYAN}[扇出 N={n}, 级别={self.sync_level}]{Style.RESET_ALL}")
+                try:
+                    self.points.append(self._run_point(n))
+                except Exception as e:
+                    print(f"{Fore.RED}✗ 扇出规模 {n} 执行失败: {str(e)}{Style.RESET_ALL}")
+                    self.points.append({'n': n, 'error': str(e)})
+        finally:
+            self.adapter.disconnect()
+
+        self.print_report()
+        return self.points
+
+    def _run_point(self, n: int) -> Dict[str, Any]:
+        """创建 N 组订阅 -> 加载数据 -> 等待全部收敛 -> 并发清理"""
+        run_id = int(time.time())
+        pairs = [self._pair_names(run_id, i) for i in range(n)]
+        point = {'n': n}
+
+        try:
+            start = time.time()
+            pairs = self._parallel(self._create_pair, pairs)
+            point['setup_time'] = time.time() - start
+            failed = [p for p in pairs if p.get('error')]
+            if failed:
+                raise RuntimeError(f"{len(failed)}/{n} 组订阅创建失败: {failed[0]['error']}")
+
+            table = self.table
+            expected = self._load_data(table)
+
+            with UpstreamLoadSampler(self.adapter, self.fanout_cfg.get('load_sample_interval', 1.0)) as load:
+                start = time.time()
+                pairs = self._parallel(lambda p: self._wait_converged(p, table, expected, start), pairs)
+            point.update(load.summary())
+
+            sync_times = sorted(p['sync_time'] for p in pairs if p.get('sync_time') is not None)
+            point['converged'] = len(sync_times)
+            point['avg_sync_time'] = sum(sync_times) / len(sync_times) if sync_times else None
+            point['max_sync_time'] = sync_times[-1] if sync_times else None
+
+        finally:
+            start = time.time()
+            self._parallel(self._drop_pair, pairs)
+            point['teardown_time'] = time.time() - start
+
+        return point
+
+    def _pair_names(self, run_id: int, index: int) -> Dict[str, Any]:
+        """第 index 组的Publication名称、下游账户和订阅库名"""
+        target_db = self.config['target'].get('database', 'test_db')
+        accounts = self.fanout_cfg.get('accounts') or [self.config['target'].get('account', 'sys')]
+        return {
+            'publication': f"pub_fanout_{run_id}_{index}",
+            'account': accounts[index % len(accounts)],
+            'database': f"{target_db}_fo{index}"
+        }
+
+    def _create_pair(self, pair: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        创建一组Publication/Subscription；account级别的Publication按数据库订阅
+
+        table级别发布和订阅 fanout.table，订阅表建在 <订阅库>.<表> 下，订阅前先在下游创建订阅库
+        """
+        sync_interval = self.config['cdc_config'].get('sync_interval', 60)
+        sub_level = 'database' if self.sync_level == 'account' else self.sync_level
+        try:
+            self.adapter.create_publication(self.sync_level, pair['publication'], pair['account'], self.table)
+            if sub_level == 'table':
+                self.adapter.execute_on_target(f"CREATE DATABASE IF NOT EXISTS {pair['database']}")
+            pair['subscription'] = self.adapter.create_subscription(
+                sub_level, sync_interval, pair['publication'], pair['database'], self.table)
+        except Exception as e:
+            pair['error'] = str(e)
+        return pair
+
+    def _drop_pair(self, pair: Dict[str, Any]) -> Dict[str, Any]:
+        """删除一组Subscription/Publication"""
+        if pair.get('subscription'):
+            self.adapter.drop_subscription(pair['subscription'])
+        self.adapter.drop_publication(pair['publication'])
+        return pair
+
+    def _load_data(self, table: str) -> int:
+        """向上游表追加数据，返回加载后的源表行数"""
+        rows = self.fanout_cfg.get('load_rows', 1000)
+        if rows > 0:
+            with self.adapter.source_connection() as conn:
+                TableInserter(conn, self.fanout_cfg.get('batch_size', 1000)).insert_base_table(rows, table)
+        return self.adapter.get_source_row_count(table)
+
+    def _wait_converged(self, pair: Dict[str, Any], table: str, expected: int, start: float) -> Dict[str, Any]:
+        """轮询单个订阅库直到行数与源一致或超时"""
+        timeout = self.fanout_cfg.get('timeout', self.config['validation'].get('max_wait_time', 180))
+        interval = self.fanout_cfg.get('check_interval', 2)
+        while time.time() - start < timeout:
+            try:
+                if self.adapter.get_target_row_count(f"{pair['database']}.{table}") == expected:
+                    pair['sync_time'] = time.time() - start
+                    return pair
+            except Exception:
+                pass
+            time.sleep(interval)
+        print(f"  {Fore.YELLOW}⚠ 订阅 {pair['database']} 在 {timeout}s 内未收敛{Style.RESET_ALL}")
+        return pair
+
+    def _parallel(self, func, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """并发执行，保持输入顺序"""
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(items)))) as executor:
+            return list(executor.map(func, items))
+
+    def print_report(self):
+        """打印扇出规模结果表"""
+        headers = ['N', '创建耗时(s)', '收敛数', '平均同步(s)', '最大同步(s)',
+                   '上游最大连接数', '上游探测延迟(ms)', '清理耗时(s)']
+
+        def fmt(value, spec='.2f'):
+            return '-' if value is None else format(value, spec)
+
+        rows = []
+        for point in self.points:
+            if 'error' in point:
+                rows.append([point['n']] + ['-'] * 6 + [f"错误: {point['error'][:40]}"])
+                continue
+            rows.append([
+                point['n'], fmt(point.get('setup_time')), f"{point.get('converged', 0)}/{point['n']}",
+                fmt(point.get('avg_sync_time')), fmt(point.get('max_sync_time')),
+                fmt(point.get('max_connections'), 'd'), fmt(point.get('avg_probe_ms'), '.1f'),
+                fmt(point.get('teardown_time'))
+            ])
+
+        print(f"\n{Fore.CYAN}{'='*60}")
+        print(f"CCPR扇出规模结果 (级别: {self.sync_level})")
+        print(f"{'='*60}{Style.RESET_ALL}")
+        print(tabulate(rows, headers=headers, tablefmt='simple'))
+
+    def exit_code(self) -> int:
+        """存在执行失败或未收敛的规模时返回1"""
+        for point in self.points:
+            if 'error' in point or point.get('converged', 0) < point['n']:
+                return 1
+        return 0
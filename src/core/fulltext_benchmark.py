@@ -0,0 +1,112 @@
+"""
+全文索引一致性与延迟基准 - 从表中已生成数据的词表抽取查询，在源端和目标端并发执行
+MATCH ... AGAINST，按无序结果集比较两端命中，报告各索引的延迟分布和结果不一致率
+"""
+
+import random
+import re
+from typing import Dict, Any, List, Tuple
+from .paired_queries import SIDES, run_paired
+from .stats import latency_summary
+from ..schema.table_definitions import get_fulltext_indexes
+
+_TOKEN_PATTERN = re.compile(r'[A-Za-z0-9]{3,}')
+
+# 查询形式: 自然语言（1-2个词）、布尔（必须包含/必须不含）、短语（2-4个连续词）
+QUERY_KINDS = ('natural', 'boolean', 'phrase')
+
+
+class FulltextBenchmark:
+    """全文检索基准，每个全文索引生成 queries 个查询（三种形式轮流）"""
+
+    def __init__(self, adapter, table: str, indexes: List[str] = None, id_column: str = 'id',
+                 queries: int = 20, concurrency: int = 8, sample_rows: int = 200, seed: int = None):
+        self.adapter = adapter
+        self.table = table
+        all_indexes = get_fulltext_indexes(table)
+        self.indexes = {name: all_indexes[name] for name in (indexes or all_indexes)}
+        self.id_column = id_column
+        self.queries = queries
+        self.concurrency = concurrency
+        self.sample_rows = sample_rows
+        self.random = random.Random(seed)
+
+    def _vocabulary(self, columns: List[str]) -> Tuple[List[str], List[List[str]]]:
+        """抽样源端若干行的索引列，返回 (词表, 各行词序列)；短语查询从词序列中截取，保证可能命中"""
+        rows = self.adapter.query_source(
+            f"SELECT {', '.join(columns)} FROM {self.table} ORDER BY {self.id_column} LIMIT {self.sample_rows}"
+        )
+        sequences = []
+        for row in rows:
+            for value in row:
+                tokens = _TOKEN_PATTERN.findall(value or '')
+                if tokens:
+                    sequences.append(tokens)
+        vocabulary = sorted({token for tokens in sequences for token in tokens})
+        if not vocabulary:
+            raise AssertionError(f"表 {self.table} 的列 {', '.join(columns)} 中没有可用作查询的词")
+        return vocabulary, sequences
+
+    def _make_query(self, kind: str, vocabulary: List[str], sequences: List[List[str]]) -> Tuple[str, str]:
+        """生成一个查询，返回 (检索串, 模式子句)"""
+        pick = self.random.choice
+        if kind == 'natural':
+            return ' '.join(pick(vocabulary) for _ in range(self.random.randint(1, 2))), ''
+        if kind == 'boolean':
+            include, exclude = pick(vocabulary), pick(vocabulary)
+            if include == exclude:
+                return f"+{include}", ' IN BOOLEAN MODE'
+            return f"+{include} -{exclude}", ' IN BOOLEAN MODE'
+        tokens = pick(sequences)
+        length = min(self.random.randint(2, 4), len(tokens))
+        start = self.random.randint(0, len(tokens) - length)
+        return '"' + ' '.join(tokens[start:start + length]) + '"', ' IN BOOLEAN MODE'
+
+    def run(self) -> Dict[str, Any]:
+        """运行基准，返回总体和各索引的不一致率、平均命中数和两端延迟分布"""
+        if not self.indexes:
+            raise AssertionError(f"表 {self.table} 没有全文索引定义")
+
+        queries, owners = [], []
+        for name, columns in self.indexes.items():
+            vocabulary, sequences = self._vocabulary(columns)
+            for i in range(self.queries):
+                text, mode = self._make_query(QUERY_KINDS[i % len(QUERY_KINDS)], vocabulary, sequences)
+                sql = (f"SELECT {self.id_column} FROM {self.table} "
+                       f"WHERE MATCH({', '.join(columns)}) AGAINST(%s{mode})")
+                queries.append((sql, (text,)))
+                owners.append((name, text, mode.strip()))
+
+        outcome = run_paired(self.adapter, queries, self.concurrency, span='fulltext_query')
+        hits = {side: [frozenset(row[0] for row in rows) for rows in outcome[side]['rows']] for side in SIDES}
+
+        per_index = {}
+        divergent = []
+        for i, (name, text, mode) in enumerate(owners):
+            stats = per_index.setdefault(name, {'queries': 0, 'divergent': 0, 'hits': 0,
+                                                'latencies': {side: [] for side in SIDES}})
+            stats['queries'] += 1
+            stats['hits'] += len(hits['source'][i])
+            for side in SIDES:
+                stats['latencies'][side].append(outcome[side]['latencies'][i])
+            if hits['source'][i] != hits['target'][i]:
+                stats['divergent'] += 1
+                divergent.append({'index': name, 'query': text, 'mode': mode or 'NATURAL LANGUAGE',
+                                  'missing': len(hits['source'][i] - hits['target'][i]),
+                                  'extra': len(hits['target'][i] - hits['source'][i])})
+
+        report = {'queries': len(queries), 'divergent': len(divergent),
+                  'divergence_rate': len(divergent) / len(queries),
+                  # 只保留前几个不一致的查询作为样例
+                  'divergent_samples': divergent[:5], 'indexes': {}}
+        for side in SIDES:
+            report[side] = latency_summary(outcome[side]['latencies'])
+        for name, stats in per_index.items():
+            report['indexes'][name] = {
+                'queries': stats['queries'],
+                'divergent': stats['divergent'],
+                'divergence_rate': stats['divergent'] / stats['queries'],
+                'avg_hits': stats['hits'] / stats['queries'],
+                **{side: latency_summary(stats['latencies'][side]) for side in SIDES}
+            }
+        return report
@@ -0,0 +1,119 @@
+"""
+索引查询收敛验证 - 源端结果作为期望值，目标端按退避间隔重复执行，直到结果摘要一致或超过截止时间
+
+比较的是规范化后结果行的摘要而不是完整结果列表；每个查询单独记录收敛时间
+"""
+
+import datetime
+import decimal
+import hashlib
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+from ..events import get_events
+
+
+def normalize_value(value: Any) -> Any:
+    """把不同驱动/端点返回的等价值统一为同一表示"""
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    if isinstance(value, decimal.Decimal):
+        return str(value.normalize())
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _normalize_row(row) -> str:
+    return repr(tuple(normalize_value(v) for v in (row.values() if isinstance(row, dict) else row)))
+
+
+def rows_digest(rows, ordered: bool = False) -> str:
+    """规范化结果行的 SHA-256 摘要；ordered 为 False 时与行顺序无关"""
+    normalized = [_normalize_row(row) for row in rows or ()]
+    if not ordered:
+        normalized.sort()
+    digest = hashlib.sha256(str(len(normalized)).encode())
+    for row in normalized:
+        digest.update(b'\n')
+        digest.update(row.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+def divergent_rows(source_rows, target_rows) -> int:
+    """
+    两端结果中不一致的行数（与行顺序无关）
+
+    按规范化行的多重集合差计算，取两个方向的较大者：被 UPDATE 的行在两个方向各出现一次
+    """
+    source = Counter(_normalize_row(row) for row in source_rows or ())
+    target = Counter(_normalize_row(row) for row in target_rows or ())
+    return max(sum((source - target).values()), sum((target - source).values()))
+
+
+def converge_queries(adapter, queries: List[str], timeout: float = 60, ordered: bool = False,
+                     initial_interval: float = 0.2, max_interval: float = 5, concurrency: int = 8,
+                     progress_event: str = 'index_poll') -> Dict[str, Any]:
+    """
+    批量验证索引查询收敛
+
+    源端各查询执行一次得到期望摘要；目标端每一轮并发执行所有未收敛的查询，
+    未全部收敛时等待 interval 后重试（interval 每轮翻倍，不超过 max_interval，也不超过截止时间）
+
+    目标端查询出错（表或索引尚未复制、连接暂时中断）时该查询本轮视为未收敛，继续重试到截止时间；
+    每轮发出 progress_event 事件 {pending, total, elapsed}
+
+    返回 {'converged': bool, 'elapsed': 秒, 'rounds': 轮数,
+          'queries': [{'sql', 'rows', 'converged_time', 'attempts', 'error'}]}，
+    未收敛的查询 converged_time 为 None，error 为目标端最近一次查询的错误
+    """
+    start = time.time()
+    deadline = start + timeout
+    events = get_events()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(queries)))) as executor:
+        expected = list(executor.map(lambda sql: adapter.query_source(sql), queries))
+        states = [{'sql': sql, 'rows': len(rows or ()), 'digest': rows_digest(rows, ordered),
+                   'converged_time': None, 'attempts': 0, 'error': None} for sql, rows in zip(queries, expected)]
+
+        def target_digest(i: int):
+            try:
+                digest = rows_digest(adapter.query_target(queries[i]), ordered)
+            except Exception as e:
+                states[i]['error'] = str(e)
+                return None
+            states[i]['error'] = None
+            return digest
+
+        pending = list(range(len(states)))
+        interval = initial_interval
+        rounds = 0
+        while True:
+            rounds += 1
+            digests = list(executor.map(target_digest, pending))
+            now = time.time()
+            still_pending = []
+            for i, digest in zip(pending, digests):
+                states[i]['attempts'] += 1
+                if digest == states[i]['digest']:
+                    states[i]['converged_time'] = now - start
+                else:
+                    still_pending.append(i)
+            pending = still_pending
+            events.emit(progress_event, pending=len(pending), total=len(states), elapsed=now - start)
+
+            if not pending or now >= deadline:
+                break
+            adapter.sleep(min(interval, deadline - now))
+            interval = min(interval * 2, max_interval)
+
+    for state in states:
+        del state['digest']
+    return {'converged': not pending, 'elapsed': time.time() - start, 'rounds': rounds, 'queries': states}
@@ -0,0 +1,173 @@
+"""
+多场景并发执行 - 每个场景的 TestRunner 在独立进程中运行
+
+各场景的用例在源端和目标端的同名测试表上写入、更新、删除数据并比较行数，共用同一数据库
+（host, port, database）的场景若并发运行会互相干扰，因此按共用端点分组：组间并发，组内按命令行顺序串行
+"""
+
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import redirect_stdout
+from typing import Dict, Any, List, Set, Tuple
+from tabulate import tabulate
+from colorama import Fore, Style, init
+from .config_loader import ConfigLoader
+
+init(autoreset=True)
+
+
+def _run_scenario(scenario: str, testcase_file: str, test_group: str, parallel: int,
+                  quiet: bool = False, collect_events: bool = False) -> Dict[str, Any]:
+    """子进程入口：运行单个场景，捕获其输出（和事件）一并返回"""
+    from .test_runner import TestRunner
+    from ..events import ConsoleRenderer, EventStream, event_context, set_events
+
+    output = io.StringIO()
+    start_time = time.time()
+    outcome = {'scenario': scenario, 'results': [], 'error': None, 'events': []}
+    # 子进程使用自己的事件流，事件随结果返回由主进程统一写入
+    stream = EventStream([ConsoleRenderer(quiet)])
+    if collect_events:
+        stream.add_sink(outcome['events'].append)
+    set_events(stream)
+
+    with redirect_stdout(output), event_context(scenario=scenario):
+        try:
+            runner = TestRunner(scenario)
+            outcome['results'] = runner.run_tests(testcase_file, test_group, parallel)
+        except Exception as e:
+            outcome['error'] = str(e)
+            print(f"错误: {str(e)}")
+
+    outcome['time'] = time.time() - start_time
+    outcome['output'] = output.getvalue()
+    return outcome
+
+
+class MultiScenarioRunner:
+    """多场景执行器"""
+
+    def __init__(self, scenarios: List[str], max_workers: int = None):
+        if not scenarios:
+            raise ValueError("未指定任何场景")
+        self.scenarios = scenarios
+        self.groups = self.plan_groups(scenarios)
+        self.max_workers = max_workers or len(self.groups)
+        self.outcomes = []
+
+    @staticmethod
+    def _endpoints(scenario_config: Dict[str, Any]) -> Set[Tuple[str, int, str]]:
+        """场景会写入的数据库端点；没有 host 的端点（如 loopback 的本地SQLite）不与其他场景共用"""
+        endpoints = set()
+        for side in ('source', 'target'):
+            endpoint = scenario_config.get(side) or {}
+            if endpoint.get('host'):
+                endpoints.add((str(endpoint['host']).lower(), endpoint.get('port'), endpoint.get('database')))
+        return endpoints
+
+    @classmethod
+    def plan_groups(cls, scenarios: List[str]) -> List[List[str]]:
+        """按共用端点把场景分组（传递闭包），组内保持命令行给定的顺序"""
+        loader = ConfigLoader()
+        groups: List[Tuple[Set[Tuple[str, int, str]], List[str]]] = []
+        for scenario in scenarios:
+            endpoints = cls._endpoints(loader.load_scenario(scenario))
+            merged_endpoints, merged = set(endpoints), []
+            for group in [g for g in groups if g[0] & endpoints]:
+                groups.remove(group)
+                merged_endpoints |= group[0]
+                merged.extend(group[1])
+            groups.append((merged_endpoints, merged + [scenario]))
+        # 合并后恢复命令行顺序
+        order = {scenario: index for index, scenario in enumerate(scenarios)}
+        return sorted((sorted(members, key=order.get) for _, members in groups), key=lambda m: order[m[0]])
+
+    def run(self, testcase_file: str = "common_tests.yaml", test_group: str = "basic",
+            parallel: int = 1, quiet: bool = False, events_path: str = None) -> List[Dict[str, Any]]:
+        """
+        并发运行所有场景组（组内串行），按完成顺序输出各场景日志；
+        events_path 指定时按场景顺序写入所有事件
+        """
+        print(f"\n{Fore.CYAN}并发运行 {len(self.scenarios)} 个场景: {', '.join(self.scenarios)}{Style.RESET_ALL}")
+        for group in self.groups:
+            if len(group) > 1:
+                print(f"{Fore.YELLOW}⚠ 场景 {', '.join(group)} 共用数据库端点，将依次运行{Style.RESET_ALL}")
+
+        outcomes = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            def submit(group: List[str], index: int):
+                future = executor.submit(_run_scenario, group[index], testcase_file, test_group, parallel,
+                                         quiet, events_path is not None)
+                futures[future] = (group, index)
+
+            futures = {}
+            for group in self.groups:
+                submit(group, 0)
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    group, index = futures.pop(future)
+                    scenario = group[index]
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        outcome = {'scenario': scenario, 'results': [], 'error': str(e), 'time': 0.0,
+                                   'output': '', 'events': []}
+
+                    outcomes[scenario] = outcome
+                    print(f"\n{Fore.CYAN}{'#'*60}")
+                    print(f"# 场景 {scenario} 完成 ({outcome['time']:.2f}s)")
+                    print(f"{'#'*60}{Style.RESET_ALL}")
+                    print(outcome['output'], end='')
+                    if index + 1 < len(group):
+                        submit(group, index + 1)
+
+        # 汇总按命令行给定的场景顺序
+        self.outcomes = [outcomes[s] for s in self.scenarios]
+        if events_path:
+            self.write_events(events_path)
+        self.print_summary()
+        return self.outcomes
+
+    def write_events(self, path: str):
+        """把各场景返回的事件写入一个JSONL文件（每个事件带 scenario 字段）"""
+        from ..events import JsonlWriter
+
+        writer = JsonlWriter(path)
+        for outcome in self.outcomes:
+            for record in outcome['events']:
+                writer(record)
+        writer.close()
+        print(f"✓ 事件流已导出: {path} ({writer.count} 条)")
+
+    def junit_suites(self) -> Dict[str, List[Dict[str, Any]]]:
+        """每个场景一个 JUnit testsuite"""
+        return {outcome['scenario']: outcome['results'] for outcome in self.outcomes}
+
+    def exit_code(self) -> int:
+        """任一场景出错或有失败用例时返回1"""
+        for outcome in self.outcomes:
+            if outcome['error'] or any(r['status'] == 'FAIL' for r in outcome['results']):
+                return 1
+        return 0
+
+    def print_summary(self):
+        """打印合并后的测试摘要"""
+        rows = []
+        for outcome in self.outcomes:
+            results = outcome['results']
+            passed = sum(1 for r in results if r['status'] == 'PASS')
+            failed = len(results) - passed
+            status = f"错误: {outcome['error'][:40]}" if outcome['error'] else ('PASS' if failed == 0 else 'FAIL')
+            rows.append([outcome['scenario'], len(results), passed, failed, f"{outcome['time']:.2f}", status])
+
+        total = sum(r[1] for r in rows)
+        passed = sum(r[2] for r in rows)
+
+        print(f"\n{Fore.CYAN}{'='*60}")
+        print(f"多场景测试摘要")
+        print(f"{'='*60}{Style.RESET_ALL}")
+        print(tabulate(rows, headers=['场景', '总计', '通过', '失败', '耗时(s)', '状态'], tablefmt='simple'))
+        print(f"\n总计: {total} | {Fore.GREEN}通过: {passed}{Style.RESET_ALL} | "
+              f"{Fore.RED}失败: {total - passed}{Style.RESET_ALL}")
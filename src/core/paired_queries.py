@@ -0,0 +1,33 @@
+"""
+源/目标成对查询 - 同一批查询在两端并发执行并记录每次查询的延迟，供索引基准对比结果和延迟
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+from ..tracing import get_tracer
+
+SIDES = ('source', 'target')
+
+
+def run_paired(adapter, queries: List[Tuple[str, tuple]], concurrency: int = 8,
+               span: str = 'index_query') -> Dict[str, Dict[str, List[Any]]]:
+    """
+    在源端和目标端各执行一遍 queries（(sql, params) 列表），两端的查询交替提交、同时进行
+
+    返回 {'source'|'target': {'rows': [每个查询的结果], 'latencies': [每个查询的秒数]}}，顺序与 queries 一致
+    """
+    def timed(side: str, sql: str, params: tuple):
+        query = adapter.query_source if side == 'source' else adapter.query_target
+        with get_tracer().span(span, side=side):
+            start = time.perf_counter()
+            rows = query(sql, params)
+            return rows, time.perf_counter() - start
+
+    outcome = {side: {'rows': [None] * len(queries), 'latencies': [None] * len(queries)} for side in SIDES}
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1) * 2) as executor:
+        futures = [(side, index, executor.submit(timed, side, sql, params))
+                   for index, (sql, params) in enumerate(queries) for side in SIDES]
+        for side, index, future in futures:
+            outcome[side]['rows'][index], outcome[side]['latencies'][index] = future.result()
+    return outcome
@@ -0,0 +1,159 @@
+"""
+全量 vs 增量基准 - 先在CDC启动前加载 N 行并测量初始全量复制，
+再施加一段增量负载并测量追平耗时，逐个场景、逐个 N 对比两种速率
+
+全量耗时从 setup_cdc 返回后开始计时（配置耗时单独列出）；增量耗时为增量写入开始至追平，
+增量速率 = 增量行数 / 增量耗时
+"""
+
+import time
+from typing import Dict, Any, List
+from tabulate import tabulate
+from colorama import Fore, Style, init
+from .test_runner import TestRunner
+from ..data.table_inserter import TableInserter
+from ..tracing import estimate_result_bytes
+
+init(autoreset=True)
+
+
+def parse_sizes(spec: str) -> List[int]:
+    """解析数据量列表，如 10000,100000"""
+    try:
+        sizes = [int(v) for v in spec.split(',') if v.strip()]
+    except ValueError:
+        raise ValueError(f"无效的数据量: {spec} (应为逗号分隔的整数)")
+    if not sizes or any(n <= 0 for n in sizes):
+        raise ValueError(f"无效的数据量: {spec}")
+    return sizes
+
+
+class SnapshotBenchmarkRunner:
+    """全量/增量同步基准执行器"""
+
+    def __init__(self, scenarios: List[str], sizes: List[int], table: str = 'cdc_test_base',
+                 incremental_rows: int = 1000, batch_size: int = 1000):
+        self.scenarios = scenarios
+        self.sizes = sizes
+        self.table = table
+        self.incremental_rows = incremental_rows
+        self.batch_size = batch_size
+        self.points = []
+
+    def run(self) -> List[Dict[str, Any]]:
+        """对每个场景和数据量运行一次三阶段基准"""
+        for scenario in self.scenarios:
+            for n in self.sizes:
+                print(f"\n{Fore.CYAN}[全量/增量基准] 场景={scenario}, N={n}{Style.RESET_ALL}")
+                point = {'scenario': scenario, 'n': n}
+                try:
+                    point.update(self._run_point(scenario, n))
+                except Exception as e:
+                    print(f"{Fore.RED}✗ 基准执行失败: {str(e)}{Style.RESET_ALL}")
+                    point['error'] = str(e)
+                self.points.append(point)
+
+        self.print_report()
+        return self.points
+
+    def _run_point(self, scenario: str, n: int) -> Dict[str, Any]:
+        """阶段1: CDC启动前加载 N 行；阶段2: 启动CDC并等待全量复制；阶段3: 增量负载并等待追平"""
+        runner = TestRunner(scenario)
+        adapter = runner.adapter
+        bench_cfg = runner.scenario_config.get('benchmark', {})
+        timeout = bench_cfg.get('timeout', 600)
+        poll_interval = bench_cfg.get('poll_interval', 1)
+        result = {}
+
+        adapter.connect()
+        try:
+            self._reset_tables(adapter)
+            self._insert(adapter, n)
+            row_bytes = self._row_bytes(adapter)
+
+            start = time.time()
+            adapter.setup_cdc()
+            result['setup_time'] = time.time() - start
+            try:
+                copy_time = self._wait_converged(adapter, time.time(), timeout, poll_interval)
+                result['snapshot_time'] = copy_time
+                result['snapshot_rows_per_sec'] = n / copy_time if copy_time > 0 else 0.0
+                result['snapshot_mb_per_sec'] = n * row_bytes / copy_time / 1024 / 1024 if copy_time > 0 else 0.0
+
+                start = time.time()
+                self._insert(adapter, self.incremental_rows)
+                result['workload_time'] = time.time() - start
+                incremental_time = self._wait_converged(adapter, start, timeout, poll_interval)
+                result['incremental_time'] = incremental_time
+                result['catchup_time'] = incremental_time - result['workload_time']
+                result['incremental_rows_per_sec'] = (
+                    self.incremental_rows / incremental_time if incremental_time > 0 else 0.0)
+            finally:
+                adapter.teardown_cdc()
+        finally:
+            adapter.disconnect()
+
+        return result
+
+    def _reset_tables(self, adapter):
+        """清空源表和目标表，保证全量阶段只复制本次加载的 N 行"""
+        adapter.execute_on_source(f"TRUNCATE TABLE {self.table}")
+        try:
+            adapter.execute_on_target(f"TRUNCATE TABLE {self.table}")
+        except Exception as e:
+            print(f"  {Fore.YELLOW}⚠ 清空目标表失败: {str(e)}{Style.RESET_ALL}")
+
+    def _insert(self, adapter, count: int):
+        """按表名选择对应的插入方法，如 cdc_test_partition_range -> insert_partition_range_table"""
+        if count <= 0:
+            return
+        key = self.table[len('cdc_test_'):] if self.table.startswith('cdc_test_') else self.table
+        with adapter.source_connection() as conn:
+            inserter = TableInserter(conn, self.batch_size)
+            insert = getattr(inserter, f"insert_{key}_table", None)
+            if insert is None:
+                raise ValueError(f"不支持的基准表: {self.table}")
+            insert(count, self.table)
+
+    def _row_bytes(self, adapter) -> float:
+        """按源表样本行估算平均行字节数"""
+        rows = adapter.query_source(f"SELECT * FROM {self.table} LIMIT 1000")
+        return estimate_result_bytes(rows) / len(rows) if rows else 0.0
+
+    def _wait_converged(self, adapter, start: float, timeout: float, poll_interval: float) -> float:
+        """轮询直到源和目标行数一致，返回自 start 起的耗时"""
+        while time.time() - start < timeout:
+            source_count, target_count = adapter.poll_counts(self.table)
+            if source_count == target_count and source_count > 0:
+                return time.time() - start
+            adapter.sleep(poll_interval)
+        raise TimeoutError(f"{self.table} 在 {timeout}s 内未收敛")
+
+    def print_report(self):
+        """打印全量/增量速率对比表"""
+        headers = ['场景', 'N', '配置耗时(s)', '全量耗时(s)', '全量(行/s)', '全量(MB/s)',
+                   '增量行数', '增量写入(s)', '增量耗时(s)', '增量(行/s)', '全量/增量']
+
+        rows = []
+        for point in self.points:
+            if 'error' in point:
+                rows.append([point['scenario'], point['n']] + ['-'] * 8 + [f"错误: {point['error'][:40]}"])
+                continue
+            incremental = point['incremental_rows_per_sec']
+            rows.append([
+                point['scenario'], point['n'], f"{point['setup_time']:.2f}", f"{point['snapshot_time']:.2f}",
+                f"{point['snapshot_rows_per_sec']:.1f}", f"{point['snapshot_mb_per_sec']:.2f}",
+                self.incremental_rows, f"{point['workload_time']:.2f}", f"{point['incremental_time']:.2f}",
+                f"{incremental:.1f}",
+                f"{point['snapshot_rows_per_sec'] / incremental:.2f}" if incremental > 0 else '-'
+            ])
+
+        print(f"\n{Fore.CYAN}{'='*60}")
+        print(f"全量 vs 增量同步基准 (表: {self.table})")
+        print(f"{'='*60}{Style.RESET_ALL}")
+        print(tabulate(rows, headers=headers, tablefmt='simple'))
+        print("全量耗时不含配置耗时；增量耗时为增量写入开始至追平，增量速率 = 增量行数 / 增量耗时")
+
+    def exit_code(self) -> int:
+        """存在失败的基准点时返回1"""
+        return 1 if any('error' in p for p in self.points) else 0
@@ -0,0 +1,28 @@
+"""
+统计工具 - 百分位数和延迟分布汇总
+"""
+
+import math
+from typing import Dict, Any, List, Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """已排序序列的第 q 百分位数（0-100，线性插值）；空序列返回 None"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower, upper = math.floor(position), math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def latency_summary(seconds: List[float], percentiles: Sequence[float] = (50, 90, 99)) -> Dict[str, Any]:
+    """延迟样本（秒）的分布汇总，单位毫秒: {count, mean_ms, p50_ms, ..., max_ms}"""
+    values = sorted(seconds)
+    summary = {'count': len(values), 'mean_ms': sum(values) * 1000 / len(values) if values else None}
+    for q in percentiles:
+        value = percentile(values, q)
+        summary[f"p{q:g}_ms"] = value * 1000 if value is not None else None
+    summary['max_ms'] = values[-1] * 1000 if values else None
+    return summary
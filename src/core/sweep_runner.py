@@ -0,0 +1,193 @@
+"""
+参数扫描 - 对CDC调优参数的每个组合运行一次测试组
+"""
+
+import itertools
+import yaml
+from typing import Dict, Any, List
+from tabulate import tabulate
+from colorama import Fore, Style, init
+from .config_loader import ConfigLoader
+from .test_runner import TestRunner
+from ..schema.table_definitions import TABLE_SCHEMAS
+
+init(autoreset=True)
+
+
+# 调优参数简写 -> 场景配置中的点分路径
+TUNING_KNOBS = {
+    'batch_size': 'cdc_config.batch_size',
+    'consumer_batch_size': 'flink_cdc.consumer_batch_size',
+    'sync_interval': 'cdc_config.sync_interval',
+}
+
+# 调优参数 -> 实际读取该参数的场景类型（其他场景扫描不会产生差异）
+KNOB_SCENARIOS = {
+    'cdc_config.batch_size': ('mo_to_mo',),
+    'flink_cdc.consumer_batch_size': ('flink_cdc',),
+    'cdc_config.sync_interval': ('cross_cluster',),
+}
+
+
+def parse_sweep_spec(spec: str) -> Dict[str, List[Any]]:
+    """
+    解析单个扫描参数
+
+    支持两种写法:
+      batch_size=500,1000,2000     (枚举)
+      batch_size=500:2000:500      (范围 start:stop:step，包含stop)
+    """
+    if '=' not in spec:
+        raise ValueError(f"无效的扫描参数: {spec} (应为 key=values)")
+
+    key, values_str = spec.split('=', 1)
+    key = key.strip()
+    path = TUNING_KNOBS.get(key, key)
+
+    if ':' in values_str:
+        parts = [yaml.safe_load(p) for p in values_str.split(':')]
+        if len(parts) != 3 or parts[2] <= 0:
+            raise ValueError(f"无效的范围: {values_str} (应为 start:stop:step)")
+        start, stop, step = parts
+        values = []
+        value = start
+        while value <= stop:
+            values.append(value)
+            value += step
+    else:
+        values = [yaml.safe_load(v) for v in values_str.split(',') if v.strip()]
+
+    if not values:
+        raise ValueError(f"扫描参数没有取值: {spec}")
+
+    return {path: values}
+
+
+class SweepRunner:
+    """参数扫描执行器"""
+
+    def __init__(self, scenario: str, grid: Dict[str, List[Any]], reseed_rows: int = None):
+        self.scenario = scenario
+        self.grid = grid
+        # 每个扫描点配置CDC前清空并重新写入的行数；None 时各扫描点共用并累积修改同一数据集
+        self.reseed_rows = reseed_rows
+        self.points = []
+        self._check_knobs(ConfigLoader().load_scenario(scenario))
+
+    def _check_knobs(self, scenario_config: Dict[str, Any]):
+        """拒绝当前场景不会读取的调优参数，避免各扫描点实际运行同一配置"""
+        scenario_type = scenario_config['scenario_type']
+        for path in self.grid:
+            types = KNOB_SCENARIOS.get(path)
+            if types is not None and scenario_type not in types:
+                raise ValueError(f"场景类型 {scenario_type} 不使用 {path} (仅 {', '.join(types)})")
+
+        batch_option = scenario_config.get('cdc_config', {}).get('batch_size_option')
+        if 'cdc_config.batch_size' in self.grid and not (batch_option or 'cdc_config.batch_size_option' in self.grid):
+            raise ValueError("未配置 cdc_config.batch_size_option，batch_size 不会传递给CDC任务")
+
+    def combinations(self) -> List[Dict[str, Any]]:
+        """生成参数网格的全部组合"""
+        keys = list(self.grid.keys())
+        return [dict(zip(keys, values)) for values in itertools.product(*(self.grid[k] for k in keys))]
+
+    def _seed_tables(self, testcase_file: str, test_group: str) -> List[str]:
+        """测试组涉及的、有数据生成器的表（重置数据集时清空并重新写入）"""
+        plan = ConfigLoader().load_test_plan(testcase_file)
+        cases = plan.select(test_group)
+        if cases is None:
+            cases = plan.cases
+        tables = {table for case in cases for table in case.tables}
+        return sorted(t for t in tables if t.startswith('cdc_test_') and t[len('cdc_test_'):] in TABLE_SCHEMAS)
+
+    def run(self, testcase_file: str = "common_tests.yaml", test_group: str = "basic") -> List[Dict[str, Any]]:
+        """对每个参数组合运行一次测试组；指定 reseed_rows 时每个扫描点从相同的初始数据集开始"""
+        combos = self.combinations()
+        prepare = None
+        if self.reseed_rows:
+            tables = self._seed_tables(testcase_file, test_group)
+
+            def prepare(runner: TestRunner):
+                for table in tables:
+                    runner.reseed_table(table, self.reseed_rows)
+        else:
+            print(f"{Fore.YELLOW}⚠ 未指定重置行数，各扫描点共用同一数据集，前一个扫描点的变更会影响后续扫描点"
+                  f"{Style.RESET_ALL}")
+
+        for index, overrides in enumerate(combos, 1):
+            label = ', '.join(f"{k}={v}" for k, v in overrides.items())
+            print(f"\n{Fore.CYAN}[扫描 {index}/{len(combos)}] {label}{Style.RESET_ALL}")
+
+            point = {'params': overrides}
+            try:
+                runner = TestRunner(self.scenario, overrides)
+                results = runner.run_tests(testcase_file, test_group, prepare=prepare)
+                point.update(self._summarize(results))
+            except Exception as e:
+                print(f"{Fore.RED}✗ 扫描点执行失败: {str(e)}{Style.RESET_ALL}")
+                point['error'] = str(e)
+
+            self.points.append(point)
+
+        self.print_report()
+        return self.points
+
+    def _summarize(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        汇总一次运行的收敛时间和吞吐
+
+        增量吞吐 = 本次运行中写入/变更的行数（changed_rows）/ 这些用例的收敛耗时；
+        目标表总行数包含之前已同步的数据，不计入增量吞吐。
+        重置数据集时，第一个变更用例之前的同步验证用例测量的是初始全量复制：
+        全量吞吐 = 这些用例验证通过时的目标表行数 / 它们的收敛耗时
+        """
+        measured = [r for r in results if r.get('changed_rows')]
+        sync_time = sum(r.get('sync_time', 0.0) for r in measured)
+        rows = sum(r['changed_rows'] for r in measured)
+        summary = {
+            'passed': sum(1 for r in results if r['status'] == 'PASS'),
+            'failed': sum(1 for r in results if r['status'] == 'FAIL'),
+            'sync_time': sync_time,
+            'rows': rows,
+            'throughput': rows / sync_time if sync_time > 0 else 0.0
+        }
+        if self.reseed_rows:
+            snapshot = []
+            for r in results:
+                if r.get('changed_rows'):
+                    break
+                if r.get('sync_time') is not None and r.get('rows') is not None:
+                    snapshot.append(r)
+            snapshot_time = sum(r['sync_time'] for r in snapshot)
+            snapshot_rows = sum(r['rows'] for r in snapshot)
+            summary.update({
+                'snapshot_time': snapshot_time,
+                'snapshot_rows': snapshot_rows,
+                'snapshot_throughput': snapshot_rows / snapshot_time if snapshot_time > 0 else 0.0
+            })
+        return summary
+
+    def print_report(self):
+        """打印扫描结果表"""
+        keys = list(self.grid.keys())
+        snapshot_headers = ['全量行数', '全量耗时(s)', '全量(行/s)'] if self.reseed_rows else []
+        headers = ([k.split('.')[-1] for k in keys] + ['通过', '失败'] + snapshot_headers
+                   + ['增量耗时(s)', '变更行数', '增量(行/s)'])
+
+        rows = []
+        for point in self.points:
+            row = [point['params'][k] for k in keys]
+            if 'error' in point:
+                row += ['-'] * (len(headers) - len(keys) - 1) + [f"错误: {point['error'][:40]}"]
+            else:
+                row += [point['passed'], point['failed']]
+                if self.reseed_rows:
+                    row += [point['snapshot_rows'], f"{point['snapshot_time']:.2f}",
+                            f"{point['snapshot_throughput']:.1f}"]
+                row += [f"{point['sync_time']:.2f}", point['rows'], f"{point['throughput']:.1f}"]
+            rows.append(row)
+
+        print(f"\n{Fore.CYAN}{'='*60}")
+        print(f"参数扫描结果")
+        print(f"{'='*60}{Style.RESET_ALL}")
+        print(tabulate(rows, headers=headers, tablefmt='simple'))
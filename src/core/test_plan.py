@@ -0,0 +1,299 @@
+"""
+测试计划编译 - 把测试用例YAML编译为经过校验的执行计划
+
+每个步骤在加载时检查动作、必填参数和参数类型，填充默认值并预先解析目标表和涉及的表；
+未知动作或参数错误在加载阶段即报错，而不是在运行时被跳过
+"""
+
+import re
+from typing import Dict, Any, List, Optional
+from ..network.proxy import FAULT_TYPES
+from ..schema.table_definitions import TABLE_SCHEMAS, get_fulltext_indexes
+
+# 从步骤SQL中推断涉及的表
+SQL_TABLE_PATTERN = re.compile(r'\b(?:FROM|UPDATE|INTO|JOIN)\s+`?(\w+)`?', re.IGNORECASE)
+
+_NUMBER = (int, float)
+
+# 所有步骤都可使用的参数：table 覆盖用例的表
+_COMMON_PARAMS = {'table': (str, None), 'description': (str, None)}
+
+# 动作 -> 参数规格
+#   required: {参数: 类型}    optional: {参数: (类型, 默认值)}    needs_table: 是否必须有目标表
+#   exclusive: 影响所有表（如暂停整个CDC任务），所在用例不与其他用例并发
+STEP_SPECS: Dict[str, Dict[str, Any]] = {
+    'validate_sync': {'optional': {'timeout': (_NUMBER, 60)}, 'needs_table': True},
+    'update': {'required': {'sql': str}},
+    'delete': {'required': {'sql': str}},
+    # sql 与 data（行字典列表）二选一
+    'insert': {'optional': {'sql': (str, None), 'data': (list, None)}},
+    'bulk_insert': {'required': {'count': int}, 'optional': {'batch_size': (int, 1000)}, 'needs_table': True},
+    'concurrent_insert': {'required': {'threads': int, 'rows_per_thread': int},
+                          'optional': {'batch_size': (int, 1000)}, 'needs_table': True},
+    'create_table': {'required': {'schema': list}, 'needs_table': True},
+    'measure_sync_delay': {'optional': {'insert_count': (int, 100), 'batch_size': (int, 1000), 'timeout': (_NUMBER, 300),
+                                        'poll_interval': (_NUMBER, 0.5)}, 'needs_table': True},
+    'validate': {'required': {'check': str},
+                 'optional': {'expected': (int, None), 'where': (str, None), 'timeout': (_NUMBER, 60)},
+                 'needs_table': True},
+    # sql 与 queries（SQL列表）二选一；目标端按退避间隔重试直到与源端结果摘要一致或超时
+    'validate_index_query': {'optional': {
+        'sql': (str, None), 'queries': (list, None), 'timeout': (_NUMBER, 60), 'ordered': (bool, False),
+        'initial_interval': (_NUMBER, 0.2), 'max_interval': (_NUMBER, 5), 'concurrency': (int, 8)
+    }},
+    'check_subscription_status': {'optional': {'expected_state': ((int, str), None)}},
+    'check_producer_status': {},
+    'check_consumer_status': {},
+    'check_kafka_status': {},
+    # 暂停/恢复CDC任务（mo_to_mo）；restart 为 True 时从头重新同步
+    'pause_cdc': {'exclusive': True},
+    'resume_cdc': {'optional': {'restart': (bool, False)}, 'exclusive': True},
+    'simulate_network_issue': {'optional': {
+        'type': (str, None), 'duration': (_NUMBER, None), 'link': (str, None), 'latency_ms': (_NUMBER, None),
+        'jitter_ms': (_NUMBER, None), 'bandwidth_kbps': (_NUMBER, None), 'schedule': (list, None)
+    }},
+    # where 限定判断恢复时比较的行（通常为故障期间改动的行）
+    'wait_for_recovery': {'optional': {'timeout': (_NUMBER, 300), 'where': (str, None)}},
+    # 向量k-NN召回率/延迟基准；min_recall 约束目标端召回率，max_recall_gap 约束源端与目标端召回率之差
+    'vector_benchmark': {'optional': {
+        'queries': (int, 50), 'k': (int, 10), 'concurrency': (int, 8), 'column': (str, 'embedding'),
+        'id_column': (str, 'id'), 'noise': (_NUMBER, 0.05), 'seed': (int, None),
+        'min_recall': (_NUMBER, None), 'max_recall_gap': (_NUMBER, None)
+    }, 'needs_table': True},
+    # 全文检索一致性/延迟基准；indexes 默认为表的全部全文索引，max_divergence 约束两端结果不一致的查询比例
+    'fulltext_benchmark': {'optional': {
+        'queries': (int, 20), 'concurrency': (int, 8), 'indexes': (list, None), 'id_column': (str, 'id'),
+        'sample_rows': (int, 200), 'seed': (int, None), 'max_divergence': (_NUMBER, None)
+    }, 'needs_table': True},
+}
+
+VALIDATE_CHECKS = ('data_match', 'row_count')
+
+# 由数据生成器写入数据的动作，目标表必须是 cdc_test_<TABLE_SCHEMAS中的表>
+GENERATED_INSERT_ACTIONS = ('bulk_insert', 'concurrent_insert', 'measure_sync_delay')
+
+
+class TestPlanError(ValueError):
+    """测试用例文件编译失败（包含所有错误）"""
+
+    def __init__(self, source: str, errors: List[str]):
+        self.errors = errors
+        super().__init__(f"测试用例文件 {source} 无效:\n  " + "\n  ".join(errors))
+
+
+class Step:
+    """编译后的步骤：参数已校验并填充默认值"""
+
+    def __init__(self, action: str, table: Optional[str], options: Dict[str, Any], tables: frozenset):
+        self.action = action
+        self.table = table
+        # update/delete/validate_index_query 的SQL，或编译时为 insert(data)/create_table 生成的SQL
+        self.sql = options.get('sql')
+        self.timeout = options.get('timeout')
+        self.options = options
+        # 步骤涉及的表（目标表及SQL中引用的表），用于冲突集划分
+        self.tables = tables
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取步骤参数，未设置时返回 default"""
+        value = self.options.get(key)
+        return default if value is None else value
+
+    def explicit_options(self) -> Dict[str, Any]:
+        """用例中显式设置的参数（不含公共参数和编译生成的参数）"""
+        return {k: v for k, v in self.options.items()
+                if v is not None and k not in _COMMON_PARAMS and k not in ('sql', 'rows')}
+
+
+class TestCase:
+    """编译后的测试用例"""
+
+    def __init__(self, case_id: str, name: str, description: str, table: Optional[str],
+                 steps: List[Step], tables: frozenset):
+        self.id = case_id
+        self.name = name
+        self.description = description
+        self.table = table
+        self.steps = steps
+        # 冲突集：声明的 table / conflicts 及所有步骤涉及的表
+        self.tables = tables
+        # 含影响所有表的步骤时不与其他用例并发
+        self.exclusive = any(STEP_SPECS[step.action].get('exclusive') for step in steps)
+
+
+class TestPlan:
+    """编译后的测试用例文件"""
+
+    def __init__(self, source: str, suite: Dict[str, Any], groups: Dict[str, List[str]], cases: List[TestCase]):
+        self.source = source
+        self.suite = suite
+        self.groups = groups
+        self.cases = cases
+
+    def select(self, group: str) -> Optional[List[TestCase]]:
+        """测试组中的用例（按文件中的顺序）；组不存在时返回 None"""
+        ids = self.groups.get(group)
+        if not ids:
+            return None
+        wanted = set(ids)
+        return [case for case in self.cases if case.id in wanted]
+
+
+def _matches(value: Any, expected) -> bool:
+    """None 视为未设置；bool 不算作数值"""
+    if value is None:
+        return True
+    if isinstance(value, bool):
+        return expected is bool
+    return isinstance(value, expected)
+
+
+def _type_name(expected) -> str:
+    types = expected if isinstance(expected, tuple) else (expected,)
+    return '/'.join(t.__name__ for t in types)
+
+
+def _compile_step(raw: Any, case_table: Optional[str], where: str, errors: List[str]) -> Optional[Step]:
+    """校验单个步骤，出错时记录到 errors 并返回 None"""
+    if not isinstance(raw, dict) or 'action' not in raw:
+        errors.append(f"{where}: 步骤必须是包含 action 的映射")
+        return None
+
+    action = raw['action']
+    spec = STEP_SPECS.get(action)
+    if spec is None:
+        errors.append(f"{where}: 未知动作 '{action}' (可选: {', '.join(sorted(STEP_SPECS))})")
+        return None
+
+    required = spec.get('required', {})
+    optional = dict(_COMMON_PARAMS, **spec.get('optional', {}))
+    step_errors = []
+    options = {}
+
+    for key, value in raw.items():
+        if key == 'action':
+            continue
+        expected = required.get(key) or optional.get(key, (None,))[0]
+        if expected is None:
+            step_errors.append(f"{where} ({action}): 未知参数 '{key}'")
+        elif not _matches(value, expected):
+            step_errors.append(f"{where} ({action}): 参数 '{key}' 应为 {_type_name(expected)}，实际为 {value!r}")
+        else:
+            options[key] = value
+
+    for key in required:
+        if raw.get(key) is None:
+            step_errors.append(f"{where} ({action}): 缺少必填参数 '{key}'")
+    for key, (_, default) in optional.items():
+        options.setdefault(key, default)
+
+    # 动作特有的约束
+    if action == 'insert' and (options['sql'] is None) == (options['data'] is None):
+        step_errors.append(f"{where} (insert): sql 和 data 必须且只能指定一个")
+    if action == 'insert' and options['data'] is not None and not all(isinstance(r, dict) for r in options['data']):
+        step_errors.append(f"{where} (insert): data 必须是行映射的列表")
+    if action == 'validate_index_query':
+        if (options['sql'] is None) == (options['queries'] is None):
+            step_errors.append(f"{where} (validate_index_query): sql 和 queries 必须且只能指定一个")
+        elif options['queries'] is not None and not (options['queries']
+                                                     and all(isinstance(q, str) for q in options['queries'])):
+            step_errors.append(f"{where} (validate_index_query): queries 必须是非空的SQL字符串列表")
+    if action == 'validate' and options.get('check') not in (None, *VALIDATE_CHECKS):
+        step_errors.append(f"{where} (validate): 未知检查 '{options['check']}' (可选: {', '.join(VALIDATE_CHECKS)})")
+    if action == 'validate' and options.get('check') == 'row_count' and options['expected'] is None:
+        step_errors.append(f"{where} (validate): row_count 检查需要 expected")
+    if action == 'simulate_network_issue' and options['type'] is not None and options['type'] not in FAULT_TYPES:
+        step_errors.append(f"{where} (simulate_network_issue): 未知故障类型 '{options['type']}' "
+                           f"(可选: {', '.join(FAULT_TYPES)})")
+
+    table = options['table'] or case_table
+    if spec.get('needs_table') and not table:
+        step_errors.append(f"{where} ({action}): 未指定表（用例或步骤的 table）")
+    if action == 'insert' and options['data'] is not None and not table:
+        step_errors.append(f"{where} (insert): 使用 data 时必须指定表")
+
+    if (action in GENERATED_INSERT_ACTIONS and table
+            and not (table.startswith('cdc_test_') and table[len('cdc_test_'):] in TABLE_SCHEMAS)):
+        step_errors.append(f"{where} ({action}): 表 {table} 没有对应的数据生成器 "
+                           f"(可选: {', '.join('cdc_test_' + key for key in TABLE_SCHEMAS)})")
+
+    if action == 'fulltext_benchmark' and table:
+        known = get_fulltext_indexes(table)
+        if not known:
+            step_errors.append(f"{where} (fulltext_benchmark): 表 {table} 没有全文索引定义")
+        unknown = [name for name in options['indexes'] or [] if name not in known]
+        if known and unknown:
+            step_errors.append(f"{where} (fulltext_benchmark): 未知全文索引 {', '.join(map(str, unknown))} "
+                               f"(可选: {', '.join(known)})")
+
+    if step_errors:
+        errors.extend(step_errors)
+        return None
+
+    # 预先生成SQL：data 按首行的列生成参数化INSERT，create_table 拼接列定义
+    if action == 'insert' and options['data'] is not None:
+        columns = list(options['data'][0]) if options['data'] else []
+        options['sql'] = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                          f"VALUES ({', '.join(['%s'] * len(columns))})")
+        options['rows'] = [tuple(row.get(column) for column in columns) for row in options['data']]
+    if action == 'create_table':
+        options['sql'] = f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(options['schema'])})"
+
+    # validate_index_query 统一为 queries 列表（基准步骤的 queries 是查询数量，不是SQL）
+    if action == 'validate_index_query':
+        options['queries'] = options['queries'] or [options['sql']]
+        sqls = options['queries']
+    else:
+        sqls = [options['sql']] if options.get('sql') else []
+    tables = {name for sql in sqls for name in SQL_TABLE_PATTERN.findall(sql)}
+    if options['table'] or spec.get('needs_table'):
+        tables.add(table)
+    return Step(action, table, options, frozenset(tables))
+
+
+def compile_test_plan(raw: Dict[str, Any], source: str) -> TestPlan:
+    """编译测试用例文件内容，所有错误汇总后一次性抛出 TestPlanError"""
+    errors: List[str] = []
+    if not isinstance(raw, dict):
+        raise TestPlanError(source, ["文件内容必须是映射"])
+
+    cases = []
+    seen = set()
+    for position, raw_case in enumerate(raw.get('test_cases') or []):
+        case_id = raw_case.get('id') if isinstance(raw_case, dict) else None
+        where = f"用例 {case_id or '#' + str(position + 1)}"
+        if not case_id:
+            errors.append(f"{where}: 缺少 id")
+            continue
+        if case_id in seen:
+            errors.append(f"{where}: id 重复")
+            continue
+        seen.add(case_id)
+
+        raw_steps = raw_case.get('steps')
+        if not isinstance(raw_steps, list) or not raw_steps:
+            errors.append(f"{where}: steps 必须是非空列表")
+            continue
+
+        table = raw_case.get('table') or None
+        steps = [_compile_step(s, table, f"{where} 步骤{i + 1}", errors) for i, s in enumerate(raw_steps)]
+        if any(step is None for step in steps):
+            continue
+
+        tables = set(raw_case.get('conflicts', []))
+        if table:
+            tables.add(table)
+        for step in steps:
+            tables |= step.tables
+        cases.append(TestCase(case_id, raw_case.get('name', case_id), raw_case.get('description', ''),
+                              table, steps, frozenset(tables)))
+
+    groups = raw.get('test_groups') or {}
+    for group, ids in groups.items():
+        for case_id in ids or []:
+            if case_id not in seen:
+                errors.append(f"测试组 {group}: 引用了不存在的用例 {case_id}")
+
+    if errors:
+        raise TestPlanError(source, errors)
+    return TestPlan(source, raw.get('test_suite') or {'name': source}, groups, cases)
@@ -1,11 +1,15 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List
 from ..adapters.base_adapter import BaseAdapter
-from ..adapters.mo_to_mo_adapter import MoToMoAdapter
-from ..adapters.mo_to_mysql_adapter import MoToMysqlAdapter
-from ..adapters.cross_cluster_adapter import CrossClusterAdapter
-from ..adapters.flink_cdc_adapter import FlinkCdcAdapter
+from ..adapters.registry import ADAPTER_REGISTRY, get_adapter_class
 from .config_loader import ConfigLoader
+from .cdc_session import CdcSession
+from .test_plan import STEP_SPECS, Step, TestCase
+from ..adapters.ccpr_monitor import DEFAULT_STATE_COLUMNS
+from ..network import NetworkManager
+from ..tracing import get_tracer
+from ..events import get_events, event_context
 from colorama import Fore, Style, init
+from concurrent.futures import ThreadPoolExecutor
 import time
 
 init(autoreset=True)
@@ -14,117 +18,508 @@ init(autoreset=True)
 class TestRunner:
     """测试执行引擎"""
     
-    ADAPTER_MAP = {
-        'mo_to_mo': MoToMoAdapter,
-        'mo_to_mysql': MoToMysqlAdapter,
-        'cross_cluster': CrossClusterAdapter,
-        'flink_cdc': FlinkCdcAdapter
-    }
+    # 场景类型 -> 适配器类或 "模块:类名"（适配器模块在首次使用时导入）
+    ADAPTER_MAP = ADAPTER_REGISTRY
     
-    def __init__(self, scenario: str):
+    def __init__(self, scenario: str, overrides: Dict[str, Any] = None):
         self.config_loader = ConfigLoader()
         self.scenario_config = self.config_loader.load_scenario(scenario)
-        self.adapter = self._create_adapter()
+        if overrides:
+            self._apply_overrides(overrides)
+        adapter_class = get_adapter_class(self.scenario_config['scenario_type'], self.ADAPTER_MAP)
+        # 网络代理需在创建适配器前启动，以便改写端点地址
+        self.network = NetworkManager.from_config(self.scenario_config, adapter_class.REPLICATION_ENDPOINTS)
+        self.adapter: BaseAdapter = adapter_class(self.scenario_config)
+        if self.network:
+            self.adapter.wire_bytes = lambda: self.network.counters()['bytes']
         self.results = []
     
-    def _create_adapter(self) -> BaseAdapter:
-        """根据场景类型创建对应的适配器"""
-        scenario_type = self.scenario_config['scenario_type']
-        adapter_class = self.ADAPTER_MAP.get(scenario_type)
-        
-        if not adapter_class:
-            raise ValueError(f"不支持的场景类型: {scenario_type}")
-        
-        return adapter_class(self.scenario_config)
+    def _apply_overrides(self, overrides: Dict[str, Any]):
+        """按点分路径覆盖场景配置，如 cdc_config.batch_size"""
+        for path, value in overrides.items():
+            node = self.scenario_config
+            keys = path.split('.')
+            for key in keys[:-1]:
+                node = node.setdefault(key, {})
+            node[keys[-1]] = value
     
-    def run_tests(self, testcase_file: str = "common_tests.yaml", test_group: str = "basic"):
-        """运行测试用例"""
-        testcases = self.config_loader.load_testcases(testcase_file)
+    def run_tests(self, testcase_file: str = "common_tests.yaml", test_group: str = "basic", parallel: int = 1,
+                  session: CdcSession = None, prepare: Callable[['TestRunner'], None] = None):
+        """
+        运行测试用例，parallel > 1 时按表冲突集并发执行
         
-        print(f"\n{Fore.CYAN}{'='*60}")
-        print(f"场景: {self.scenario_config['scenario_name']}")
-        print(f"测试套件: {testcases['test_suite']['name']}")
-        print(f"测试组: {test_group}")
-        print(f"{'='*60}{Style.RESET_ALL}\n")
+        传入 session 时复用状态文件中记录的CDC，结束后保留CDC供后续运行使用；
+        prepare 在连接建立后、配置CDC之前调用（参数扫描在此重置数据集）
+        """
+        plan = self.config_loader.load_test_plan(testcase_file)
+        events = get_events()
+        events.emit('run_start', scenario=self.scenario_config['scenario_type'],
+                    scenario_name=self.scenario_config['scenario_name'], suite=plan.suite['name'],
+                    group=test_group, parallel=parallel)
+        
+        tracer = get_tracer()
+        keep_cdc = False
         
         try:
-            self.adapter.connect()
-            self.adapter.setup_cdc()
+            with tracer.span('connect', scenario=self.scenario_config['scenario_type']):
+                self.adapter.connect()
+            if prepare:
+                prepare(self)
+            with tracer.span('setup_cdc', session=session is not None):
+                if session:
+                    self._setup_session_cdc(session)
+                    keep_cdc = True
+                else:
+                    self.adapter.setup_cdc()
             
             # 根据测试组筛选测试用例
-            test_ids = testcases.get('test_groups', {}).get(test_group, [])
-            if not test_ids:
-                print(f"{Fore.YELLOW}⚠ 未找到测试组 '{test_group}'，运行所有测试{Style.RESET_ALL}")
-                test_cases = testcases['test_cases']
-            else:
-                test_cases = [tc for tc in testcases['test_cases'] if tc['id'] in test_ids]
+            test_cases = plan.select(test_group)
+            if test_cases is None:
+                events.emit('group_missing', group=test_group)
+                test_cases = plan.cases
             
-            for test_case in test_cases:
-                result = self._run_single_test(test_case)
-                self.results.append(result)
+            if parallel > 1:
+                self.results.extend(self._run_parallel(test_cases, parallel))
+            else:
+                for test_case in test_cases:
+                    result = self._run_single_test(test_case)
+                    self.results.append(result)
             
         finally:
-            self.adapter.teardown_cdc()
-            self.adapter.disconnect()
+            if not keep_cdc:
+                with tracer.span('teardown_cdc'):
+                    self.adapter.teardown_cdc()
+            with tracer.span('disconnect'):
+                self.adapter.disconnect()
+            if self.network:
+                self.network.close()
         
         self._print_summary()
         return self.results
     
-    def _run_single_test(self, test_case: Dict[str, Any]) -> Dict[str, Any]:
-        """运行单个测试用例"""
-        test_id = test_case['id']
-        test_name = test_case['name']
-        table = test_case.get('table', '')
+    def _setup_session_cdc(self, session: CdcSession):
+        """会话模式：能接管已有CDC则复用，否则新建并记录句柄"""
+        state = session.load()
+        scenario_type = self.scenario_config['scenario_type']
+        
+        if state and state.get('scenario_type') == scenario_type:
+            if self.adapter.restore_cdc_state(state.get('handles', {})):
+                print(f"{Fore.GREEN}✓ 复用CDC会话 (创建于 {state.get('created_at')}){Style.RESET_ALL}\n")
+                return
+            print(f"{Fore.YELLOW}⚠ 会话中的CDC句柄已失效，重新配置{Style.RESET_ALL}")
         
-        print(f"{Fore.YELLOW}[{test_id}] {test_name}{Style.RESET_ALL}")
-        if table:
-            print(f"  表: {table}")
+        self.adapter.setup_cdc()
+        session.save(scenario_type, self.adapter.export_cdc_state())
+        print(f"✓ CDC会话已保存: {session.path}\n")
+    
+    def teardown_session(self, session: CdcSession) -> bool:
+        """清理会话中记录的CDC并删除状态文件"""
+        state = session.load()
+        if not state:
+            print(f"{Fore.YELLOW}⚠ 未找到CDC会话: {session.path}{Style.RESET_ALL}")
+            return False
+        
+        try:
+            self.adapter.connect()
+            if self.adapter.restore_cdc_state(state.get('handles', {})):
+                self.adapter.teardown_cdc()
+            else:
+                print(f"{Fore.YELLOW}⚠ 会话中的CDC已不存在，仅删除状态文件{Style.RESET_ALL}")
+        finally:
+            self.adapter.disconnect()
+        
+        session.clear()
+        print(f"{Fore.GREEN}✓ CDC会话已清理: {session.path}{Style.RESET_ALL}")
+        return True
+    
+    def _plan_phases(self, test_cases: List[TestCase]) -> List[List[List[int]]]:
+        """
+        将用例划分为依次执行的阶段，每个阶段由可并发的执行队列组成
+        
+        冲突集（声明的 table / conflicts 及步骤涉及的表）有交集的用例合并到同一队列并保持原始顺序；
+        未涉及任何表的用例（如网络故障、全局步骤）和含独占步骤（如暂停CDC任务）的用例可能影响所有表，
+        按原始位置单独成为一个阶段，与其他用例都不并发
+        """
+        phases = []
+        lanes = []  # 当前阶段的 [(tables, [index, ...])]
+        global_lane = None  # 连续的全局用例合并为一个单队列阶段
+        
+        for index, test_case in enumerate(test_cases):
+            tables = set(test_case.tables)
+            if not tables or test_case.exclusive:
+                if lanes:
+                    phases.append([indexes for _, indexes in lanes])
+                    lanes = []
+                if global_lane is None:
+                    global_lane = []
+                    phases.append([global_lane])
+                global_lane.append(index)
+                continue
+            global_lane = None
+            
+            merged_tables, merged_indexes = tables, [index]
+            remaining = []
+            for lane_tables, lane_indexes in lanes:
+                if lane_tables & merged_tables:
+                    merged_tables |= lane_tables
+                    merged_indexes.extend(lane_indexes)
+                else:
+                    remaining.append((lane_tables, lane_indexes))
+            lanes = remaining + [(merged_tables, sorted(merged_indexes))]
+        
+        if lanes:
+            phases.append([indexes for _, indexes in lanes])
+        return phases
+    
+    def _run_parallel(self, test_cases: List[TestCase], parallel: int) -> List[Dict[str, Any]]:
+        """按阶段依次执行，阶段内并发执行互不冲突的用例队列，结果按原始顺序返回"""
+        phases = self._plan_phases(test_cases)
+        print(f"  并发执行: {len(phases)} 个阶段, {sum(len(lanes) for lanes in phases)} 个队列, 并发度 {parallel}\n")
+        
+        results = [None] * len(test_cases)
+        
+        def run_lane(indexes: List[int]):
+            # 适配器的连接池是线程安全的，各队列从池中借用独立连接
+            for index in indexes:
+                results[index] = self._run_single_test(test_cases[index])
+        
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            for lanes in phases:
+                for future in [executor.submit(run_lane, indexes) for indexes in lanes]:
+                    future.result()
+        
+        return results
+    
+    def _run_single_test(self, test_case: TestCase) -> Dict[str, Any]:
+        """运行单个测试用例"""
+        with event_context(case=test_case.id):
+            return self._run_case(test_case)
+    
+    def _run_case(self, test_case: TestCase) -> Dict[str, Any]:
+        test_id = test_case.id
+        test_name = test_case.name
+        table = test_case.table or ''
+        events = get_events()
+        events.emit('case_start', name=test_name, table=table)
         
         start_time = time.time()
+        sync_stats = {}
+        tracer = get_tracer()
         
         try:
-            for step in test_case['steps']:
-                self._execute_step(step, table)
+            wire_before = self._wire_snapshot(table)
+            with tracer.span(f"test_case:{test_id}", test_id=test_id, table=table or ''):
+                for index, step in enumerate(test_case.steps):
+                    with tracer.span(f"step:{step.action}", index=index, table=step.table or ''):
+                        self._run_step(index, step, sync_stats)
+            if wire_before:
+                sync_stats['wire'] = self._record_wire(table, wire_before, sync_stats)
             
-            elapsed = time.time() - start_time
-            print(f"{Fore.GREEN}✓ 通过 ({elapsed:.2f}s){Style.RESET_ALL}\n")
-            return {'id': test_id, 'name': test_name, 'status': 'PASS', 'time': elapsed}
+            result = {'id': test_id, 'name': test_name, 'status': 'PASS', 'time': time.time() - start_time,
+                      **sync_stats}
         
         except Exception as e:
-            elapsed = time.time() - start_time
-            print(f"{Fore.RED}✗ 失败: {str(e)} ({elapsed:.2f}s){Style.RESET_ALL}\n")
-            return {'id': test_id, 'name': test_name, 'status': 'FAIL', 'error': str(e), 'time': elapsed}
-    
-    def _execute_step(self, step: Dict[str, Any], table: str = None):
-        """执行测试步骤"""
-        action = step['action']
-        
-        if action == 'validate_sync':
-            timeout = step.get('timeout', 60)
-            if not self.adapter.validate_sync(table, timeout):
-                raise AssertionError(f"数据同步超时 (>{timeout}s)")
-        
-        elif action == 'update':
-            sql = step.get('sql')
-            if sql:
-                self.adapter.execute_on_source(sql)
-                print(f"  执行UPDATE: {sql[:50]}...")
-        
-        elif action == 'delete':
-            sql = step.get('sql')
-            if sql:
-                self.adapter.execute_on_source(sql)
-                print(f"  执行DELETE: {sql[:50]}...")
-        
-        elif action == 'validate_index_query':
-            sql = step.get('sql')
-            if sql:
-                source_result = self.adapter.execute_on_source(sql)
-                time.sleep(5)  # 等待同步
-                target_result = self.adapter.execute_on_target(sql)
-                if source_result != target_result:
-                    raise AssertionError("索引查询结果不一致")
-                print(f"  索引查询验证通过")
+            result = {'id': test_id, 'name': test_name, 'status': 'FAIL', 'error': str(e),
+                      'time': time.time() - start_time}
+        
+        events.emit('case_end', name=test_name, status=result['status'], time=result['time'],
+                    error=result.get('error'), rows=result.get('rows'), sync_time=result.get('sync_time'),
+                    changed_rows=result.get('changed_rows'))
+        return result
+    
+    def _run_step(self, index: int, step: Step, sync_stats: Dict[str, Any]):
+        """执行一个步骤并发出 step_start / step_end 事件"""
+        events = get_events()
+        events.emit('step_start', index=index, action=step.action, table=step.table)
+        start = time.time()
+        try:
+            self._execute_step(step, sync_stats)
+        except Exception as e:
+            events.emit('step_end', index=index, action=step.action, table=step.table, status='FAIL',
+                        duration=time.time() - start, error=str(e))
+            raise
+        events.emit('step_end', index=index, action=step.action, table=step.table, status='PASS',
+                    duration=time.time() - start)
+    
+    def _execute_step(self, step: Step, sync_stats: Dict[str, Any] = None):
+        """执行测试步骤（动作和参数在加载测试计划时已校验），分派到 _step_<action>"""
+        getattr(self, f"_step_{step.action}")(step, sync_stats if sync_stats is not None else {})
+    
+    def _adapter_check(self, method: str):
+        """取适配器的状态检查方法，当前场景不支持时报错"""
+        check = getattr(self.adapter, method, None)
+        if check is None:
+            raise AssertionError(f"场景 {self.scenario_config['scenario_type']} 不支持 {method}")
+        return check
+    
+    @staticmethod
+    def _add_changed_rows(sync_stats: Dict[str, Any], rows: int):
+        sync_stats['changed_rows'] = sync_stats.get('changed_rows', 0) + rows
+    
+    def _insert_generated(self, table: str, count: int, batch_size: int) -> float:
+        """用数据生成器向源表插入 count 行（借用一个源端连接），返回耗时"""
+        from ..data.table_inserter import TableInserter  # 依赖 pymysql，仅写入生成数据时导入
+        
+        start = time.time()
+        with self.adapter.source_connection() as conn:
+            inserter = TableInserter(conn, batch_size)
+            getattr(inserter, f"insert_{table[len('cdc_test_'):]}_table")(count, table)
+        return time.time() - start
+    
+    def reseed_table(self, table: str, count: int, batch_size: int = 1000):
+        """清空源表和目标表后写入 count 行生成数据（在配置CDC之前调用，使每次运行的初始数据集相同）"""
+        self.adapter.execute_on_source(f"TRUNCATE TABLE {table}")
+        try:
+            self.adapter.execute_on_target(f"TRUNCATE TABLE {table}")
+        except Exception as e:
+            print(f"  {Fore.YELLOW}⚠ 清空目标表 {table} 失败: {str(e)}{Style.RESET_ALL}")
+        self._insert_generated(table, count, batch_size)
+    
+    # ========== 数据同步验证 ==========
+    
+    def _step_validate_sync(self, step: Step, sync_stats: Dict[str, Any]):
+        table, timeout = step.table, step.timeout
+        sync_start = time.time()
+        partitions = self._partitions_to_validate(table)
+        if partitions:
+            # 分区表按分区并发比较，记录每个分区的收敛时间
+            outcome = self.adapter.validate_partitions(table, timeout, partitions)
+            sync_stats['partitions'] = outcome['partitions']
+            self._emit_partition_times(table, outcome['partitions'])
+            if not outcome['synced']:
+                raise AssertionError(f"分区数据同步超时 (>{timeout}s)")
+        elif not self.adapter.validate_sync(table, timeout):
+            raise AssertionError(f"数据同步超时 (>{timeout}s)")
+        
+        # 记录收敛耗时和目标端总行数；参数扫描的吞吐按用例内变更的行数（changed_rows）计算
+        sync_stats['sync_time'] = sync_stats.get('sync_time', 0.0) + time.time() - sync_start
+        sync_stats['rows'] = self.adapter.get_target_row_count(table)
+        metrics = self.adapter.get_metrics()
+        if metrics:
+            sync_stats['metrics'] = metrics
+    
+    def _step_validate(self, step: Step, sync_stats: Dict[str, Any]):
+        """data_match: 源和目标数据一致；row_count: 目标端行数等于 expected（均在 timeout 内轮询）"""
+        where = step.get('where')
+        interval = self.scenario_config.get('validation', {}).get('check_interval', 1)
+        deadline = time.time() + step.timeout
+        while True:
+            if step.get('check') == 'data_match':
+                passed = self.adapter.compare_data(step.table, where)
+                detail = "源和目标数据不一致"
+            else:
+                sql = f"SELECT COUNT(*) FROM {step.table}" + (f" WHERE {where}" if where else "")
+                actual = self.adapter.query_target(sql)[0][0]
+                passed = actual == step.get('expected')
+                detail = f"目标端行数 {actual}，期望 {step.get('expected')}"
+            if passed:
+                get_events().emit('validated', table=step.table, check=step.get('check'))
+                return
+            if time.time() >= deadline:
+                raise AssertionError(f"{detail} (>{step.timeout}s)")
+            self.adapter.sleep(interval)
+    
+    def _step_measure_sync_delay(self, step: Step, sync_stats: Dict[str, Any]):
+        """写入 insert_count 行后轮询源和目标行数，测量从写入完成到目标端追平的耗时"""
+        count = step.get('insert_count')
+        write_time = self._insert_generated(step.table, count, step.get('batch_size', 1000))
+        inserted_at = time.time()
+        deadline = inserted_at + step.timeout
+        while True:
+            source_count, target_count = self.adapter.poll_counts(step.table)
+            if source_count == target_count:
+                break
+            if time.time() >= deadline:
+                raise AssertionError(f"同步延迟测量超时 (>{step.timeout}s)")
+            self.adapter.sleep(step.get('poll_interval'))
+        
+        delay = time.time() - inserted_at
+        sync_stats['sync_delay'] = delay
+        self._add_changed_rows(sync_stats, count)
+        get_events().emit('sync_delay', table=step.table, delay=delay, rows=count, write_time=write_time)
+    
+    def _step_validate_index_query(self, step: Step, sync_stats: Dict[str, Any]):
+        """批量索引查询收敛验证：目标端按退避间隔重试，直到每个查询的结果摘要与源端一致或超时"""
+        from .index_convergence import converge_queries
+        
+        outcome = converge_queries(
+            self.adapter, step.get('queries'), step.timeout, ordered=step.get('ordered'),
+            initial_interval=step.get('initial_interval'), max_interval=step.get('max_interval'),
+            concurrency=step.get('concurrency')
+        )
+        sync_stats.setdefault('index_queries', []).extend(outcome['queries'])
+        get_events().emit('index_convergence', table=step.table, **outcome)
+        
+        lagging = [q for q in outcome['queries'] if q['converged_time'] is None]
+        if lagging:
+            error = f" (目标端错误: {lagging[0]['error']})" if lagging[0]['error'] else ''
+            raise AssertionError(f"{len(lagging)}/{len(outcome['queries'])} 个索引查询结果未收敛 "
+                                 f"(>{step.timeout}s): {lagging[0]['sql'][:60]}{error}")
+        get_events().emit('validated', table=step.table, check='index_query')
+    
+    def _step_vector_benchmark(self, step: Step, sync_stats: Dict[str, Any]):
+        """两端并发执行k-NN查询，按本地精确最近邻计算 recall@k 并统计延迟"""
+        from .vector_benchmark import VectorBenchmark
+        
+        report = VectorBenchmark(
+            self.adapter, step.table, column=step.get('column'), id_column=step.get('id_column'), k=step.get('k'),
+            queries=step.get('queries'), concurrency=step.get('concurrency'), noise=step.get('noise'),
+            seed=step.get('seed')
+        ).run()
+        sync_stats['vector_benchmark'] = report
+        get_events().emit('vector_benchmark', table=step.table, **report)
+        
+        min_recall, max_gap = step.get('min_recall'), step.get('max_recall_gap')
+        if min_recall is not None and report['target']['recall'] < min_recall:
+            raise AssertionError(f"目标端 recall@{report['k']} {report['target']['recall']:.3f} 低于 {min_recall}")
+        if max_gap is not None and report['recall_gap'] > max_gap:
+            raise AssertionError(f"目标端召回率比源端低 {report['recall_gap']:.3f}，超过 {max_gap}")
+    
+    def _step_fulltext_benchmark(self, step: Step, sync_stats: Dict[str, Any]):
+        """两端并发执行全文检索，按无序结果集比较命中并统计各索引的延迟"""
+        from .fulltext_benchmark import FulltextBenchmark
+        
+        report = FulltextBenchmark(
+            self.adapter, step.table, indexes=step.get('indexes'), id_column=step.get('id_column'),
+            queries=step.get('queries'), concurrency=step.get('concurrency'), sample_rows=step.get('sample_rows'),
+            seed=step.get('seed')
+        ).run()
+        sync_stats['fulltext_benchmark'] = report
+        get_events().emit('fulltext_benchmark', table=step.table, **report)
+        
+        max_divergence = step.get('max_divergence')
+        if max_divergence is not None and report['divergence_rate'] > max_divergence:
+            raise AssertionError(f"{report['divergent']}/{report['queries']} 个全文查询两端结果不一致 "
+                                 f"({report['divergence_rate']:.1%} > {max_divergence:.1%})")
+    
+    # ========== 数据变更 ==========
+    
+    def _step_update(self, step: Step, sync_stats: Dict[str, Any]):
+        self._run_dml(step, sync_stats)
+    
+    def _step_delete(self, step: Step, sync_stats: Dict[str, Any]):
+        self._run_dml(step, sync_stats)
+    
+    def _step_insert(self, step: Step, sync_stats: Dict[str, Any]):
+        """执行 sql，或按编译时生成的INSERT语句逐行插入 data"""
+        self._run_dml(step, sync_stats)
+    
+    def _run_dml(self, step: Step, sync_stats: Dict[str, Any]):
+        """在源端执行步骤的DML（insert 的 data 按行执行），累计影响行数"""
+        rows = step.get('rows')
+        if rows:
+            affected = sum(self.adapter.execute_dml_on_source(step.sql, params) for params in rows)
+        else:
+            affected = self.adapter.execute_dml_on_source(step.sql)
+        get_events().emit('dml', action=step.action, table=step.table, sql=step.sql, rows=affected)
+        self._add_changed_rows(sync_stats, affected)
+    
+    def _step_bulk_insert(self, step: Step, sync_stats: Dict[str, Any]):
+        count = step.get('count')
+        elapsed = self._insert_generated(step.table, count, step.get('batch_size'))
+        get_events().emit('generated_insert', table=step.table, rows=count, elapsed=elapsed)
+        self._add_changed_rows(sync_stats, count)
+    
+    def _step_concurrent_insert(self, step: Step, sync_stats: Dict[str, Any]):
+        """threads 个线程各自借用连接并发插入 rows_per_thread 行"""
+        threads, per_thread = step.get('threads'), step.get('rows_per_thread')
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = [executor.submit(self._insert_generated, step.table, per_thread, step.get('batch_size'))
+                       for _ in range(threads)]
+            for future in futures:
+                future.result()
+        total = threads * per_thread
+        get_events().emit('generated_insert', table=step.table, rows=total, elapsed=time.time() - start,
+                          threads=threads)
+        self._add_changed_rows(sync_stats, total)
+    
+    def _step_create_table(self, step: Step, sync_stats: Dict[str, Any]):
+        self.adapter.execute_on_source(step.sql)
+        get_events().emit('ddl', table=step.table, sql=step.sql)
+    
+    # ========== 组件状态 ==========
+    
+    def _step_check_subscription_status(self, step: Step, sync_stats: Dict[str, Any]):
+        status = self._adapter_check('check_subscription_status')()
+        if not status:
+            raise AssertionError("未查询到Subscription状态")
+        states = {column: status[column] for column in DEFAULT_STATE_COLUMNS if column in status}
+        expected = step.get('expected_state')
+        if expected is not None and str(expected).lower() not in {str(v).lower() for v in states.values()}:
+            raise AssertionError(f"Subscription状态不符: 期望 {expected}，实际 {states or status}")
+        sync_stats['subscription_status'] = {k: str(v) for k, v in status.items()}
+        get_events().emit('component_status', component='Subscription', state=str(states or status))
+    
+    def _step_check_producer_status(self, step: Step, sync_stats: Dict[str, Any]):
+        if not self._adapter_check('check_producer_status')():
+            raise AssertionError("Producer 未运行")
+        get_events().emit('component_status', component='Producer')
+    
+    def _step_check_consumer_status(self, step: Step, sync_stats: Dict[str, Any]):
+        if not self._adapter_check('check_consumer_status')():
+            raise AssertionError("Consumer 未运行")
+        get_events().emit('component_status', component='Consumer')
+    
+    def _step_check_kafka_status(self, step: Step, sync_stats: Dict[str, Any]):
+        if not self._adapter_check('check_kafka_status')():
+            raise AssertionError("Kafka 不可连接")
+        get_events().emit('component_status', component='Kafka')
+    
+    # ========== 任务控制 ==========
+    
+    def _step_pause_cdc(self, step: Step, sync_stats: Dict[str, Any]):
+        self._adapter_check('pause_cdc')()
+    
+    def _step_resume_cdc(self, step: Step, sync_stats: Dict[str, Any]):
+        self._adapter_check('resume_cdc')(restart=step.get('restart'))
+    
+    # ========== 网络故障 ==========
+    
+    def _step_simulate_network_issue(self, step: Step, sync_stats: Dict[str, Any]):
+        if not self.network:
+            raise AssertionError("场景未启用 network_proxy，无法模拟网络故障")
+        if step.get('schedule'):
+            self.network.schedule(step.get('schedule'))
+        else:
+            self.network.inject(step.explicit_options())
+    
+    def _step_wait_for_recovery(self, step: Step, sync_stats: Dict[str, Any]):
+        if not self.network:
+            raise AssertionError("场景未启用 network_proxy，无法等待网络恢复")
+        recovery_table = step.table or self.scenario_config['network_proxy'].get('recovery_table', 'cdc_test_base')
+        recovery = self.network.wait_for_recovery(self.adapter, recovery_table, step.timeout, step.get('where'))
+        sync_stats.setdefault('recoveries', []).append(recovery)
+    
+    def _wire_snapshot(self, table: str) -> Dict[str, Any]:
+        """字节统计开启时记录用例开始时的链路计数和目标端行数"""
+        if not (table and self.network and self.network.accounting):
+            return None
+        return {'counters': self.network.counters(), 'target_rows': self.adapter.get_target_row_count(table)}
+    
+    def _record_wire(self, table: str, before: Dict[str, Any], sync_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        把用例期间的链路字节归属到表
+        
+        复制行数取DML影响行数与目标端行数变化中的较大者（UPDATE不改变行数，DELETE两者相同）
+        """
+        target_delta = abs(self.adapter.get_target_row_count(table) - before['target_rows'])
+        rows = max(sync_stats.get('changed_rows', 0), target_delta)
+        wire = self.network.accounting.record(table, before['counters'], self.network.counters(), rows)
+        get_events().emit('wire', table=table, **wire)
+        return wire
+    
+    def _partitions_to_validate(self, table: str) -> List[str]:
+        """分区感知验证开启（validation.partition_aware，默认开启）时返回表的分区列表"""
+        if not table or not self.scenario_config.get('validation', {}).get('partition_aware', True):
+            return []
+        return self.adapter.get_partitions(table)
+    
+    def _emit_partition_times(self, table: str, partitions: Dict[str, Dict[str, Any]]):
+        """发出各分区的行数和收敛时间"""
+        events = get_events()
+        for name, info in partitions.items():
+            events.emit('partition_result', table=table, partition=name, **info)
     
     def _print_summary(self):
         """打印测试摘要"""
@@ -133,8 +528,12 @@ class TestRunner:
         failed = total - passed
         total_time = sum(r.get('time', 0) for r in self.results)
         
-        print(f"\n{Fore.CYAN}{'='*60}")
-        print(f"测试摘要")
-        print(f"{'='*60}{Style.RESET_ALL}")
-        print(f"总计: {total} | {Fore.GREEN}通过: {passed}{Style.RESET_ALL} | {Fore.RED}失败: {failed}{Style.RESET_ALL}")
-        print(f"总耗时: {total_time:.2f}s")
+        get_events().emit('run_end', total=total, passed=passed, failed=failed, time=total_time)
+        if self.network and self.network.accounting:
+            self.network.accounting.print_report()
+
+
+# 测试计划允许的每个动作都必须有执行方法，导入时检查，避免编译通过的计划在运行中途才失败
+_missing_steps = [action for action in STEP_SPECS if not hasattr(TestRunner, f"_step_{action}")]
+if _missing_steps:
+    raise RuntimeError(f"TestRunner 缺少步骤执行方法: {', '.join('_step_' + a for a in _missing_steps)}")
@@ -0,0 +1,108 @@
+"""
+向量索引召回率与延迟基准 - 在源端和目标端并发执行同一批 k-NN 查询
+（ORDER BY l2_distance(...) LIMIT k），以本地 NumPy 精确计算的最近邻为基准，
+对比两端的 recall@k 和查询延迟分布
+"""
+
+import time
+from typing import Dict, Any, List
+from .paired_queries import SIDES, run_paired
+from .stats import latency_summary
+
+
+def _import_numpy():
+    """NumPy 仅向量基准需要，按需导入"""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("向量基准需要安装 numpy: pip install numpy")
+    return numpy
+
+
+class VectorBenchmark:
+    """
+    向量k-NN基准
+
+    查询向量取自语料中随机抽取的向量加高斯噪声（noise 为标准差），
+    模拟“查找相近内容”的真实查询；语料为源端表中的全部向量
+    """
+
+    def __init__(self, adapter, table: str, column: str = 'embedding', id_column: str = 'id', k: int = 10,
+                 queries: int = 50, concurrency: int = 8, noise: float = 0.05, seed: int = None):
+        self.adapter = adapter
+        self.table = table
+        self.column = column
+        self.id_column = id_column
+        self.k = k
+        self.queries = queries
+        self.concurrency = concurrency
+        self.noise = noise
+        self.seed = seed
+
+    def _load_corpus(self, np):
+        """读取源端全部向量，返回 (ids, 向量矩阵 float32)"""
+        rows = self.adapter.query_source(
+            f"SELECT {self.id_column}, {self.column} FROM {self.table} WHERE {self.column} IS NOT NULL"
+        )
+        if not rows:
+            raise AssertionError(f"表 {self.table} 中没有向量数据")
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        vectors = np.stack([self._parse(np, row[1]) for row in rows])
+        return ids, vectors
+
+    @staticmethod
+    def _parse(np, value):
+        """解析 '[v1, v2, ...]' 形式的向量文本"""
+        if isinstance(value, (bytes, bytearray)):
+            value = value.decode()
+        return np.fromstring(value.strip().strip('[]'), sep=',', dtype=np.float32)
+
+    @staticmethod
+    def _literal(vector) -> str:
+        return '[' + ','.join(f"{v:.6f}" for v in vector) + ']'
+
+    def _make_queries(self, np, vectors):
+        """生成查询向量文本；基准计算使用从文本解析回的值，与数据库收到的完全一致"""
+        rng = np.random.default_rng(self.seed)
+        picks = rng.integers(0, len(vectors), self.queries)
+        noisy = vectors[picks] + rng.normal(0, self.noise, (self.queries, vectors.shape[1])).astype(np.float32)
+        literals = [self._literal(v) for v in noisy]
+        return literals, np.stack([self._parse(np, text) for text in literals])
+
+    def _ground_truth(self, np, ids, vectors, queries, k: int, chunk: int = 256) -> List[set]:
+        """精确 k-NN: ||x||² - 2x·q（省略对排序无影响的 ||q||²），按查询分块以限制内存"""
+        norms = np.einsum('ij,ij->i', vectors, vectors)
+        truth = []
+        for start in range(0, len(queries), chunk):
+            distances = norms[None, :] - 2 * queries[start:start + chunk] @ vectors.T
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            truth.extend(set(ids[row].tolist()) for row in nearest)
+        return truth
+
+    def run(self) -> Dict[str, Any]:
+        """运行基准，返回两端的召回率、延迟分布，以及两端结果集不同的查询数"""
+        np = _import_numpy()
+
+        ids, vectors = self._load_corpus(np)
+        k = min(self.k, len(ids))
+        literals, queries = self._make_queries(np, vectors)
+
+        truth_start = time.perf_counter()
+        truth = self._ground_truth(np, ids, vectors, queries, k)
+        truth_time = time.perf_counter() - truth_start
+
+        sqls = [f"SELECT {self.id_column} FROM {self.table} "
+                f"ORDER BY l2_distance({self.column}, '{literal}') LIMIT {k}" for literal in literals]
+        outcome = run_paired(self.adapter, [(sql, None) for sql in sqls], self.concurrency, span='vector_query')
+        answers = {side: [[row[0] for row in rows] for rows in outcome[side]['rows']] for side in SIDES}
+
+        report = {'queries': len(sqls), 'k': k, 'corpus_rows': len(ids), 'ground_truth_ms': truth_time * 1000}
+        for side in SIDES:
+            recalls = [len(truth[i] & set(answers[side][i])) / k for i in range(len(sqls))]
+            report[side] = {'recall': sum(recalls) / len(recalls), 'min_recall': min(recalls),
+                            **latency_summary(outcome[side]['latencies'])}
+        report['recall_gap'] = report['source']['recall'] - report['target']['recall']
+        report['mismatched_queries'] = sum(
+            1 for i in range(len(sqls)) if set(answers['source'][i]) != set(answers['target'][i])
+        )
+        return report
@@ -1,4 +1,5 @@
 from .data_generator import DataGenerator
 from .table_inserter import TableInserter
+from .partition_generator import PartitionRowFactory, load_partitions
 
-__all__ = ['DataGenerator', 'TableInserter']
+__all__ = ['DataGenerator', 'TableInserter', 'PartitionRowFactory', 'load_partitions']
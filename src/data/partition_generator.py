@@ -0,0 +1,161 @@
+"""
+分区定向数据生成 - 按分区指定行数分布（或对分区键施加Zipf倾斜），
+每个分区由独立的工作线程和连接并行生成、加载
+"""
+
+import re
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Tuple
+from .data_generator import DataGenerator
+from ..schema.table_definitions import TABLE_SCHEMAS, get_partition_names
+
+
+def parse_partition_dist(spec: str) -> Dict[str, float]:
+    """
+    解析分区权重，如 p2024=70,p2023=20,*=10
+
+    '*' 表示其余分区平分该权重；未出现且没有 '*' 的分区不生成数据
+    """
+    weights = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        if '=' not in item:
+            raise ValueError(f"无效的分区权重: {item} (应为 分区=权重)")
+        name, value = item.split('=', 1)
+        weights[name.strip()] = float(value)
+    if not weights or any(w < 0 for w in weights.values()):
+        raise ValueError(f"无效的分区分布: {spec}")
+    return weights
+
+
+def zipf_weights(partitions: List[str], skew: float, hot: List[str] = None) -> Dict[str, float]:
+    """Zipf倾斜：第 k 热的分区权重为 1/k^skew；hot 中的分区排在最前，其余按定义顺序"""
+    hot = [p for p in (hot or []) if p in partitions]
+    ranked = hot + [p for p in partitions if p not in hot]
+    return {p: 1.0 / (rank ** skew) for rank, p in enumerate(ranked, 1)}
+
+
+def allocate_rows(total: int, partitions: List[str], weights: Dict[str, float]) -> Dict[str, int]:
+    """
+    按权重把总行数分配到各分区（最大余数法，保证总和等于 total）
+
+    不属于该表的分区名被忽略，便于同一份权重同时用于 Range/Hash/List 三张表
+    """
+    rest = weights.get('*', 0.0)
+    explicit = {p: weights[p] for p in partitions if p in weights}
+    others = [p for p in partitions if p not in explicit]
+    resolved = dict(explicit)
+    for p in others:
+        resolved[p] = rest / len(others) if others else 0.0
+
+    weight_sum = sum(resolved.values())
+    if weight_sum <= 0:
+        raise ValueError(f"分区权重之和必须大于0 (可选分区: {', '.join(partitions)})")
+
+    exact = {p: total * w / weight_sum for p, w in resolved.items()}
+    counts = {p: int(v) for p, v in exact.items()}
+    remainder = total - sum(counts.values())
+    for p in sorted(exact, key=lambda k: exact[k] - counts[k], reverse=True)[:remainder]:
+        counts[p] += 1
+    return {p: counts[p] for p in partitions}
+
+
+class PartitionRowFactory:
+    """根据表定义中的分区边界生成落在指定分区的行"""
+
+    def __init__(self, table_name: str, generator: DataGenerator = None):
+        key = table_name[len('cdc_test_'):] if table_name.startswith('cdc_test_') else table_name
+        if key not in ('partition_range', 'partition_hash', 'partition_list'):
+            raise ValueError(f"不支持分区定向生成的表: {table_name}")
+        self.key = key
+        self.table_name = table_name
+        self.schema = TABLE_SCHEMAS[key]
+        self.partitions = get_partition_names(table_name)
+        self.generator = generator or DataGenerator()
+        self._range_bounds = self._parse_range_bounds() if key == 'partition_range' else {}
+        self._list_values = self._parse_list_values() if key == 'partition_list' else {}
+
+    def _parse_range_bounds(self) -> Dict[str, Tuple[int, int]]:
+        """Range分区的年份区间 [low, high)：第一个分区取一年，MAXVALUE 分区取之后5年"""
+        bounds = {}
+        low = None
+        for name, upper in re.findall(r'PARTITION\s+(\w+)\s+VALUES\s+LESS\s+THAN\s+\(?(\w+)\)?', self.schema):
+            high = low + 5 if upper.upper() == 'MAXVALUE' else int(upper)
+            bounds[name] = (high - 1 if low is None else low, high)
+            low = high
+        return bounds
+
+    def _parse_list_values(self) -> Dict[str, List[str]]:
+        """List分区的取值列表"""
+        return {
+            name: re.findall(r"'([^']*)'", values)
+            for name, values in re.findall(r'PARTITION\s+(\w+)\s+VALUES\s+IN\s+\(([^)]*)\)', self.schema)
+        }
+
+    def insert_sql(self) -> str:
+        """与 row() 返回的列顺序对应的INSERT语句"""
+        columns = {
+            'partition_range': ['user_id', 'amount', 'order_date', 'status'],
+            'partition_hash': ['user_id', 'username', 'email'],
+            'partition_list': ['region', 'city', 'population', 'data'],
+        }[self.key]
+        placeholders = ', '.join(['%s'] * len(columns))
+        return f"INSERT INTO {self.table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    def row(self, partition: str, seq: int) -> tuple:
+        """生成一行落在 partition 中的数据，seq 为该分区内的序号"""
+        gen = self.generator
+        if self.key == 'partition_range':
+            low, high = self._range_bounds[partition]
+            year = random.randint(low, high - 1)
+            order_date = gen.generate_date(year, year)
+            return (gen.generate_int(unsigned=True) % 100000, gen.generate_decimal(10, 2), order_date,
+                    gen.generate_enum(['pending', 'processing', 'completed', 'cancelled']))
+
+        if self.key == 'partition_hash':
+            # HASH(user_id) PARTITIONS n: 取 user_id ≡ 分区序号 (mod n)
+            n = len(self.partitions)
+            user_id = seq * n + self.partitions.index(partition)
+            return (user_id, f"user_{user_id}", f"user{user_id}@example.com")
+
+        region = gen.generate_enum(self._list_values[partition])
+        return (region, f"{region}_{gen.generate_int(unsigned=True) % 100}",
+                gen.generate_int(unsigned=True) % 10000000, gen.generate_varchar(255))
+
+
+def load_partitions(connect: Callable[[], Any], table_name: str, counts: Dict[str, int],
+                    batch_size: int = 1000) -> Dict[str, Dict[str, Any]]:
+    """
+    每个分区一个工作线程，各自使用独立连接批量插入
+
+    connect 为创建新数据库连接的函数；返回每个分区的行数和耗时
+    """
+    def worker(partition: str, count: int) -> Dict[str, Any]:
+        factory = PartitionRowFactory(table_name)
+        sql = factory.insert_sql()
+        start = time.time()
+        conn = connect()
+        try:
+            inserted = 0
+            with conn.cursor() as cursor:
+                while inserted < count:
+                    batch = min(batch_size, count - inserted)
+                    cursor.executemany(sql, [factory.row(partition, inserted + i) for i in range(batch)])
+                    conn.commit()
+                    inserted += batch
+        finally:
+            conn.close()
+        elapsed = time.time() - start
+        print(f"  ✓ 分区 {partition}: {count} 条 ({elapsed:.1f}s)")
+        return {'rows': count, 'time': elapsed}
+
+    jobs = {p: c for p, c in counts.items() if c > 0}
+    print(f"正在向 {table_name} 按分区并行插入 {sum(jobs.values())} 条数据 ({len(jobs)} 个工作线程)...")
+    with ThreadPoolExecutor(max_workers=max(len(jobs), 1)) as executor:
+        futures = {p: executor.submit(worker, p, c) for p, c in jobs.items()}
+        results = {p: f.result() for p, f in futures.items()}
+    print(f"✓ 完成插入 {sum(jobs.values())} 条数据到 {table_name}")
+    return results
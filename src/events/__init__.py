@@ -0,0 +1,13 @@
+from .stream import EventStream, JsonlWriter, event_context, get_events, set_events
+from .console import ConsoleRenderer
+from .junit import write_junit_xml
+
+__all__ = [
+    'EventStream',
+    'JsonlWriter',
+    'ConsoleRenderer',
+    'event_context',
+    'get_events',
+    'set_events',
+    'write_junit_xml'
+]
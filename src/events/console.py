@@ -0,0 +1,184 @@
+"""
+控制台渲染器 - 把事件格式化为彩色终端输出
+
+quiet 模式下跳过轮询循环中的高频事件，不做任何格式化
+"""
+
+from typing import Dict, Any
+from colorama import Fore, Style, init
+
+init(autoreset=True)
+
+# 轮询循环中每次检查都会发出的事件
+HOT_EVENTS = frozenset({'poll', 'poll_error', 'partition_poll', 'kafka_lag', 'sync_predicted', 'index_poll',
+                        'recovery_poll'})
+
+
+class ConsoleRenderer:
+    """事件流的控制台接收器，未定义渲染方法的事件不输出"""
+
+    def __init__(self, quiet: bool = False):
+        self.quiet = quiet
+
+    def __call__(self, record: Dict[str, Any]):
+        event = record['event']
+        if self.quiet and event in HOT_EVENTS:
+            return
+        render = getattr(self, f"_render_{event}", None)
+        if render:
+            render(record)
+
+    # ========== 运行 / 用例 ==========
+
+    def _render_run_start(self, r: Dict[str, Any]):
+        engine = f" ({r['engine']})" if r.get('engine') else ''
+        print(f"\n{Fore.CYAN}{'='*60}")
+        print(f"场景: {r['scenario_name']}{engine}")
+        print(f"测试套件: {r['suite']}")
+        print(f"测试组: {r['group']}")
+        print(f"{'='*60}{Style.RESET_ALL}\n")
+
+    def _render_group_missing(self, r: Dict[str, Any]):
+        print(f"{Fore.YELLOW}⚠ 未找到测试组 '{r['group']}'，运行所有测试{Style.RESET_ALL}")
+
+    def _render_case_start(self, r: Dict[str, Any]):
+        print(f"{Fore.YELLOW}[{r['case']}] {r['name']}{Style.RESET_ALL}")
+        if r.get('table'):
+            print(f"  表: {r['table']}")
+
+    def _render_case_end(self, r: Dict[str, Any]):
+        if r['status'] == 'PASS':
+            print(f"{Fore.GREEN}✓ [{r['case']}] 通过 ({r['time']:.2f}s){Style.RESET_ALL}\n")
+        else:
+            print(f"{Fore.RED}✗ [{r['case']}] 失败: {r['error']} ({r['time']:.2f}s){Style.RESET_ALL}\n")
+
+    def _render_run_end(self, r: Dict[str, Any]):
+        print(f"\n{Fore.CYAN}{'='*60}")
+        print(f"测试摘要")
+        print(f"{'='*60}{Style.RESET_ALL}")
+        print(f"总计: {r['total']} | {Fore.GREEN}通过: {r['passed']}{Style.RESET_ALL} | "
+              f"{Fore.RED}失败: {r['failed']}{Style.RESET_ALL}")
+        print(f"总耗时: {r['time']:.2f}s")
+
+    # ========== 同步等待 ==========
+
+    def _render_sync_wait(self, r: Dict[str, Any]):
+        print(f"  等待数据同步 (超时: {r['timeout']}s)...")
+
+    def _render_synced(self, r: Dict[str, Any]):
+        print(f"  ✓ 数据同步完成")
+
+    def _render_poll(self, r: Dict[str, Any]):
+        line = f"    源: {r['source_rows']} 行, 目标: {r['target_rows']} 行"
+        if 'consumer_rows' in r:
+            line += (f" | Consumer: {r['consumer_rows']} 行 ({r['consumer_rows_per_sec']:.0f} 行/s), "
+                     f"错误 {r['consumer_errors']}")
+        if 'wire_bytes' in r:
+            line += f" | 线上字节 {r['wire_bytes']}"
+        if 'elapsed' in r:
+            line += f" ({r['elapsed']:.0f}s)"
+        print(line)
+
+    def _render_poll_error(self, r: Dict[str, Any]):
+        partition = f" (分区 {r['partition']})" if r.get('partition') else ''
+        print(f"    检查同步状态时出错{partition}: {r['error']}")
+
+    def _render_sync_predicted(self, r: Dict[str, Any]):
+        print(f"    预计 {r['wait']:.1f}s 后完成下一次同步")
+
+    def _render_kafka_lag(self, r: Dict[str, Any]):
+        stage = {'producer': 'Producer (binlog→Kafka)', 'consumer': 'Consumer (Kafka→MO)'}.get(r['bottleneck'], '无')
+        print(f"    Kafka: 已生产 {r['produced']}, 已提交 {r['committed']}, "
+              f"积压 {r['consumer_lag']} | 积压阶段: {stage}")
+
+    def _render_partition_poll(self, r: Dict[str, Any]):
+        if r['lagging']:
+            print(f"    未一致分区: {', '.join(r['lagging'])} ({r['elapsed']:.0f}s)")
+        elif not r.get('synced', True):
+            print(f"    源表为空，等待数据 ({r['elapsed']:.0f}s)")
+        else:
+            print(f"    {r['partitions']} 个分区全部一致 ({r['elapsed']:.0f}s)")
+
+    def _render_partition_result(self, r: Dict[str, Any]):
+        converged = r['converged_time']
+        when = f"{converged:.1f}s" if converged is not None else f"{Fore.RED}未收敛{Style.RESET_ALL}"
+        print(f"    分区 {r['partition']}: 源 {r['source_rows']} / 目标 {r['target_rows']} 行, 收敛 {when}")
+
+    # ========== 步骤 ==========
+
+    def _render_dml(self, r: Dict[str, Any]):
+        rows = f" ({r['rows']} 行)" if r.get('rows') is not None else ''
+        print(f"  执行{r['action'].upper()}: {r['sql'][:50]}...{rows}")
+
+    def _render_generated_insert(self, r: Dict[str, Any]):
+        rate = r['rows'] / r['elapsed'] if r['elapsed'] > 0 else 0
+        threads = f"{r['threads']} 线程, " if r.get('threads') else ''
+        print(f"  插入 {r['rows']} 行 ({threads}{r['elapsed']:.2f}s, {rate:.0f} 行/s)")
+
+    def _render_ddl(self, r: Dict[str, Any]):
+        print(f"  已创建表: {r['table']}")
+
+    def _render_sync_delay(self, r: Dict[str, Any]):
+        print(f"  同步延迟: {r['delay']:.2f}s (写入 {r['rows']} 行耗时 {r['write_time']:.2f}s)")
+
+    def _render_validated(self, r: Dict[str, Any]):
+        print(f"  验证通过 ({r['check']})")
+
+    def _render_component_status(self, r: Dict[str, Any]):
+        state = f": {r['state']}" if r.get('state') is not None else ''
+        print(f"  ✓ {r['component']} 正常{state}")
+
+    def _render_vector_benchmark(self, r: Dict[str, Any]):
+        from tabulate import tabulate  # 仅基准报告需要
+
+        def fmt(value):
+            return '-' if value is None else f"{value:.1f}"
+
+        rows = [[side, f"{r[side]['recall']:.3f}", f"{r[side]['min_recall']:.3f}", fmt(r[side]['p50_ms']),
+                 fmt(r[side]['p90_ms']), fmt(r[side]['p99_ms']), fmt(r[side]['max_ms'])]
+                for side in ('source', 'target')]
+        print(f"  向量基准: {r['queries']} 个查询, k={r['k']}, 语料 {r['corpus_rows']} 行 "
+              f"(精确基准 {r['ground_truth_ms']:.0f}ms), 两端结果不同 {r['mismatched_queries']} 个")
+        table = tabulate(rows, headers=['端', f"recall@{r['k']}", '最低recall', 'P50(ms)', 'P90(ms)', 'P99(ms)',
+                                        '最大(ms)'], tablefmt='simple')
+        print('\n'.join('    ' + line for line in table.splitlines()))
+
+    def _render_fulltext_benchmark(self, r: Dict[str, Any]):
+        from tabulate import tabulate  # 仅基准报告需要
+
+        def fmt(value):
+            return '-' if value is None else f"{value:.1f}"
+
+        rows = [[name, s['queries'], f"{s['divergence_rate']:.1%}", fmt(s['avg_hits']),
+                 fmt(s['source']['p50_ms']), fmt(s['target']['p50_ms']),
+                 fmt(s['source']['p99_ms']), fmt(s['target']['p99_ms'])]
+                for name, s in r['indexes'].items()]
+        print(f"  全文基准: {r['queries']} 个查询, 两端结果不一致 {r['divergent']} 个 ({r['divergence_rate']:.1%})")
+        table = tabulate(rows, headers=['索引', '查询数', '不一致率', '平均命中', '源P50(ms)', '目标P50(ms)',
+                                        '源P99(ms)', '目标P99(ms)'], tablefmt='simple')
+        print('\n'.join('    ' + line for line in table.splitlines()))
+        for sample in r['divergent_samples']:
+            print(f"    {Fore.YELLOW}⚠ {sample['index']} {sample['mode']} '{sample['query']}': "
+                  f"目标缺少 {sample['missing']} 行, 多出 {sample['extra']} 行{Style.RESET_ALL}")
+
+    def _render_index_poll(self, r: Dict[str, Any]):
+        if r['pending']:
+            print(f"    索引查询: {r['total'] - r['pending']}/{r['total']} 已收敛 ({r['elapsed']:.1f}s)")
+
+    def _render_recovery_poll(self, r: Dict[str, Any]):
+        if r['pending']:
+            print(f"    等待恢复: 源和目标尚不一致 ({r['elapsed']:.1f}s)")
+
+    def _render_index_convergence(self, r: Dict[str, Any]):
+        for query in r['queries']:
+            converged = query['converged_time']
+            when = f"{converged:.2f}s" if converged is not None else f"{Fore.RED}未收敛{Style.RESET_ALL}"
+            error = f" 目标端错误: {query['error'][:60]}" if query.get('error') else ''
+            print(f"    {query['sql'][:60]} → {query['rows']} 行, 收敛 {when} ({query['attempts']} 次){error}")
+
+    def _render_wire(self, r: Dict[str, Any]):
+        if r['bytes_per_row'] is not None:
+            print(f"  线上字节: {r['bytes']} ({r['bytes_per_row']:.1f} 字节/行, "
+                  f"压缩后 {r['compressed_per_row']:.1f} 字节/行)")
+        else:
+            print(f"  线上字节: {r['bytes']} (无复制行)")
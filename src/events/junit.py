@@ -0,0 +1,50 @@
+"""
+JUnit XML 报告 - 每个场景一个 testsuite，每个用例一个 testcase
+"""
+
+import socket
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Any, List
+
+# 作为 <property> 输出的用例统计字段
+_CASE_PROPERTIES = ('sync_time', 'rows', 'changed_rows', 'sync_delay')
+
+
+def build_testsuite(name: str, results: List[Dict[str, Any]], timestamp: float = None) -> ET.Element:
+    """由执行结果构建 <testsuite> 元素"""
+    failures = sum(1 for r in results if r['status'] != 'PASS')
+    suite = ET.Element('testsuite', {
+        'name': name,
+        'tests': str(len(results)),
+        'failures': str(failures),
+        'errors': '0',
+        'time': f"{sum(r.get('time', 0) for r in results):.3f}",
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(timestamp or time.time())),
+        'hostname': socket.gethostname()
+    })
+    for result in results:
+        case = ET.SubElement(suite, 'testcase', {
+            'classname': name,
+            'name': f"{result['id']} {result.get('name', '')}".strip(),
+            'time': f"{result.get('time', 0):.3f}"
+        })
+        if result['status'] != 'PASS':
+            failure = ET.SubElement(case, 'failure', {'message': result.get('error', '')})
+            failure.text = result.get('error', '')
+        properties = [(key, result[key]) for key in _CASE_PROPERTIES if result.get(key) is not None]
+        if properties:
+            node = ET.SubElement(case, 'properties')
+            for key, value in properties:
+                ET.SubElement(node, 'property', {'name': key, 'value': str(value)})
+    return suite
+
+
+def write_junit_xml(path: str, suites: Dict[str, List[Dict[str, Any]]]):
+    """写入 JUnit XML，suites 为 {套件名: 执行结果列表}"""
+    root = ET.Element('testsuites')
+    for name, results in suites.items():
+        root.append(build_testsuite(name, results))
+    tree = ET.ElementTree(root)
+    ET.indent(tree)
+    tree.write(path, encoding='utf-8', xml_declaration=True)
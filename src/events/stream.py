@@ -0,0 +1,109 @@
+"""
+结构化事件流 - 运行/用例/步骤/轮询级别的事件，分发给控制台渲染器和JSONL写入器
+
+每个事件是一个扁平字典: {'ts': Unix秒, 'event': 类型, ...字段}；
+event_context 设置的字段（如当前用例）会合并到同一线程/协程发出的所有事件中
+"""
+
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, List
+
+# 当前线程/协程的事件上下文（contextvars 同时适用于线程池和 asyncio 任务）
+_context: contextvars.ContextVar = contextvars.ContextVar('cdc_event_context', default=None)
+
+
+@contextmanager
+def event_context(**fields):
+    """在代码块内发出的事件中附加 fields"""
+    parent = _context.get()
+    token = _context.set({**parent, **fields} if parent else fields)
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class EventStream:
+    """事件流，事件按顺序同步分发给各接收器（可调用对象，参数为事件字典）"""
+
+    def __init__(self, sinks: List[Callable[[Dict[str, Any]], None]] = None):
+        self.sinks = list(sinks or [])
+
+    def add_sink(self, sink: Callable[[Dict[str, Any]], None]):
+        """添加接收器"""
+        self.sinks.append(sink)
+
+    def emit(self, event: str, **fields):
+        """发出事件"""
+        record = {'ts': time.time(), 'event': event}
+        context = _context.get()
+        if context:
+            record.update(context)
+        record.update(fields)
+        for sink in self.sinks:
+            sink(record)
+
+    def close(self):
+        """关闭所有支持关闭的接收器（刷新缓冲）"""
+        for sink in self.sinks:
+            close = getattr(sink, 'close', None)
+            if close:
+                close()
+
+
+class JsonlWriter:
+    """
+    JSONL接收器，事件先缓存在内存中，每 flush_every 条序列化并写入一次
+
+    序列化在写入时批量进行，轮询循环中只追加字典引用
+    """
+
+    def __init__(self, path: str, flush_every: int = 256):
+        self.path = path
+        self.flush_every = flush_every
+        self.count = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def __call__(self, record: Dict[str, Any]):
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._file.write(''.join(json.dumps(r, ensure_ascii=False, default=str) + '\n' for r in self._buffer))
+            self.count += len(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        """写入剩余事件并关闭文件"""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush()
+            self._file.close()
+
+
+_events = None
+
+
+def get_events() -> EventStream:
+    """获取当前进程的事件流（默认只有控制台渲染器）"""
+    global _events
+    if _events is None:
+        from .console import ConsoleRenderer
+        _events = EventStream([ConsoleRenderer()])
+    return _events
+
+
+def set_events(stream: EventStream):
+    """设置当前进程的事件流"""
+    global _events
+    _events = stream
@@ -0,0 +1,5 @@
+from .proxy import FaultProxy
+from .manager import NetworkManager
+from .accounting import WireAccounting
+
+__all__ = ['FaultProxy', 'NetworkManager', 'WireAccounting']
@@ -0,0 +1,196 @@
+"""
+网络故障管理 - 按场景配置在端点前启动代理并改写连接地址，
+由测试步骤或时间表注入故障，测量恢复耗时和追平吞吐；开启字节统计时按表统计复制流量
+"""
+
+import threading
+import time
+from typing import Dict, Any, List, Optional, Sequence
+from .proxy import FaultProxy
+from .accounting import WireAccounting, wire_counters
+from ..core.index_convergence import converge_queries, divergent_rows
+
+
+class NetworkManager:
+    """场景内所有代理链路的管理器"""
+
+    def __init__(self, scenario_config: Dict[str, Any]):
+        self.scenario_config = scenario_config
+        self.config = scenario_config.get('network_proxy', {})
+        self.proxies: Dict[str, FaultProxy] = {}
+        self.recoveries: List[Dict[str, Any]] = []
+        self._timers: List[threading.Timer] = []
+        accounting_cfg = self.config.get('accounting', {})
+        self.accounting = WireAccounting(accounting_cfg) if accounting_cfg.get('enabled', False) else None
+
+    @classmethod
+    def from_config(cls, scenario_config: Dict[str, Any],
+                    replication_endpoints: Sequence[str] = ()) -> Optional['NetworkManager']:
+        """
+        network_proxy.enabled 为真时创建并启动，否则返回 None
+
+        replication_endpoints 为适配器复制链路读取代理地址的端点；端点没有网络地址（本地库）时不启动代理
+        """
+        if not scenario_config.get('network_proxy', {}).get('enabled', False):
+            return None
+        if any('host' not in scenario_config[e] for e in ('source', 'target') if e in scenario_config):
+            print(f"⚠ 场景 {scenario_config['scenario_type']} 的端点是本地库，没有网络链路，不启动网络代理")
+            return None
+        manager = cls(scenario_config)
+        manager.check_links(replication_endpoints)
+        manager.start()
+        return manager
+
+    def _links(self) -> List[Dict[str, Any]]:
+        return self.config.get('links') or [{'name': 'replication', 'endpoint': 'source', 'mode': 'replication'}]
+
+    def check_links(self, replication_endpoints: Sequence[str]):
+        """mode=replication 的链路只有在适配器的复制链路读取该端点的代理地址时才有流量，否则报错"""
+        scenario_type = self.scenario_config['scenario_type']
+        for link in self._links():
+            endpoint = link.get('endpoint', 'source')
+            if link.get('mode', 'replication') != 'replication' or endpoint in replication_endpoints:
+                continue
+            if not replication_endpoints:
+                raise ValueError(f"场景类型 {scenario_type} 没有可经网络代理的复制链路，"
+                                 f"不支持 network_proxy / --wire-bytes")
+            raise ValueError(f"场景类型 {scenario_type} 的复制链路不经过端点 {endpoint} "
+                             f"(可代理: {', '.join(replication_endpoints)})")
+
+    def start(self):
+        """
+        为每条链路启动代理并改写端点配置
+
+        mode=replication 只改写复制链路使用的地址（replication_host/replication_port），
+        mode=all 同时改写测试工具自身的连接地址
+        """
+        listen_host = self.config.get('listen_host', '127.0.0.1')
+        advertise_host = self.config.get('advertise_host', listen_host)
+        links = self._links()
+        compression_level = self.accounting.compression_level if self.accounting else None
+
+        for link in links:
+            endpoint_cfg = self.scenario_config[link.get('endpoint', 'source')]
+            name = link.get('name', link.get('endpoint', 'source'))
+            proxy = FaultProxy(name, endpoint_cfg['host'], endpoint_cfg['port'],
+                               listen_host, link.get('listen_port', 0), compression_level).start()
+            self.proxies[name] = proxy
+
+            if link.get('mode', 'replication') == 'all':
+                endpoint_cfg['host'], endpoint_cfg['port'] = advertise_host, proxy.listen_port
+            else:
+                endpoint_cfg['replication_host'] = advertise_host
+                endpoint_cfg['replication_port'] = proxy.listen_port
+            print(f"✓ 网络代理 {name}: {advertise_host}:{proxy.listen_port} -> "
+                  f"{proxy.upstream[0]}:{proxy.upstream[1]} ({link.get('mode', 'replication')})")
+
+        self.schedule(self.config.get('schedule', []))
+
+    def schedule(self, events: List[Dict[str, Any]]):
+        """按时间表注入故障，at 为相对当前时刻的秒数"""
+        for event in events:
+            timer = threading.Timer(event.get('at', 0), self.inject, args=(event,))
+            timer.daemon = True
+            timer.start()
+            self._timers.append(timer)
+
+    def _proxy(self, link: str = None) -> FaultProxy:
+        if link is None:
+            return next(iter(self.proxies.values()))
+        if link not in self.proxies:
+            raise ValueError(f"未知的网络链路: {link} (可选: {', '.join(self.proxies)})")
+        return self.proxies[link]
+
+    def inject(self, fault: Dict[str, Any]) -> Dict[str, Any]:
+        """在链路上注入故障；指定 duration 时到期自动解除"""
+        proxy = self._proxy(fault.get('link'))
+        record = proxy.apply(fault)
+        duration = fault.get('duration')
+        if duration:
+            timer = threading.Timer(duration, self._clear_if_active, args=(proxy, record))
+            timer.daemon = True
+            timer.start()
+            self._timers.append(timer)
+            record['planned_end'] = record['start'] + duration
+        print(f"  ⚡ 网络故障 [{proxy.name}] {record['type']} {record['params'] or ''}"
+              + (f" 持续 {duration}s" if duration else ""))
+        return record
+
+    @staticmethod
+    def _clear_if_active(proxy: FaultProxy, record: Dict[str, Any]):
+        if proxy.active_fault is record:
+            proxy.clear()
+
+    def clear(self, link: str = None):
+        """解除故障（不指定链路时解除全部）"""
+        for proxy in ([self._proxy(link)] if link else self.proxies.values()):
+            proxy.clear()
+
+    def wait_for_recovery(self, adapter, table: str, timeout: float = 300, where: str = None) -> Dict[str, Any]:
+        """
+        等待故障结束，再轮询直到表内容（where 可限定为用例改动的行）在源和目标一致
+
+        按结果行摘要判断恢复（与索引查询收敛相同），UPDATE 不改变行数也能检测到；
+        time_to_recover 从故障解除算起，caught_up_rows 为故障解除时两端不一致的行数，
+        追平吞吐 = caught_up_rows / 恢复耗时
+        """
+        poll_interval = self.config.get('recovery_poll_interval', 1)
+        deadline = time.time() + timeout
+
+        # 有计划结束时间的故障等待其到期，其余故障立即解除
+        for proxy in self.proxies.values():
+            fault = proxy.active_fault
+            if fault and fault.get('planned_end'):
+                time.sleep(max(0, min(fault['planned_end'], deadline) - time.time()))
+            if proxy.active_fault:
+                proxy.clear()
+
+        fault_end = time.time()
+        sql = f"SELECT * FROM {table}" + (f" WHERE {where}" if where else "")
+        try:
+            caught_up = divergent_rows(adapter.query_source(sql), adapter.query_target(sql))
+        except Exception as e:
+            # 断连刚解除时连接池中的旧连接可能失效，此时无法得到待追平行数
+            print(f"    恢复检查出错: {str(e)}")
+            caught_up = None
+
+        # 目标端查询出错视为未恢复，按固定间隔重试到截止时间
+        outcome = converge_queries(adapter, [sql], max(deadline - time.time(), 0), initial_interval=poll_interval,
+                                   max_interval=poll_interval, progress_event='recovery_poll')
+        if not outcome['converged']:
+            error = outcome['queries'][0]['error']
+            raise TimeoutError(f"网络故障解除后 {timeout}s 内未恢复同步" + (f" (目标端错误: {error})" if error else ""))
+
+        elapsed = time.time() - fault_end
+        recovery = {
+            'table': table,
+            'where': where,
+            'time_to_recover': elapsed,
+            'caught_up_rows': caught_up,
+            'catchup_rows_per_sec': caught_up / elapsed if caught_up is not None and elapsed > 0 else None
+        }
+        self.recoveries.append(recovery)
+        caught_up_text = f"追平 {caught_up} 行" if caught_up is not None else "待追平行数未知"
+        print(f"  ✓ 同步已恢复 ({elapsed:.1f}s, {caught_up_text})")
+        return recovery
+
+    def counters(self) -> Dict[str, float]:
+        """所有链路的累计转发字节数、压缩估算字节数和压缩CPU时间"""
+        return wire_counters(self.proxies.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """各链路的代理统计、恢复记录和按表字节统计"""
+        stats = {
+            'links': {name: proxy.stats() for name, proxy in self.proxies.items()},
+            'recoveries': list(self.recoveries)
+        }
+        if self.accounting:
+            stats['wire'] = self.accounting.summary()
+        return stats
+
+    def close(self):
+        """停止所有定时器和代理"""
+        for timer in self._timers:
+            timer.cancel()
+        for proxy in self.proxies.values():
+            proxy.close()
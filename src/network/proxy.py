@@ -0,0 +1,222 @@
+"""
+故障注入TCP代理 - 转发到上游端点，可注入延迟、抖动、带宽限制、停顿和断连；
+可选地按连接对转发流做 zlib 压缩，估算开启协议压缩后的字节数和CPU开销
+"""
+
+import random
+import socket
+import threading
+import time
+import zlib
+from typing import Dict, Any, List, Optional, Tuple
+
+# 单次读取的最大字节数
+CHUNK_SIZE = 65536
+
+FAULT_TYPES = ('latency', 'bandwidth', 'stall', 'disconnect')
+
+
+class _TokenBucket:
+    """按字节/秒限速（桶容量为1秒的流量）"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, size: int):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= size
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class FaultProxy:
+    """单个上游端点的TCP代理"""
+
+    def __init__(self, name: str, upstream_host: str, upstream_port: int,
+                 listen_host: str = '127.0.0.1', listen_port: int = 0, compression_level: Optional[int] = None):
+        self.name = name
+        self.upstream = (upstream_host, upstream_port)
+        self.listen_host = listen_host
+        self.listen_port = listen_port
+
+        self._lock = threading.Lock()
+        self._server = None
+        self._closed = threading.Event()
+        self._sockets: List[socket.socket] = []
+        # 未停顿时为 set 状态
+        self._flowing = threading.Event()
+        self._flowing.set()
+        self._down = False
+        self.latency_ms = 0.0
+        self.jitter_ms = 0.0
+        self._buckets: Dict[str, Optional[_TokenBucket]] = {'up': None, 'down': None}
+
+        self.bytes = {'up': 0, 'down': 0}
+        # compression_level 为 None 时不估算压缩
+        self.compression_level = compression_level
+        self.compressed_bytes = {'up': 0, 'down': 0}
+        self.compress_seconds = 0.0
+        self.connections = 0
+        self.active_fault: Optional[Dict[str, Any]] = None
+        self.faults: List[Dict[str, Any]] = []
+
+    # ========== 生命周期 ==========
+
+    def start(self) -> 'FaultProxy':
+        """开始监听，listen_port 为0时由系统分配端口"""
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((self.listen_host, self.listen_port))
+        self._server.listen(64)
+        self.listen_port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept_loop, name=f"proxy-{self.name}", daemon=True).start()
+        return self
+
+    def close(self):
+        """停止监听并断开所有连接"""
+        self._closed.set()
+        self._flowing.set()
+        if self._server:
+            try:
+                self._server.close()
+            except OSError:
+                pass
+        self._drop_connections()
+
+    def _accept_loop(self):
+        while not self._closed.is_set():
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            if self._down:
+                client.close()
+                continue
+            try:
+                upstream = socket.create_connection(self.upstream, timeout=10)
+                upstream.settimeout(None)
+            except OSError:
+                client.close()
+                continue
+
+            with self._lock:
+                self._sockets.extend([client, upstream])
+                self.connections += 1
+            for src, dst, direction in ((client, upstream, 'up'), (upstream, client, 'down')):
+                threading.Thread(target=self._pump, args=(src, dst, direction), daemon=True).start()
+
+    def _pump(self, src: socket.socket, dst: socket.socket, direction: str):
+        """单方向转发，每个数据块依次经过停顿、延迟和限速"""
+        # 与MySQL压缩协议一样按连接维护压缩上下文，每个数据块同步刷新
+        compressor = zlib.compressobj(self.compression_level) if self.compression_level is not None else None
+        try:
+            while True:
+                data = src.recv(CHUNK_SIZE)
+                if not data:
+                    break
+                self._flowing.wait()
+                delay = self.latency_ms + (random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+                if delay > 0:
+                    time.sleep(delay / 1000)
+                bucket = self._buckets[direction]
+                if bucket:
+                    bucket.consume(len(data))
+                dst.sendall(data)
+                compressed, cpu = self._compress(compressor, data) if compressor else (0, 0.0)
+                with self._lock:
+                    self.bytes[direction] += len(data)
+                    self.compressed_bytes[direction] += compressed
+                    self.compress_seconds += cpu
+        except OSError:
+            pass
+        finally:
+            for sock in (src, dst):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                sock.close()
+            with self._lock:
+                self._sockets = [s for s in self._sockets if s not in (src, dst)]
+
+    @staticmethod
+    def _compress(compressor, data: bytes) -> Tuple[int, float]:
+        """返回压缩后字节数和本线程消耗的CPU时间"""
+        start = time.thread_time()
+        size = len(compressor.compress(data)) + len(compressor.flush(zlib.Z_SYNC_FLUSH))
+        return size, time.thread_time() - start
+
+    def _drop_connections(self):
+        with self._lock:
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    # ========== 故障注入 ==========
+
+    def apply(self, fault: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        注入故障（同一时间只有一个生效，新故障替换旧故障）
+
+        latency: latency_ms, jitter_ms    bandwidth: bandwidth_kbps
+        stall: 暂停转发（数据滞留在代理中）  disconnect: 断开现有连接并拒绝新连接
+        """
+        fault_type = fault.get('type', 'disconnect')
+        if fault_type not in FAULT_TYPES:
+            raise ValueError(f"未知的网络故障类型: {fault_type} (可选: {', '.join(FAULT_TYPES)})")
+
+        self.clear()
+        if fault_type == 'latency':
+            self.latency_ms = float(fault.get('latency_ms', 100))
+            self.jitter_ms = float(fault.get('jitter_ms', 0))
+        elif fault_type == 'bandwidth':
+            rate = float(fault.get('bandwidth_kbps', 1024)) * 1024 / 8
+            self._buckets = {'up': _TokenBucket(rate), 'down': _TokenBucket(rate)}
+        elif fault_type == 'stall':
+            self._flowing.clear()
+        elif fault_type == 'disconnect':
+            self._down = True
+            self._drop_connections()
+
+        record = {'proxy': self.name, 'type': fault_type, 'start': time.time(), 'end': None,
+                  'params': {k: v for k, v in fault.items() if k not in ('type', 'duration', 'link', 'at')}}
+        self.active_fault = record
+        self.faults.append(record)
+        return record
+
+    def clear(self):
+        """解除当前故障"""
+        self.latency_ms = 0.0
+        self.jitter_ms = 0.0
+        self._buckets = {'up': None, 'down': None}
+        self._down = False
+        self._flowing.set()
+        if self.active_fault:
+            self.active_fault['end'] = time.time()
+            self.active_fault = None
+
+    def stats(self) -> Dict[str, Any]:
+        """代理统计：转发字节数（及压缩估算）、连接数和故障记录"""
+        with self._lock:
+            return {
+                'listen': f"{self.listen_host}:{self.listen_port}",
+                'upstream': f"{self.upstream[0]}:{self.upstream[1]}",
+                'bytes_up': self.bytes['up'],
+                'bytes_down': self.bytes['down'],
+                'compressed_up': self.compressed_bytes['up'],
+                'compressed_down': self.compressed_bytes['down'],
+                'compress_seconds': self.compress_seconds,
+                'connections': self.connections,
+                'faults': [dict(f) for f in self.faults]
+            }
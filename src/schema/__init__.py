@@ -7,7 +7,8 @@ from .table_definitions import (
     VECTOR_INDEX_TABLE_SCHEMA,
     PARTITION_RANGE_TABLE_SCHEMA,
     PARTITION_HASH_TABLE_SCHEMA,
-    PARTITION_LIST_TABLE_SCHEMA
+    PARTITION_LIST_TABLE_SCHEMA,
+    get_partition_names
 )
 
 __all__ = [
@@ -19,5 +20,6 @@ __all__ = [
     'VECTOR_INDEX_TABLE_SCHEMA',
     'PARTITION_RANGE_TABLE_SCHEMA',
     'PARTITION_HASH_TABLE_SCHEMA',
-    'PARTITION_LIST_TABLE_SCHEMA'
+    'PARTITION_LIST_TABLE_SCHEMA',
+    'get_partition_names'
 ]
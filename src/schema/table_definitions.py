@@ -3,6 +3,9 @@ MatrixOne CDC 测试表定义
 覆盖所有数据类型和列约束
 """
 
+import re
+from typing import Dict, List
+
 # 基础表 - 覆盖所有数据类型和约束
 BASE_TABLE_SCHEMA = """
 CREATE TABLE IF NOT EXISTS cdc_test_base (
@@ -198,3 +201,27 @@ TABLE_GROUPS = {
     'vector': ['vector_index'],
     'partition': ['partition_range', 'partition_hash', 'partition_list']
 }
+
+
+def get_partition_names(table_name: str) -> List[str]:
+    """从表定义解析分区名；HASH/KEY 分区按 PARTITIONS n 生成 p0..p(n-1)，非分区表返回空列表"""
+    key = table_name[len('cdc_test_'):] if table_name.startswith('cdc_test_') else table_name
+    schema = TABLE_SCHEMAS.get(key, '')
+
+    names = re.findall(r'\bPARTITION\s+(\w+)\s+VALUES\b', schema, re.IGNORECASE)
+    if names:
+        return names
+
+    match = re.search(r'\bPARTITIONS\s+(\d+)', schema, re.IGNORECASE)
+    if match:
+        return [f"p{i}" for i in range(int(match.group(1)))]
+    return []
+
+
+def get_fulltext_indexes(table_name: str) -> Dict[str, List[str]]:
+    """从索引定义解析全文索引: {索引名: [列, ...]}，没有全文索引时返回空字典"""
+    key = table_name[len('cdc_test_'):] if table_name.startswith('cdc_test_') else table_name
+    definition = INDEX_CREATION_SQLS.get(key, '')
+    return {name: [c.strip(' `') for c in columns.split(',')]
+            for name, columns in re.findall(r'\bFULLTEXT\s+(?:INDEX|KEY)\s+(\w+)\s*\(([^)]*)\)',
+                                            definition, re.IGNORECASE)}
@@ -0,0 +1,11 @@
+from .tracer import Tracer, NullTracer, Span, get_tracer, set_tracer, estimate_result_bytes, redact_sql
+
+__all__ = [
+    'Tracer',
+    'NullTracer',
+    'Span',
+    'get_tracer',
+    'set_tracer',
+    'estimate_result_bytes',
+    'redact_sql'
+]